@@ -0,0 +1,121 @@
+# benchmarks/import_time.py
+"""
+Cold-start benchmark: time fresh-interpreter imports of the engine and the app, and
+list which heavy optional dependencies each one drags in.
+
+    python benchmarks/import_time.py --repeat 5
+    python benchmarks/import_time.py --json out.json
+    python benchmarks/import_time.py --baseline out.json --max-regression 0.25   # exit 1 if slower
+
+The app target executes app/app.py in Streamlit's bare mode, so it needs streamlit
+installed (it is skipped otherwise).
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY = ("sklearn", "scipy", "matplotlib", "reportlab", "streamlit", "numba")
+
+TARGETS = {
+    "dq_engine.checks": ("import dq_engine.checks", ()),
+    "dq_engine.jobs+pipeline": ("import dq_engine.jobs, dq_engine.profiler, dq_engine.checks, reports.export", ()),
+    "service.server": ("import service.server", ()),
+    "app/app.py": ("import runpy; runpy.run_path('app/app.py', run_name='__main__')", ("streamlit",)),
+}
+
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - t0
+print("@@" + json.dumps({{"import_s": elapsed, "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def measure(code, repeat=3):
+    """Run `code` in `repeat` fresh interpreters; returns {import_s, process_s, heavy, runs}."""
+    imports, processes, heavy = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", _CHILD.format(code=code, heavy=HEAVY)],
+            cwd=ROOT, capture_output=True, text=True,
+            env={**os.environ, "PYTHONPATH": ROOT, "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+        processes.append(time.perf_counter() - start)
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("@@")]
+        if proc.returncode != 0 or not lines:
+            raise RuntimeError(f"benchmark child failed:\n{proc.stderr[-2000:]}")
+        out = json.loads(lines[-1][2:])
+        imports.append(out["import_s"])
+        heavy = out["heavy"]
+    return {
+        "import_s": statistics.median(imports),
+        "process_s": statistics.median(processes),
+        "heavy": heavy,
+        "runs": repeat,
+    }
+
+
+def run(targets=None, repeat=3):
+    results = {}
+    for name in targets or TARGETS:
+        code, requires = TARGETS[name]
+        missing = [m for m in requires if importlib.util.find_spec(m) is None]
+        if missing:
+            results[name] = {"skipped": f"missing {', '.join(missing)}"}
+            continue
+        results[name] = measure(code, repeat)
+    return results
+
+
+def compare(results, baseline, max_regression):
+    """Targets whose median import time grew by more than max_regression (fraction) vs baseline."""
+    slower = []
+    for name, res in results.items():
+        base = baseline.get(name, {})
+        if "import_s" in res and "import_s" in base:
+            if res["import_s"] > base["import_s"] * (1 + max_regression):
+                slower.append((name, base["import_s"], res["import_s"]))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--target", action="append", choices=list(TARGETS))
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run(args.target, args.repeat)
+    for name, res in results.items():
+        if "skipped" in res:
+            print(f"{name:28s} skipped ({res['skipped']})")
+        else:
+            heavy = ", ".join(res["heavy"]) or "-"
+            print(f"{name:28s} import {res['import_s']:.3f}s  process {res['process_s']:.3f}s  heavy: {heavy}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            slower = compare(results, json.load(fh), args.max_regression)
+        for name, before, after in slower:
+            print(f"REGRESSION {name}: {before:.3f}s -> {after:.3f}s")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import IsolationForest
 
 def detect_outliers_iqr(series: pd.Series, k: float = 1.5):
     s = series.dropna()
@@ -18,6 +17,8 @@ def detect_outliers_isolationforest(df: pd.DataFrame, cols=None, contamination=0
         cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
     if len(cols) == 0:
         return pd.Series([False] * df.shape[0], index=df.index)
+    from sklearn.ensemble import IsolationForest
+
     sub = df[cols].fillna(0).astype(float)
     try:
         iso = IsolationForest(contamination=contamination, random_state=random_state)
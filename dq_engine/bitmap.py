@@ -0,0 +1,171 @@
+# dq_engine/bitmap.py
+import numpy as np
+import pandas as pd
+
+# popcount lookup for packed bytes (np.bitwise_count only exists on numpy >= 2)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(packed: np.ndarray) -> int:
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(packed).sum())
+    return int(_POPCOUNT[packed].sum())
+
+
+def pack_mask(mask, n_rows: int) -> np.ndarray:
+    if isinstance(mask, pd.Series):
+        mask = mask.to_numpy(dtype=bool, na_value=False)
+    mask = np.asarray(mask, dtype=bool)
+    if mask.shape[0] != n_rows:
+        raise ValueError(f"mask has {mask.shape[0]} entries, expected {n_rows}")
+    return np.packbits(mask)
+
+
+class ViolationBitmap:
+    """
+    Rules x rows matrix of failing-row bitsets.
+    Each rule is keyed by (rule_name, column) - the same pair as a violations row -
+    and stored as a packed uint8 row (n_rows / 8 bytes).
+    """
+
+    def __init__(self, n_rows: int):
+        self.n_rows = int(n_rows)
+        self.n_bytes = (self.n_rows + 7) // 8
+        self._keys = []
+        self._index = {}
+        self._rows = []
+
+    # -------------------------------------------------------------
+    # building
+    # -------------------------------------------------------------
+    def add(self, rule: str, column, mask, keep_empty=False):
+        """OR a boolean row mask into the (rule, column) bitset. Empty masks are skipped."""
+        packed = pack_mask(mask, self.n_rows)
+        if not keep_empty and not packed.any():
+            return
+        key = (rule, "ALL" if column is None else column)
+        if key in self._index:
+            i = self._index[key]
+            self._rows[i] = self._rows[i] | packed
+        else:
+            self._index[key] = len(self._keys)
+            self._keys.append(key)
+            self._rows.append(packed)
+
+    def add_positions(self, rule: str, column, positions):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[np.asarray(positions, dtype=np.int64)] = True
+        self.add(rule, column, mask)
+
+    def merge(self, other: "ViolationBitmap", offset: int = 0):
+        """
+        OR every bitset of another bitmap into this one. `other` covers rows
+        [offset, offset + other.n_rows) of this bitmap; offset must be a multiple of 8.
+        """
+        if offset % 8 or offset + other.n_rows > self.n_rows:
+            raise ValueError(f"bitmap of {other.n_rows} rows doesn't fit at row {offset} of {self.n_rows}")
+        for key, packed in zip(other._keys, other._rows):
+            if other.n_rows != self.n_rows:
+                full = np.zeros(self.n_bytes, dtype=np.uint8)
+                full[offset // 8: offset // 8 + other.n_bytes] = packed
+                packed = full
+            if key in self._index:
+                i = self._index[key]
+                self._rows[i] = self._rows[i] | packed
+            else:
+                self._index[key] = len(self._keys)
+                self._keys.append(key)
+                self._rows.append(packed)
+        return self
+
+    # -------------------------------------------------------------
+    # lookup
+    # -------------------------------------------------------------
+    def keys(self):
+        return list(self._keys)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if not self._rows:
+            return np.zeros((0, self.n_bytes), dtype=np.uint8)
+        return np.vstack(self._rows)
+
+    def _select(self, rule=None, column=None):
+        return [
+            self._rows[i] for i, (r, c) in enumerate(self._keys)
+            if (rule is None or r == rule) and (column is None or c == column)
+        ]
+
+    def packed(self, rule: str, column="ALL"):
+        i = self._index.get((rule, column))
+        if i is None:
+            return np.zeros(self.n_bytes, dtype=np.uint8)
+        return self._rows[i]
+
+    def unpack(self, packed: np.ndarray) -> np.ndarray:
+        return np.unpackbits(packed, count=self.n_rows).astype(bool)
+
+    def mask(self, rule: str, column="ALL") -> np.ndarray:
+        return self.unpack(self.packed(rule, column))
+
+    def rows(self, rule: str, column="ALL") -> np.ndarray:
+        return np.flatnonzero(self.mask(rule, column))
+
+    # -------------------------------------------------------------
+    # set algebra / counts
+    # -------------------------------------------------------------
+    def union(self, rule=None, column=None) -> np.ndarray:
+        """Packed OR over all bitsets matching rule/column (None = any)."""
+        sel = self._select(rule, column)
+        if not sel:
+            return np.zeros(self.n_bytes, dtype=np.uint8)
+        return np.bitwise_or.reduce(np.vstack(sel), axis=0)
+
+    def intersection(self, keys) -> np.ndarray:
+        rows = [self.packed(r, c) for r, c in keys]
+        if not rows:
+            return np.zeros(self.n_bytes, dtype=np.uint8)
+        return np.bitwise_and.reduce(np.vstack(rows), axis=0)
+
+    def count(self, rule=None, column=None) -> int:
+        """Number of distinct rows failing any bitset matching rule/column."""
+        if rule is not None and column is not None:
+            return popcount(self.packed(rule, column))
+        return popcount(self.union(rule, column))
+
+    def counts(self) -> pd.Series:
+        """Failing-row count per (rule, column)."""
+        idx = pd.MultiIndex.from_tuples(self._keys, names=["type", "column"]) if self._keys else None
+        return pd.Series([popcount(r) for r in self._rows], index=idx, dtype="int64")
+
+    def any_mask(self) -> np.ndarray:
+        return self.unpack(self.union())
+
+    # -------------------------------------------------------------
+    # row-level outputs
+    # -------------------------------------------------------------
+    def row_failure_counts(self) -> np.ndarray:
+        counts = np.zeros(self.n_rows, dtype=np.int32)
+        for packed in self._rows:
+            counts += np.unpackbits(packed, count=self.n_rows)
+        return counts
+
+    def row_scores(self) -> np.ndarray:
+        """Per-row DQ score (0-100): share of rules the row passes."""
+        if not self._rows:
+            return np.full(self.n_rows, 100.0)
+        return 100.0 * (1.0 - self.row_failure_counts() / len(self._rows))
+
+    def failing_rows(self, df: pd.DataFrame, rule=None, column=None) -> pd.DataFrame:
+        """Rows of df failing the given rule/column (or any rule when both are None)."""
+        if rule is not None and column is not None:
+            packed = self.packed(rule, column)
+        else:
+            packed = self.union(rule, column)
+        return df.iloc[np.flatnonzero(self.unpack(packed))]
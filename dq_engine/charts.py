@@ -1,10 +1,15 @@
 # dq_engine/charts.py
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import os
 
+def _pyplot():
+    # matplotlib is only imported once a chart is actually drawn
+    import matplotlib.pyplot as plt
+    return plt
+
 def bar_chart(data: pd.Series, title: str, filename: str):
+    plt = _pyplot()
     plt.figure(figsize=(8,4))
     data.plot(kind="bar")
     plt.title(title)
@@ -13,14 +18,16 @@ def bar_chart(data: pd.Series, title: str, filename: str):
     plt.close()
 
 def line_chart(data: pd.Series, title: str, filename: str):
+    plt = _pyplot()
     plt.figure(figsize=(8,4))
-    data.plot(kind="line")
+    data.plot(kind="line", ax=plt.gca())
     plt.title(title)
     plt.tight_layout()
     plt.savefig(filename)
     plt.close()
 
 def pie_chart(data: pd.Series, title: str, filename: str):
+    plt = _pyplot()
     plt.figure(figsize=(5,5))
     data.plot(kind="pie", autopct='%1.1f%%')
     plt.title(title)
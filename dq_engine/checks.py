@@ -1,8 +1,24 @@
 # dq_engine/checks.py
+from contextlib import nullcontext
+
 import pandas as pd
 import numpy as np
 
+from dq_engine.bitmap import ViolationBitmap
+from dq_engine.normalize import TextCache
+from dq_engine.rules import DEFAULT_SETTINGS, compile_rules, execute_plan
 from dq_engine.scoring import compute_dq_score
+from dq_engine.violation_table import (
+    concat_violations,
+    from_duplicates,
+    from_records,
+    from_range,
+    from_missing,
+    from_lookup,
+    from_patterns,
+    from_contact,
+    from_rule_frame,
+)
 from dq_engine.validations import (
     datatype_validation,
     range_validation,
@@ -14,7 +30,18 @@ from dq_engine.validations import (
     outlier_detection,
     spike_drop_detection,
     completeness_score,
+    heuristic_range_bounds,
 )
+from dq_engine.history import DuplicateIndex
+from dq_engine.kernels import DEFAULT_BATCH_COLS, numeric_kernel
+from dq_engine.memory import CHUNK_COLS, MemoryGovernor, lookup_by_sketch, run_chunked, sample_rows
+from dq_engine.fuzzy import near_duplicates
+from dq_engine.keys import discover_keys
+from dq_engine.patterns import pattern_validation
+
+# with run_checks(workers=N), frames of at least this many cells run the per-column missing /
+# lookup checks in N processes over one shared copy of the frame (dq_engine.shared)
+PARALLEL_MIN_CELLS = 2_000_000
 
 def check_completeness(df: pd.DataFrame):
     completeness = {}
@@ -26,29 +53,44 @@ def check_completeness(df: pd.DataFrame):
 
     return completeness
 
-def run_original_checks(df: pd.DataFrame):
-    """
-    The original lightweight checks: completeness threshold, duplicates,
-    and a basic numeric type-conformance check. Returns completeness dict and list of violation dicts.
-    """
-    completeness = check_completeness(df)
+def missing_data_violations(df: pd.DataFrame, completeness, completeness_threshold=0.8, bitmap=None):
+    """"Missing Data" violation dicts for columns below the completeness threshold."""
     violations = []
-
-    # completeness check (threshold 80%)
     for col, v in completeness.items():
-        if v["pct_non_null"] < 0.8:
+        if v["pct_non_null"] < completeness_threshold:
+            if bitmap is not None:
+                bitmap.add("Missing Data", col, df[col].isnull())
             violations.append({
                 "column": col,
                 "type": "Missing Data",
+                "affected_rows": int(df[col].isnull().sum()),
+                "threshold_lower": completeness_threshold,
                 "details": f"{(1 - v['pct_non_null']) * 100:.1f}% missing"
             })
+    return violations
+
+
+def run_original_checks(df: pd.DataFrame, bitmap=None, completeness_threshold=0.8):
+    """
+    The original lightweight checks: completeness threshold, duplicates,
+    and a basic numeric type-conformance check. Returns completeness dict and list of violation dicts.
+    Failing rows are recorded in `bitmap` (ViolationBitmap) when given.
+    """
+    completeness = check_completeness(df)
+
+    # completeness check (default threshold 80%)
+    violations = missing_data_violations(df, completeness, completeness_threshold, bitmap=bitmap)
 
     # duplicate rows (full-row duplicates)
-    dup_rows = df[df.duplicated(keep="first")]
+    dup_mask = df.duplicated(keep="first")
+    dup_rows = df[dup_mask]
+    if bitmap is not None:
+        bitmap.add("Duplicate Rows", "ALL", dup_mask)
     if not dup_rows.empty:
         violations.append({
             "column": "ALL",
             "type": "Duplicate Rows",
+            "affected_rows": int(dup_rows.shape[0]),
             "details": f"{dup_rows.shape[0]} duplicate rows found"
         })
 
@@ -61,9 +103,13 @@ def run_original_checks(df: pd.DataFrame):
                 num_bad = int(converted.isnull().sum())
                 pct_bad = num_bad / max(1, ser.dropna().shape[0])
                 if pct_bad > 0.2 and pd.api.types.is_numeric_dtype(converted):
+                    if bitmap is not None:
+                        bitmap.add("Type Conformance", col, ser.notna() & pd.to_numeric(ser, errors="coerce").isnull())
                     violations.append({
                         "column": col,
                         "type": "Type Conformance",
+                        "affected_rows": num_bad,
+                        "threshold_upper": 0.2,
                         "details": f"{pct_bad*100:.1f}% values not numeric"
                     })
             except Exception:
@@ -71,146 +117,266 @@ def run_original_checks(df: pd.DataFrame):
 
     return completeness, violations
 
-def run_checks(df: pd.DataFrame, profile: dict = None):
+# execution order, cheap checks first (the violations table keeps its own order)
+CHECK_ORDER = (
+    "datatype", "completeness_table", "missing", "range", "outliers", "lookup", "contact", "rules",
+    "patterns", "keys", "duplicates", "history", "foreign_keys", "spikes", "near_duplicates",
+)
+
+
+def select_checks(checks=None, exclude=None):
+    """run_checks steps to run, in execution order; unknown names raise ValueError."""
+    unknown = (set(checks or ()) | set(exclude or ())) - set(CHECK_ORDER)
+    if unknown:
+        raise ValueError(f"unknown checks: {sorted(unknown)} (choose from {list(CHECK_ORDER)})")
+    return [k for k in CHECK_ORDER if (checks is None or k in checks) and k not in set(exclude or ())]
+
+
+def select_columns(df: pd.DataFrame, columns=None, exclude=None) -> pd.DataFrame:
+    if columns is None and not exclude:
+        return df
+    missing = [c for c in list(columns or []) + list(exclude or []) if c not in df.columns]
+    if missing:
+        raise ValueError(f"unknown columns: {missing}")
+    keep = [c for c in (columns if columns is not None else df.columns) if c not in set(exclude or ())]
+    return df[keep]
+
+
+def run_checks(df: pd.DataFrame, profile: dict = None, rules=None, progress=None, memory=None, history=None,
+               columns=None, exclude_columns=None, checks=None, exclude_checks=None, min_score=None,
+               workers=None):
     """
     Unified run_checks:
-    - Runs validations (datatype / range / nulls / lookup / email-phone / duplicates / fk / anomalies)
+    - Runs validations (datatype / range / nulls / lookup / value shapes / email-phone / keys & duplicates / fk / anomalies)
     - Runs original checks (completeness / duplicates / simple type conformance)
+    - Runs a declarative rule spec when `rules` is given (dict / JSON / YAML, see dq_engine.rules)
     - Aggregates violations and computes dq_score
+    progress(step_name) is called before each validation (exceptions it raises propagate).
     Returns:
       {
-        "violations": pd.DataFrame,
+        "violations": pd.DataFrame,   # typed, see dq_engine.violation_table
         "dq_score": float,
         "validations": { ... },
-        "completeness": { ... }
+        "completeness": { ... },
+        "bitmap": ViolationBitmap   # failing rows per (type, column)
+        "short_circuited": bool,    # min_score: stopped early, the results are partial
+        "execution": {"ran", "skipped", "max_score", "min_score"},
+        "memory": {...}             # with `memory`: budget, footprint, per-stage strategy / peak memory
       }
+    columns / exclude_columns: check only these columns (full-row duplicates compare them only).
+    checks / exclude_checks: step names from CHECK_ORDER; steps run cheapest first. The
+    original checks (completeness / duplicate rows / type conformance) always run.
+    min_score: fail fast - stop as soon as compute_dq_score can no longer reach min_score
+    (completeness is known up front and violations only add penalty). The partial result has
+    short_circuited=True and a dq_score no lower than the full run's (fewer violations counted).
+    memory: None, "auto", a budget in bytes or a MemoryGovernor (see dq_engine.memory). Stages
+    whose estimated memory doesn't fit switch to cheaper strategies (row / column chunks, a row
+    sample, sketches, skipping optional checks); lookup by sketch records no failing rows.
+    history: a DuplicateIndex or its directory (see dq_engine.history). Rows an earlier batch
+    already had are added to "Duplicate Rows", then df's fingerprints are appended.
+    workers: worker processes for the missing / lookup checks of frames of PARALLEL_MIN_CELLS
+    cells or more (see dq_engine.shared.parallel_validation); None runs everything in-process.
     """
-    # 1) run the validation modules
-    validations = {}
-    # datatype
-    try:
-        validations["datatype"] = datatype_validation(df)
-    except Exception:
-        validations["datatype"] = pd.DataFrame()
-    # range
+    df = select_columns(df, columns, exclude_columns)
+    selected = select_checks(checks, exclude_checks)
+    governor = MemoryGovernor.coerce(memory)
+    if governor is None:
+        return _run_checks(df, profile, rules, progress, None, history, selected, min_score, workers)
+    governor.begin(df)
     try:
-        validations["range"] = range_validation(df)
-    except Exception:
-        validations["range"] = None
-    # missing / blanks
-    try:
-        validations["missing"] = null_blank_validation(df)
-    except Exception:
-        validations["missing"] = pd.DataFrame()
-    # lookup
-    try:
-        validations["lookup"] = lookup_validation(df)
-    except Exception:
-        validations["lookup"] = None
-    # contact (email/phone)
-    try:
-        validations["contact"] = email_phone_validation(df)
-    except Exception:
-        validations["contact"] = None
-    # duplicates & fk & statistical anomalies (these return DataFrames or None)
-    try:
-        validations["duplicates"] = duplicate_detection(df)
-    except Exception:
-        validations["duplicates"] = None
-    try:
-        validations["foreign_keys"] = foreign_key_validation(df)
-    except Exception:
-        validations["foreign_keys"] = None
-    try:
-        validations["outliers"] = outlier_detection(df)
-    except Exception:
-        validations["outliers"] = None
-    try:
-        validations["spikes"] = spike_drop_detection(df)
-    except Exception:
-        validations["spikes"] = None
-    # completeness score table
-    try:
-        validations["completeness_table"] = completeness_score(df)
-    except Exception:
-        validations["completeness_table"] = None
-
-    # 2) run original checks and gather violations
-    completeness, orig_violations = run_original_checks(df)
-
-    # 3) convert validation outputs into violation entries when needed
-    # - Range violations
-    if validations.get("range") is not None and not validations["range"].empty:
-        for _, row in validations["range"].iterrows():
-            if int(row.get("invalid_values", 0)) > 0:
-                orig_violations.append({
-                    "column": row.get("column"),
-                    "type": "Range Violation",
-                    "details": f"{int(row.get('invalid_values'))} values outside {row.get('rule_range')}"
-                })
-
-    # - Missingness high (>20%)
-    if isinstance(validations.get("missing"), pd.DataFrame) and not validations["missing"].empty:
-        for _, row in validations["missing"].iterrows():
-            nulls = int(row.get("nulls", 0))
-            blanks = int(row.get("blanks", 0))
-            total_missing = nulls + blanks
-            denom = len(df) if len(df) > 0 else 1
-            pct_missing = round((total_missing / denom) * 100, 2)
-            if total_missing > 0 and pct_missing > 20:
-                orig_violations.append({
-                    "column": row.get("column"),
-                    "type": "High Missingness",
-                    "details": f"{total_missing} missing/blank cells (~{pct_missing}%)"
-                })
-
-    # - Lookup violations
-    if validations.get("lookup") is not None and not validations["lookup"].empty:
-        for _, row in validations["lookup"].iterrows():
-            if int(row.get("invalid_values_count", 0)) > 0:
-                orig_violations.append({
-                    "column": row.get("column"),
-                    "type": "Lookup Violation",
-                    "details": f"{int(row.get('invalid_values_count'))} values not in top allowed categories"
-                })
-
-    # - Contact (email/phone) violations
-    if validations.get("contact") is not None and not validations["contact"].empty:
-        for _, row in validations["contact"].iterrows():
-            if int(row.get("invalid_count", 0)) > 0:
-                t = row.get("type", "contact")
-                orig_violations.append({
-                    "column": row.get("column"),
-                    "type": f"{t.capitalize()} Validation",
-                    "details": f"{int(row.get('invalid_count'))} invalid {t} values"
-                })
-
-    # - Duplicates, foreign keys, outliers, spikes -> add as violations
-    for key in ("duplicates", "foreign_keys", "outliers", "spikes"):
-        frame = validations.get(key)
-        if isinstance(frame, pd.DataFrame) and not frame.empty:
-            for _, row in frame.iterrows():
-                # some frames may be simple violation rows already
-                if "type" in row:
-                    orig_violations.append(row.to_dict())
-                else:
-                    orig_violations.append({
-                        "column": row.get("column", "ALL"),
-                        "type": row.get("type", key),
-                        "details": row.get("details", "")
-                    })
+        result = _run_checks(df, profile, rules, progress, governor, history, selected, min_score, workers)
+    finally:
+        governor.end()
+    result["memory"] = governor.report()
+    return result
+
+
+def _stage(governor, name):
+    """(strategy, context manager recording the stage) - always "full" without a governor."""
+    if governor is None:
+        return "full", nullcontext()
+    strategy = governor.strategy(name)
+    return strategy, governor.stage(name, strategy)
+
+
+_RAISE = object()   # on_error: let the exception propagate (caller-provided spec / index)
+
+
+def _run_checks(df, profile, rules, progress, governor, history, selected, min_score, workers=None):
+    bitmap = ViolationBitmap(len(df))
+    text = TextCache(df)  # shared factorized text columns for null/blank, lookup, contact and rule checks
+    plan = compile_rules(rules, df.columns) if rules is not None else None
+    settings = plan["settings"] if plan is not None else DEFAULT_SETTINGS
+    index = history if history is None or isinstance(history, DuplicateIndex) else DuplicateIndex(history)
+
+    # shared numeric stats (one fused pass) for range / outlier / spike checks, on first use
+    shared = {}
+    stats_users = {"outliers", "spikes"} | ({"range"} if settings["heuristics"] else set())
+
+    def numeric_stats():
+        if "stats" not in shared:
+            stats = (profile or {}).get("numeric_stats")
+            if stats is None or not stats.compatible(spike_threshold=settings["spike_threshold"]):
+                strategy, recorded = _stage(governor, "stats")
+                with recorded:
+                    try:
+                        stats = numeric_kernel(df, range_rule=heuristic_range_bounds,
+                                               spike_threshold=settings["spike_threshold"],
+                                               batch_cols=CHUNK_COLS if strategy == "chunked" else DEFAULT_BATCH_COLS)
+                    except Exception:
+                        stats = None
+            shared["stats"] = stats
+        return shared["stats"]
+
+    def per_column(func, **kwargs):
+        # column groups in worker processes attached to one shared copy of df, on large frames
+        if workers is not None and workers > 1 and df.shape[1] > 1 and df.size >= PARALLEL_MIN_CELLS:
+            from dq_engine.shared import parallel_validation
+            return parallel_validation(df, func, max_workers=workers, bitmap=bitmap, cache=text, **kwargs)
+        return func(df, bitmap=bitmap, cache=text, **kwargs)
+
+    # 1) the validation modules: key -> (call, value on failure, violations converter)
+    steps = {
+        "datatype": (lambda: datatype_validation(df), pd.DataFrame(), None),
+        "range": (lambda: range_validation(df, bitmap=bitmap, stats=numeric_stats()) if settings["heuristics"] else None,
+                  None, from_range),
+        # missing / blanks
+        "missing": (lambda: per_column(null_blank_validation, pct_threshold=settings["missing_pct_threshold"]),
+                    pd.DataFrame(),
+                    lambda v: from_missing(v, len(df), settings["missing_pct_threshold"])),
+        "lookup": (lambda: per_column(lookup_validation), None, from_lookup),
+        # value shapes (AA9 9AA): rare formats in patterned text columns
+        "patterns": (lambda: pattern_validation(df, bitmap=bitmap, cache=text, rare_pct=settings["pattern_rare_pct"]),
+                     None, from_patterns),
+        # contact (email/phone)
+        "contact": (lambda: email_phone_validation(df, bitmap=bitmap, cache=text) if settings["heuristics"] else None,
+                    None, from_contact),
+        # declarative rules (one fused pass per column); errors surface since the spec is user-provided
+        "rules": (lambda: execute_plan(df, plan, bitmap=bitmap, cache=text), _RAISE, lambda v: v[1]),
+        # candidate keys, then duplicates of those keys & fk & statistical anomalies
+        "keys": (lambda: discover_keys(df, max_columns=settings["key_max_columns"],
+                                       tolerance=settings["key_tolerance"]), None, None),
+        "duplicates": (lambda: duplicate_detection(df, bitmap=bitmap, keys=validations.get("keys"),
+                                                   tolerance=settings["key_tolerance"],
+                                                   max_columns=settings["key_max_columns"]),
+                       None, from_duplicates),
+        # duplicates of earlier batches (persistent index); errors surface since the index is caller state
+        "history": (lambda: index.check(df, bitmap=bitmap), _RAISE, None),
+        "near_duplicates": (lambda: near_duplicates(
+            df, columns=settings["near_duplicate_columns"], threshold=settings["near_duplicate_threshold"],
+            cache=text, bitmap=bitmap,
+        ) if settings["near_duplicates"] else None, None, lambda v: (v or {}).get("violations")),
+        "foreign_keys": (lambda: foreign_key_validation(df, bitmap=bitmap), None,
+                         lambda v: from_rule_frame(v, "foreign_keys")),
+        "outliers": (lambda: outlier_detection(df, bitmap=bitmap, stats=numeric_stats()), None,
+                     lambda v: from_rule_frame(v, "outliers")),
+        "spikes": (lambda: spike_drop_detection(
+            df, bitmap=bitmap, threshold=settings["spike_threshold"], stats=numeric_stats(),
+            time_col=settings["timestamp_column"], entity_cols=settings["entity_columns"],
+            method=settings["spike_method"], window=settings["spike_window"], z_threshold=settings["spike_z"],
+        ), None, lambda v: from_rule_frame(v, "spikes")),
+        # completeness score table
+        "completeness_table": (lambda: completeness_score(df), None, None),
+    }
+    def missing_chunked():
+        # chunks can't apply the threshold (it's over all rows): record every column, keep those over it
+        scratch = ViolationBitmap(len(df))
+        out = run_chunked(null_blank_validation, df, bitmap=scratch, pct_threshold=-1.0)
+        over = from_missing(out, len(df), settings["missing_pct_threshold"])
+        for rule, col in scratch.keys():
+            if over is not None and col in set(over["column"]):
+                bitmap.add(rule, col, scratch.mask(rule, col))
+        return out
+
+    # cheaper strategies the memory governor switches to (see dq_engine.memory.FALLBACKS)
+    cheaper = {
+        "missing": missing_chunked,
+        "contact": lambda: run_chunked(email_phone_validation, df, bitmap=bitmap) if settings["heuristics"] else None,
+        "lookup": lambda: lookup_by_sketch(df),
+        "keys": lambda: discover_keys(sample_rows(df), max_columns=settings["key_max_columns"],
+                                      tolerance=settings["key_tolerance"]),
+    }
+    todo = [k for k in selected if not (k == "rules" and plan is None or k == "history" and index is None)]
+
+    # fail fast: the score's completeness part is known up front, violations only lower it
+    completeness = orig_violations = None
+    max_score = None
+    if min_score is not None:
+        completeness = check_completeness(df)
+        avg = float(np.mean([v["pct_non_null"] for v in completeness.values()])) if completeness else 1.0
+        n_violations = sum(v["pct_non_null"] < settings["completeness_threshold"] for v in completeness.values())
+        max_score = compute_dq_score(avg, n_violations)
+
+    validations, ran = {}, []
+    rule_violations = None
+    while todo and (max_score is None or max_score >= min_score):
+        key = todo.pop(0)
+        call, on_error, convert = steps[key]
+        # progress runs outside the try so a cancellation raised there propagates
+        if progress is not None:
+            progress(key)
+        if key in stats_users and (governor is None or governor.strategy(key) != "skip"):
+            numeric_stats()   # a stage of its own: nested in the consumer's it would reset that stage's peaks
+        strategy, recorded = _stage(governor, key)
+        with recorded:
+            if strategy == "skip":
+                value = None
+            else:
+                try:
+                    value = (call if strategy == "full" else cheaper[key])()
+                except Exception:
+                    if on_error is _RAISE:
+                        raise
+                    value = on_error
+        ran.append(key)
+        if key == "rules":
+            validations["rules"], rule_violations = value
+        else:
+            validations[key] = value
+        if max_score is not None and convert is not None:
+            found = convert(value)
+            n_violations += len(found) if isinstance(found, pd.DataFrame) else 0
+            max_score = compute_dq_score(avg, n_violations)
+    short_circuited = bool(todo)
+
+    # 2) run original checks and gather violations (only missing data once short-circuited)
+    if short_circuited:
+        orig_violations = missing_data_violations(df, completeness, settings["completeness_threshold"], bitmap=bitmap)
+    else:
+        if progress is not None:
+            progress("original_checks")
+        with _stage(governor, "original_checks")[1]:
+            completeness, orig_violations = run_original_checks(
+                df, bitmap=bitmap, completeness_threshold=settings["completeness_threshold"]
+            )
 
-    # assemble violations DataFrame
-    violations_df = pd.DataFrame(orig_violations)
+    # 3) convert validation outputs into typed violation frames (one vectorized step per validation)
+    violations_df = concat_violations([
+        from_records(orig_violations),
+        from_range(validations.get("range")),
+        from_missing(validations.get("missing"), len(df), settings["missing_pct_threshold"]),
+        from_lookup(validations.get("lookup")),
+        from_patterns(validations.get("patterns")),
+        from_contact(validations.get("contact")),
+        from_duplicates(validations.get("duplicates"), validations.get("history")),
+        (validations.get("near_duplicates") or {}).get("violations"),
+        from_rule_frame(validations.get("foreign_keys"), "foreign_keys"),
+        from_rule_frame(validations.get("outliers"), "outliers"),
+        from_rule_frame(validations.get("spikes"), "spikes"),
+        rule_violations,
+    ])
 
     # 4) compute DQ score
     avg_completeness = float(np.mean([v["pct_non_null"] for v in completeness.values()])) if len(completeness) > 0 else 1.0
-    dq_score = compute_dq_score(avg_completeness, len(orig_violations))
+    dq_score = compute_dq_score(avg_completeness, len(violations_df))
 
     # 5) return everything as a dict
     return {
         "violations": violations_df,
         "dq_score": dq_score,
         "validations": validations,
-        "completeness": completeness
+        "completeness": completeness,
+        "bitmap": bitmap,
+        "short_circuited": short_circuited,
+        "execution": {"ran": ran, "skipped": todo, "max_score": max_score, "min_score": min_score},
     }
@@ -0,0 +1,234 @@
+# dq_engine/fuzzy.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.normalize import TextCache
+from dq_engine.violation_table import empty_violations, make_violations
+
+# Near-duplicate rows ("Jon Smith, 12 Main St" vs "John Smith, 12 Main Street").
+# Rows are reduced to one canonical text; work happens on the distinct texts only.
+# Each text gets a MinHash signature over its character 3-grams (computed for a whole
+# batch at once from one byte buffer), LSH banding turns signatures into candidate
+# pairs, and candidates are verified with a rapidfuzz scorer. Verified pairs are
+# merged into clusters. Cost is linear in rows plus the candidate pairs. Unrelated texts
+# still share some grams (Jaccard around BACKGROUND_JACCARD), so the rows per band grow
+# with log(n) to keep their chance collisions at about CANDIDATES_PER_TEXT per text.
+
+BANDS = 16
+BACKGROUND_JACCARD = 0.15
+CANDIDATES_PER_TEXT = 10
+SHINGLE = 3
+THRESHOLD = 85.0
+MAX_BUCKET = 50        # larger LSH buckets are compared within a sliding window only
+BATCH_TEXTS = 200_000  # distinct texts per MinHash batch
+
+
+# --------------------------
+# Texts
+# --------------------------
+
+def _text_columns(df):
+    return [c for c in df.columns
+            if not pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_datetime64_any_dtype(df[c])]
+
+
+def row_texts(df, columns=None, cache=None):
+    """One canonical string per row (lower case, punctuation folded to spaces); None if all empty."""
+    cache = cache or TextCache(df)
+    columns = list(columns) if columns is not None else _text_columns(df)
+    parts = []
+    for c in columns:
+        canon = cache.materialize(c, "canonical")
+        parts.append(canon.fillna("").str.replace(r"[^\w\s]", " ", regex=True))
+    if not parts:
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+    text = parts[0].str.cat(parts[1:], sep=" ") if len(parts) > 1 else parts[0]
+    text = text.str.split().str.join(" ")
+    return text.where(text.str.len() > 0)
+
+
+# --------------------------
+# MinHash / LSH
+# --------------------------
+
+def _permutations(num_perm, seed):
+    """Multiply-shift hash parameters: h(x) = (a * x + b) mod 2**64 >> 32, a odd."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+    return a, b
+
+
+def band_rows(n, bands=BANDS):
+    """Rows per LSH band so that n^2/2 * bands * BACKGROUND_JACCARD^rows ~ CANDIDATES_PER_TEXT * n."""
+    if n < 2:
+        return 4
+    r = math.log(2 * CANDIDATES_PER_TEXT / (n * bands)) / math.log(BACKGROUND_JACCARD)
+    return int(min(10, max(4, math.ceil(r))))
+
+
+def minhash(texts, num_perm=BANDS * 4, shingle=SHINGLE, seed=1):
+    """
+    (len(texts), num_perm) uint32 MinHash signatures over character `shingle`-grams.
+    All texts of the batch are packed into one byte buffer; grams are read with strided
+    integer arithmetic and reduced per text with np.minimum.reduceat - no per-text Python loop.
+    """
+    encoded = [f" {t} ".encode("utf-8") for t in texts]
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    n_grams = np.maximum(lengths - shingle + 1, 1)
+
+    # gram i of text t starts at starts[t] + i; texts shorter than a gram use what they have
+    owner = np.repeat(np.arange(len(texts)), n_grams)
+    offset = np.arange(n_grams.sum()) - np.repeat(np.cumsum(n_grams) - n_grams, n_grams)
+    pos = starts[owner] + offset
+    end = starts[owner] + lengths[owner]
+    grams = np.zeros(len(pos), dtype=np.uint64)
+    for k in range(shingle):
+        idx = np.minimum(pos + k, len(buf) - 1)
+        grams = (grams << np.uint64(8)) | np.where(pos + k < end, buf[idx], np.uint64(0))
+
+    a, b = _permutations(num_perm, seed)
+    sig = np.empty((len(texts), num_perm), dtype=np.uint32)
+    first = np.cumsum(n_grams) - n_grams
+    shift = np.uint64(32)
+    for i in range(num_perm):
+        h = (a[i] * grams + b[i]) >> shift   # wraps mod 2**64
+        sig[:, i] = np.minimum.reduceat(h, first)
+    return sig
+
+
+def lsh_pairs(signatures, bands=BANDS, max_bucket=MAX_BUCKET):
+    """Candidate pairs (i < j) sharing at least one band; (m, 2) int64 array without repeats."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    mix = np.random.default_rng(0).integers(0, 1 << 63, rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    pairs = []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = (block * mix).sum(axis=1)   # band key; wraps mod 2**64
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # buckets = runs of equal keys; pair each member with the next `window` members
+        for step in range(1, max_bucket):
+            same = sorted_keys[step:] == sorted_keys[:-step]
+            if not same.any():
+                break
+            pairs.append(np.column_stack([order[:-step][same], order[step:][same]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1).astype(np.int64)
+    flat = np.unique(pairs[:, 0] * n + pairs[:, 1])
+    return np.column_stack([flat // n, flat % n])
+
+
+# --------------------------
+# Verification / clusters
+# --------------------------
+
+def _scorer(name):
+    from rapidfuzz import fuzz
+    return getattr(fuzz, name)
+
+
+def verify_pairs(texts, pairs, scorer="token_sort_ratio", threshold=THRESHOLD):
+    """rapidfuzz scores of candidate pairs; returns (pairs, scores) at or above threshold."""
+    if len(pairs) == 0:
+        return pairs, np.empty(0)
+    fn = _scorer(scorer)
+    left, right = texts[pairs[:, 0]], texts[pairs[:, 1]]
+    try:
+        from rapidfuzz.process import cpdist
+        scores = cpdist(left, right, scorer=fn, workers=-1)
+    except ImportError:   # rapidfuzz < 3.6
+        scores = np.array([fn(x, y) for x, y in zip(left, right)])
+    keep = scores >= threshold
+    return pairs[keep], scores[keep]
+
+
+def _components(n, pairs):
+    """Connected-component label per node: the smallest node of its component."""
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    smallest = np.full(labels.max() + 1 if n else 0, n, dtype=np.int64)
+    np.minimum.at(smallest, labels, np.arange(n))
+    return smallest[labels]
+
+
+# --------------------------
+# Public API
+# --------------------------
+
+def near_duplicates(df: pd.DataFrame, columns=None, threshold=THRESHOLD, scorer="token_sort_ratio",
+                    bands=BANDS, rows=None, max_bucket=MAX_BUCKET, cache=None, bitmap=None, seed=1):
+    """
+    Near-duplicate row clusters over the text of `columns` (default: all text columns).
+    Rows with identical canonical text are one node; a cluster is reported when it holds at
+    least two different raw rows (plain copies are duplicate_detection's "Duplicate Rows").
+    Returns {"clusters": DataFrame[cluster, row, text], "pairs": DataFrame[left, right, score],
+    "violations": violations frame}. Rows beyond the first of each cluster go to `bitmap`
+    as ("Near Duplicate Rows", "ALL").
+    """
+    columns = list(columns) if columns is not None else _text_columns(df)
+    text = row_texts(df, columns, cache)
+    codes, uniques = pd.factorize(text)
+    uniques = np.asarray(uniques, dtype=object)
+    empty = {
+        "clusters": pd.DataFrame(columns=["cluster", "row", "text"]),
+        "pairs": pd.DataFrame(columns=["left", "right", "score"]),
+        "violations": empty_violations(),
+    }
+    if len(uniques) == 0:
+        return empty
+
+    pairs, scores = np.empty((0, 2), dtype=np.int64), np.empty(0)
+    if len(uniques) > 1:
+        num_perm = bands * (rows or band_rows(len(uniques), bands))
+        sig = np.concatenate([minhash(uniques[i:i + BATCH_TEXTS], num_perm, seed=seed)
+                              for i in range(0, len(uniques), BATCH_TEXTS)])
+        pairs, scores = verify_pairs(uniques, lsh_pairs(sig, bands, max_bucket), scorer, threshold)
+
+    # a cluster = one component of matching texts holding at least two different raw rows
+    # ("Alice Wong" / "alice  wong" share a canonical text but aren't exact duplicates)
+    label = _components(len(uniques), pairs)
+    raw = pd.factorize(pd.util.hash_pandas_object(df[columns], index=False).to_numpy())[0]
+    valid = np.flatnonzero(codes >= 0)
+    frame = pd.DataFrame({"cluster": label[codes[valid]], "row": valid, "raw": raw[valid]})
+    variants = frame.groupby("cluster")["raw"].transform("nunique")
+    clusters = frame[variants.to_numpy() > 1].sort_values(["cluster", "row"], kind="stable")
+    if clusters.empty:
+        return empty
+    clusters["cluster"] = pd.factorize(clusters["cluster"])[0]
+    shown = df.iloc[clusters["row"].to_numpy()][columns].astype(str)
+    clusters["text"] = shown.iloc[:, 0].str.cat([shown[c] for c in shown.columns[1:]], sep=", ").to_numpy()
+    # near duplicates: rows differing from the first variant of their cluster (exact copies of
+    # a variant are already Duplicate Rows)
+    extra = (clusters["raw"] != clusters.groupby("cluster")["raw"].transform("first")).to_numpy()
+    clusters = clusters.drop(columns="raw").reset_index(drop=True)
+
+    if bitmap is not None:
+        mask = np.zeros(len(df), dtype=bool)
+        mask[clusters["row"].to_numpy()[extra]] = True
+        bitmap.add("Near Duplicate Rows", "ALL", mask)
+
+    n_clusters = int(clusters["cluster"].nunique())
+    affected = int(extra.sum())
+    first = clusters[clusters["cluster"].to_numpy() < 5]   # clusters are numbered 0.. in order
+    samples = [grp["text"].drop_duplicates().head(3).tolist() for _, grp in first.groupby("cluster", sort=True)]
+    violations = make_violations(
+        ["ALL"], "Near Duplicate Rows", affected,
+        f"{affected} rows in {n_clusters} near-duplicate clusters (score >= {threshold:g})",
+        params=[{"clusters": n_clusters, "scorer": scorer, "samples": samples}],
+    )
+    return {
+        "clusters": clusters,
+        "pairs": pd.DataFrame({"left": uniques[pairs[:, 0]], "right": uniques[pairs[:, 1]], "score": scores}),
+        "violations": violations,
+    }
@@ -0,0 +1,247 @@
+# dq_engine/history.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.reconcile import NULL_HASH, _column_hash
+
+# Persistent duplicate index for append-only feeds: every batch is checked against the
+# fingerprints of all earlier batches, so replayed rows / events are caught across days.
+# A fingerprint is a uint64 hash of the whole row or of its key columns (numbers hash as
+# float64, so an int column and a float column of the same values agree). On disk:
+#   base.<n>.u64   sorted fingerprints, memory-mapped; looked up with one searchsorted per batch
+#   delta.<n>.u64  fingerprints appended since the last compaction (unsorted, kept small)
+#   bloom.<n>.u8   optional Bloom filter in front of both: most new fingerprints never touch base
+#   meta.json      current file names, columns / keys, row counts, Bloom parameters
+# The delta is merged into base (compaction) once it passes `compact_ratio` of base. Compaction
+# writes generation n+1 next to n; replacing meta.json is the commit point, and only then are
+# the old files deleted, so a crash leaves either generation whole. One writer at a time.
+
+COMPACT_RATIO = 0.1          # compact when delta rows > this share of base rows
+COMPACT_MIN_ROWS = 1_000_000 # ... and more than this many
+BLOOM_CAPACITY = 10_000_000  # fingerprints the filter is sized for (grown on compaction)
+BLOOM_FPR = 0.01
+
+
+# --------------------------
+# Fingerprints
+# --------------------------
+
+def fingerprints(df: pd.DataFrame, columns) -> np.ndarray:
+    """uint64 per row over `columns` (in that order); columns missing from df hash as null."""
+    names = {str(c): c for c in df.columns}   # the index stores column names as text
+    h = np.zeros(len(df), dtype=np.uint64)
+    for c in columns:
+        col = _column_hash(df[names[c]]) if c in names else np.full(len(df), NULL_HASH, dtype=np.uint64)
+        h = h * np.uint64(1000003) ^ col   # order-dependent, as reconcile's key hash
+    return h
+
+
+# --------------------------
+# Bloom filter
+# --------------------------
+
+def bloom_size(capacity, fpr=BLOOM_FPR):
+    """
+    (bits, hashes) for `capacity` items at false-positive rate `fpr`; bits a power of two.
+    Rounding bits up only lowers the rate, so hashes stay at the optimum for the exact size.
+    """
+    exact = -capacity * np.log(fpr) / np.log(2) ** 2
+    bits = 1 << max(13, int(np.ceil(np.log2(max(exact, 1)))))
+    per_item = max(capacity, 1)
+    hashes = min(round(bits / per_item * np.log(2)), round(max(exact, 1) / per_item * np.log(2)))
+    return bits, max(1, int(hashes))
+
+
+def _sorted_unique(fps):
+    fps = np.sort(fps)
+    return fps[np.r_[True, fps[1:] != fps[:-1]]] if len(fps) else fps
+
+
+def _bloom_positions(fps, bits, hashes):
+    """Bit positions per hash function: multiply-shift over the fingerprint."""
+    shift = np.uint64(64 - (bits.bit_length() - 1))
+    rng = np.random.default_rng(11)
+    mults = rng.integers(0, 1 << 63, hashes, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    return [((fps * m) >> shift).astype(np.int64) for m in mults]   # wraps mod 2**64
+
+
+# --------------------------
+# Index
+# --------------------------
+
+class DuplicateIndex:
+    """
+    Fingerprints of every row appended so far, stored under `path` (created if needed).
+    keys: columns identifying a row (event id, ...); None = the whole row, with the columns
+    of the first batch. bloom: keep a Bloom filter in front of the sorted array.
+    """
+
+    def __init__(self, path, keys=None, bloom=True, bloom_capacity=BLOOM_CAPACITY,
+                 compact_ratio=COMPACT_RATIO, compact_min_rows=COMPACT_MIN_ROWS):
+        self.path = str(path)
+        os.makedirs(self.path, exist_ok=True)
+        self.compact_ratio, self.compact_min_rows = compact_ratio, compact_min_rows
+        meta_path = self._file("meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as fh:
+                self.meta = json.load(fh)
+            if keys is not None and [str(k) for k in keys] != self.meta["keys"]:
+                raise ValueError(f"index at {self.path} is keyed on {self.meta['keys']}, not {list(keys)}")
+        else:
+            bits, hashes = bloom_size(bloom_capacity) if bloom else (0, 0)
+            self.meta = {"keys": [str(k) for k in keys] if keys is not None else None, "columns": None,
+                         "base_rows": 0, "delta_rows": 0, "batches": 0, "generation": 0,
+                         "base_file": "base.0.u64", "delta_file": "delta.0.u64",
+                         "bloom_file": "bloom.0.u8" if bits else None,
+                         "bloom_bits": bits, "bloom_hashes": hashes, "bloom_capacity": bloom_capacity if bloom else 0}
+            open(self._file("delta.0.u64"), "wb").close()
+            if bits:
+                np.zeros(bits // 8, dtype=np.uint8).tofile(self._file("bloom.0.u8"))
+            self._save_meta()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _save_meta(self):
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as fh:
+            json.dump(self.meta, fh)
+        os.replace(tmp, self._file("meta.json"))
+
+    def __len__(self):
+        return self.meta["base_rows"] + self.meta["delta_rows"]
+
+    @property
+    def columns(self):
+        return self.meta["keys"] or self.meta["columns"]
+
+    def fingerprints(self, df: pd.DataFrame) -> np.ndarray:
+        return fingerprints(df, self.columns or [str(c) for c in df.columns])
+
+    # -------------------------------------------------------------
+    # storage
+    # -------------------------------------------------------------
+    def _base(self):
+        if not self.meta["base_rows"]:
+            return np.empty(0, dtype=np.uint64)
+        return np.memmap(self._file(self.meta["base_file"]), dtype=np.uint64, mode="r", shape=(self.meta["base_rows"],))
+
+    def _delta(self):
+        if not self.meta["delta_rows"]:
+            return np.empty(0, dtype=np.uint64)
+        return np.sort(np.fromfile(self._file(self.meta["delta_file"]), dtype=np.uint64, count=self.meta["delta_rows"]))
+
+    def _bloom(self, mode="r"):
+        if not self.meta["bloom_bits"]:
+            return None
+        return np.memmap(self._file(self.meta["bloom_file"]), dtype=np.uint8, mode=mode)
+
+    def _bloom_add(self, fps):
+        bloom = self._bloom("r+")
+        if bloom is None or not len(fps):
+            return
+        for pos in _bloom_positions(fps, self.meta["bloom_bits"], self.meta["bloom_hashes"]):
+            # OR the bits of each touched byte together (sort + reduceat is much faster than ufunc.at)
+            pos = _sorted_unique(pos.astype(np.uint64)).astype(np.int64)
+            byte = pos >> 3
+            starts = np.flatnonzero(np.r_[True, byte[1:] != byte[:-1]])
+            bits = np.bitwise_or.reduceat(np.uint8(1) << (pos & 7).astype(np.uint8), starts)
+            bloom[byte[starts]] |= bits
+        bloom.flush()
+
+    # -------------------------------------------------------------
+    # lookup / append
+    # -------------------------------------------------------------
+    def contains(self, fps) -> np.ndarray:
+        """Boolean mask: fingerprint already in the index (no false positives: the filter only prunes)."""
+        fps = np.asarray(fps, dtype=np.uint64)
+        found = np.zeros(len(fps), dtype=bool)
+        if not len(self) or not len(fps):
+            return found
+        candidates = np.ones(len(fps), dtype=bool)
+        bloom = self._bloom()
+        if bloom is not None:
+            for pos in _bloom_positions(fps, self.meta["bloom_bits"], self.meta["bloom_hashes"]):
+                candidates &= ((bloom[pos >> 3] >> (pos & 7).astype(np.uint8)) & 1) == 1
+        queries = fps[candidates]
+        hit = np.zeros(len(queries), dtype=bool)
+        for sorted_fps in (self._base(), self._delta()):
+            if len(sorted_fps):
+                i = np.minimum(np.searchsorted(sorted_fps, queries), len(sorted_fps) - 1)
+                hit |= np.asarray(sorted_fps[i]) == queries
+        found[candidates] = hit
+        return found
+
+    def append(self, fps, columns=None):
+        """Add fingerprints not yet indexed; returns how many were added. Compacts when due."""
+        if self.meta["keys"] is None and self.meta["columns"] is None and columns is not None:
+            self.meta["columns"] = [str(c) for c in columns]
+        fps = _sorted_unique(np.asarray(fps, dtype=np.uint64))
+        new = fps[~self.contains(fps)]
+        if len(new):
+            delta = self._file(self.meta["delta_file"])
+            os.truncate(delta, self.meta["delta_rows"] * 8)   # drop rows of an append meta never recorded
+            with open(delta, "ab") as fh:
+                new.tofile(fh)
+            self._bloom_add(new)
+        self.meta["delta_rows"] += int(len(new))
+        self.meta["batches"] += 1
+        self._save_meta()
+        if self.meta["delta_rows"] > max(self.compact_min_rows, self.compact_ratio * self.meta["base_rows"]):
+            self.compact()
+        return int(len(new))
+
+    def compact(self):
+        """Merge the delta into the sorted base (rebuilding the Bloom filter once it is over capacity)."""
+        if not self.meta["delta_rows"]:
+            return self
+        # appended fingerprints are never in base: a stable sort merges the two sorted runs
+        merged = np.sort(np.concatenate([self._base(), self._delta()]), kind="stable")
+        committed = dict(self.meta)
+        n = committed["generation"] + 1
+        try:
+            self.meta.update(generation=n, base_file=f"base.{n}.u64", delta_file=f"delta.{n}.u64",
+                             base_rows=int(len(merged)), delta_rows=0)
+            merged.tofile(self._file(self.meta["base_file"]))
+            open(self._file(self.meta["delta_file"]), "wb").close()
+            capacity = self.meta["bloom_capacity"]
+            if capacity and len(merged) > capacity:
+                while capacity < len(merged):
+                    capacity *= 2
+                bits, hashes = bloom_size(capacity)
+                self.meta.update(bloom_bits=bits, bloom_hashes=hashes, bloom_capacity=capacity,
+                                 bloom_file=f"bloom.{n}.u8")
+                np.zeros(bits // 8, dtype=np.uint8).tofile(self._file(self.meta["bloom_file"]))
+                self._bloom_add(merged)
+            self._save_meta()   # commit point
+        except BaseException:
+            self.meta = committed
+            raise
+        for key in ("base_file", "delta_file", "bloom_file"):
+            if committed[key] and committed[key] != self.meta[key]:
+                try:
+                    os.remove(self._file(committed[key]))
+                except FileNotFoundError:
+                    pass
+        return self
+
+    def check(self, df: pd.DataFrame, bitmap=None, append=True):
+        """
+        Rows of df whose fingerprint an earlier batch already had ("cross-batch" duplicates);
+        repeats within df count once (they are duplicate_detection's). Flagged rows go to
+        `bitmap` as ("Duplicate Rows", "ALL"). append: add df's fingerprints afterwards.
+        Returns {"keys", "rows", "cross_batch", "index_rows", "batches"}.
+        """
+        fps = self.fingerprints(df)
+        first = ~pd.Index(fps).duplicated()
+        cross = self.contains(fps) & first
+        if bitmap is not None:
+            bitmap.add("Duplicate Rows", "ALL", cross)
+        result = {"keys": self.meta["keys"], "rows": len(df), "cross_batch": int(cross.sum()),
+                  "index_rows": len(self), "batches": self.meta["batches"]}
+        if append:
+            self.append(fps, columns=df.columns)
+        return result
@@ -0,0 +1,318 @@
+# dq_engine/jobs.py
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+STAGES = ("read", "profile", "checks", "sheets", "report")
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+# run_checks' memory governor for pipeline runs: DQ_RUN_MEMORY is "auto" (default), a budget
+# in MB, or "off"
+def run_memory(value=None):
+    if value is None:
+        value = os.environ.get("DQ_RUN_MEMORY", "auto")
+    if not isinstance(value, str):
+        return value    # a budget in bytes or a MemoryGovernor
+    value = value.strip().lower()
+    if value in ("", "off", "none"):
+        return None
+    if value == "auto":
+        return "auto"
+    return int(float(value) * 1024 ** 2)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class NamedBytes(BytesIO):
+    """In-memory upload with a .name, as utils.io.read_file expects."""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+class Job:
+    def __init__(self, fn, args, kwargs, est_bytes=0, label=""):
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.est_bytes = int(est_bytes)
+        self.result_bytes = 0     # size of the retained result, once finished
+        self.status = QUEUED
+        self.events = []          # (time, stage, state, message)
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------
+    # called from the worker
+    # -------------------------------------------------------------
+    def report(self, stage, state="running", message=""):
+        with self._lock:
+            self.events.append((time.time(), stage, state, message))
+
+    def checkpoint(self, stage=None, message=""):
+        """Record progress and raise JobCancelled if cancellation was requested."""
+        if stage is not None:
+            self.report(stage, "running", message)
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    # -------------------------------------------------------------
+    # called from the UI / service
+    # -------------------------------------------------------------
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    def stages(self):
+        """Latest (state, message) per stage, in the order stages were reported."""
+        with self._lock:
+            events = list(self.events)
+        latest = {}
+        for _, stage, state, message in events:
+            latest[stage] = (state, message)
+        return latest
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; returns False on timeout."""
+        return self._finished.wait(timeout)
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobManager:
+    """
+    Background pool for DQ runs.
+    At most `max_workers` jobs run at once and the summed `est_bytes` of running jobs
+    stays under `max_memory_bytes` (a job larger than the budget runs alone).
+    Finished jobs are kept (newest `keep_finished`) so sessions can pick up results; their
+    results count against `max_memory_bytes` too, and the oldest are dropped to make room
+    (the newest finished job is always kept).
+    """
+
+    def __init__(self, max_workers=2, max_memory_bytes=None, keep_finished=32):
+        self.max_workers = max_workers
+        self.max_memory_bytes = max_memory_bytes
+        self.keep_finished = keep_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dq-job")
+        self._jobs = {}
+        self._pending = deque()
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, est_bytes=0, label="", **kwargs):
+        """Queue fn(job, *args, **kwargs); fn reports progress / checks cancellation through job."""
+        job = Job(fn, args, kwargs, est_bytes=est_bytes, label=label)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._pending.append(job)
+        self._dispatch()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        with self._lock:
+            if job in self._pending:
+                self._pending.remove(job)
+                self._finish(job, CANCELLED)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": len(self._pending),
+                "running": len(self._running),
+                "reserved_bytes": sum(j.est_bytes for j in self._running),
+                "retained_bytes": sum(j.result_bytes for j in self._jobs.values() if j.done),
+                "max_workers": self.max_workers,
+                "max_memory_bytes": self.max_memory_bytes,
+            }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pending, self._pending = list(self._pending), deque()
+            for job in pending:   # never started: finished here, so wait() returns
+                job.cancel()
+                self._finish(job, CANCELLED)
+        for job in list(self._jobs.values()):
+            if not job.done:
+                job.cancel()
+        self._pool.shutdown(wait=wait)
+
+    # -------------------------------------------------------------
+    # scheduling
+    # -------------------------------------------------------------
+    def _fits(self, job):
+        if len(self._running) >= self.max_workers:
+            return False
+        if self.max_memory_bytes is None or not self._running:
+            return True
+        return sum(j.est_bytes for j in self._running) + job.est_bytes <= self.max_memory_bytes
+
+    def _evict(self, room=0):
+        """Drop the oldest finished jobs past `keep_finished` or while their results plus running
+        reservations (plus `room`) are over the memory budget."""
+        finished = sorted((j for j in self._jobs.values() if j.done), key=lambda j: j.finished)
+        held = sum(j.result_bytes for j in finished) + sum(j.est_bytes for j in self._running) + room
+        while len(finished) > 1 and (len(finished) > self.keep_finished or
+                                     (self.max_memory_bytes is not None and held > self.max_memory_bytes)):
+            old = finished.pop(0)
+            held -= old.result_bytes
+            self._jobs.pop(old.id, None)
+        if finished and not self.keep_finished:
+            self._jobs.pop(finished[0].id, None)
+
+    def _dispatch(self):
+        with self._lock:
+            if self._pending:
+                self._evict(room=self._pending[0].est_bytes)
+            while self._pending and self._fits(self._pending[0]):
+                job = self._pending.popleft()
+                job.status = RUNNING
+                job.started = time.time()
+                self._running.add(job)
+                self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            job.result = job.fn(job, *job.args, **job.kwargs)
+            job.result_bytes = result_bytes(job.result)
+            status = DONE
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            job.error = e
+            status = FAILED
+        with self._lock:
+            self._running.discard(job)
+            self._finish(job, status)
+        self._dispatch()
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.time()
+        job.report("job", status, str(job.error) if job.error else "")
+        job._finished.set()
+        self._evict()
+
+
+def result_bytes(obj):
+    """Approximate memory held by a job result: frames, arrays, bytes and bitmaps, recursively."""
+    import numpy as np
+    import pandas as pd
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(index=True, deep=True)))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(result_bytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(result_bytes(v) for v in obj)
+    if hasattr(obj, "n_bytes") and hasattr(obj, "keys"):   # ViolationBitmap
+        return len(obj.keys()) * obj.n_bytes
+    return 0
+
+
+# --------------------------
+# The DQ pipeline as a job
+# --------------------------
+
+def run_pipeline(job, source, rules=None, make_pdf=True, all_sheets=True, memory=None):
+    """
+    read -> profile -> checks (one progress event per check) -> sheets -> report.
+    source: an upload-like object with .name/.read() (see NamedBytes), a file path or a DataFrame.
+    The first sheet of a workbook is the main dataset; with all_sheets every other sheet of a
+    multi-sheet .xlsx also gets its own profile and full run_checks with the same `rules`
+    (result["sheets"], which reuses the main results for the first sheet).
+    memory: run_checks' `memory` for every sheet (see run_memory); None reads DQ_RUN_MEMORY.
+    """
+    import pandas as pd
+    from dq_engine.profiler import profile_dataframe
+    from dq_engine.checks import run_checks
+    from utils.io import read_file
+
+    memory = run_memory(memory)
+    job.checkpoint("read")
+    start = time.perf_counter()
+    if isinstance(source, pd.DataFrame):
+        df = source
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            df = read_file(fh)
+    else:
+        df = read_file(source)
+    job.report("read", "complete", f"{df.shape[0]} rows x {df.shape[1]} columns")
+
+    job.checkpoint("profile")
+    profile = profile_dataframe(df)
+    job.report("profile", "complete")
+
+    job.checkpoint("checks")
+    checks = run_checks(df, profile, rules=rules, memory=memory,
+                        progress=lambda step: job.checkpoint("checks", step))
+    job.report("checks", "complete", f"{len(checks['violations'])} violations")
+    seconds = time.perf_counter() - start
+
+    sheets = None
+    name = str(source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", ""))
+    if all_sheets and name.lower().endswith(".xlsx"):
+        from dq_engine.workbook import check_workbook
+        from utils.io import excel_sheet_names
+        workbook = source if isinstance(source, (str, os.PathLike)) else getattr(source, "getvalue", lambda: None)()
+        names = excel_sheet_names(workbook) if workbook is not None else []
+        if len(names) > 1:
+            job.checkpoint("sheets")
+            # the first sheet is the main dataset above: only the others are parsed again
+            sheets = {names[0]: {"profile": profile, "checks": checks, "seconds": seconds}}
+            sheets.update(check_workbook(workbook, sheets=names[1:], full_checks=True, rules=rules,
+                                         memory=memory))
+            job.report("sheets", "complete", f"{len(sheets)} sheets")
+
+    pdf = None
+    if make_pdf:
+        job.checkpoint("report")
+        try:
+            from dq_engine import registry
+            buf = registry.get("pdf")(profile, checks)
+            pdf = buf.getvalue() if hasattr(buf, "getvalue") else buf.read()
+            job.report("report", "complete")
+        except Exception as e:
+            job.report("report", "error", str(e))
+
+    return {"df": df, "profile": profile, "checks": checks, "sheets": sheets, "pdf": pdf}
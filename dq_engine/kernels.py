@@ -0,0 +1,286 @@
+# dq_engine/kernels.py
+import warnings
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except Exception:
+    numba = None
+
+DEFAULT_BATCH_COLS = 32
+QUANTILES = (0.25, 0.5, 0.75, 0.99)
+STAT_COLUMNS = ["count", "min", "max", "mean", "std", "q1", "median", "q3", "q99"]
+
+
+def numeric_block(df: pd.DataFrame, cols) -> np.ndarray:
+    """rows x cols float64 block, NaN for missing values."""
+    return df[list(cols)].to_numpy(dtype="float64", na_value=np.nan)
+
+
+# --------------------------
+# Moments: count / min / max / mean / std (ddof=1)
+# --------------------------
+
+def _moments_numpy(block):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        count = (~np.isnan(block)).sum(axis=0).astype("float64")
+        return np.vstack([
+            count,
+            np.nanmin(block, axis=0),
+            np.nanmax(block, axis=0),
+            np.nanmean(block, axis=0),
+            np.nanstd(block, axis=0, ddof=1),
+        ])
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _moments_jit(block):
+        n, k = block.shape
+        out = np.full((5, k), np.nan)
+        for j in numba.prange(k):
+            cnt = 0
+            mn = np.inf
+            mx = -np.inf
+            mean = 0.0
+            m2 = 0.0
+            for i in range(n):
+                x = block[i, j]
+                if not np.isnan(x):
+                    cnt += 1
+                    if x < mn:
+                        mn = x
+                    if x > mx:
+                        mx = x
+                    d = x - mean
+                    mean += d / cnt
+                    m2 += d * (x - mean)
+            out[0, j] = cnt
+            if cnt > 0:
+                out[1, j] = mn
+                out[2, j] = mx
+                out[3, j] = mean
+            if cnt > 1:
+                out[4, j] = np.sqrt(m2 / (cnt - 1))
+        return out
+
+    def _moments(block):
+        return _moments_jit(np.ascontiguousarray(block))
+else:
+    _moments = _moments_numpy
+
+
+def _spike_masks(block, threshold):
+    """|pct_change| over each column's non-null sequence (row order) > threshold, as full-length masks."""
+    masks = np.zeros(block.shape, dtype=bool)
+    for j in range(block.shape[1]):
+        col = block[:, j]
+        pos = np.flatnonzero(~np.isnan(col))
+        if pos.size < 2:
+            continue
+        vals = col[pos]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.abs(vals[1:] / vals[:-1] - 1.0)
+        masks[pos[1:][change > threshold], j] = True
+    return masks
+
+
+# --------------------------
+# Fused kernel
+# --------------------------
+
+class NumericStats:
+    """
+    Result of numeric_kernel.
+      table        -> DataFrame indexed by column: count/min/max/mean/std/quartiles/q99,
+                      range bounds + invalid count, IQR bounds + outlier count, spike count
+      range_masks / outlier_masks / spike_masks -> {column: bool row mask} (non-empty only)
+    """
+
+    def __init__(self, table, range_masks, outlier_masks, spike_masks, params):
+        self.table = table
+        self.range_masks = range_masks
+        self.outlier_masks = outlier_masks
+        self.spike_masks = spike_masks
+        self.params = params
+
+    def __contains__(self, col):
+        return col in self.table.index
+
+    def row(self, col) -> dict:
+        return self.table.loc[col].to_dict()
+
+    def compatible(self, **params) -> bool:
+        return all(self.params.get(k) == v for k, v in params.items())
+
+
+def numeric_kernel(df: pd.DataFrame, cols=None, range_rule=None, iqr_k=1.5, spike_threshold=0.5,
+                   min_rows=5, batch_cols=DEFAULT_BATCH_COLS) -> NumericStats:
+    """
+    One pass per numeric column, processed in 2-D batches of `batch_cols` columns:
+    moments, quartiles, range-rule failures, IQR outlier masks and spike masks together.
+    range_rule(column, stats_dict) -> (lower, upper) or None.
+    Outliers and spikes need at least `min_rows` non-null values (as the validations do).
+    """
+    if cols is None:
+        cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    cols = list(cols)
+    n = len(df)
+    rows, range_masks, outlier_masks, spike_masks = [], {}, {}, {}
+
+    for start in range(0, len(cols), max(1, batch_cols)):
+        batch = cols[start:start + batch_cols]
+        block = numeric_block(df, batch)
+        moments = _moments(block)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            quants = np.nanquantile(block, QUANTILES, axis=0) if n else np.full((len(QUANTILES), len(batch)), np.nan)
+        stats = np.vstack([moments, quants])
+
+        iqr = stats[7] - stats[5]
+        iqr_lo, iqr_hi = stats[5] - iqr_k * iqr, stats[7] + iqr_k * iqr
+        enough = stats[0] >= min_rows
+        with np.errstate(invalid="ignore"):
+            outliers = ((block < iqr_lo) | (block > iqr_hi)) & enough
+        spikes = _spike_masks(block[:, enough], spike_threshold)
+
+        for j, col in enumerate(batch):
+            rec = dict(zip(STAT_COLUMNS, stats[:, j].tolist()))
+            rec["count"] = int(rec["count"])
+
+            lower = upper = np.nan
+            invalid = 0
+            bounds = range_rule(col, rec) if (range_rule is not None and rec["count"] > 0) else None
+            if bounds is not None:
+                lower, upper = float(bounds[0]), float(bounds[1])
+                with np.errstate(invalid="ignore"):
+                    bad = (block[:, j] < lower) | (block[:, j] > upper)
+                invalid = int(bad.sum())
+                if invalid:
+                    range_masks[col] = bad
+            rec.update({"range_lower": lower, "range_upper": upper, "range_invalid": invalid})
+
+            rec.update({"iqr_lower": float(iqr_lo[j]), "iqr_upper": float(iqr_hi[j]), "outliers": 0, "spikes": 0})
+            if enough[j]:
+                rec["outliers"] = int(outliers[:, j].sum())
+                if rec["outliers"]:
+                    outlier_masks[col] = outliers[:, j]
+                sm = spikes[:, int(enough[:j].sum())]
+                rec["spikes"] = int(sm.sum())
+                if rec["spikes"]:
+                    spike_masks[col] = sm
+            rows.append(rec)
+
+    table = pd.DataFrame(rows, index=pd.Index(cols, dtype=object))
+    params = {"iqr_k": iqr_k, "spike_threshold": spike_threshold, "min_rows": min_rows,
+              "range_rule": range_rule}
+    return NumericStats(table, range_masks, outlier_masks, spike_masks, params)
+
+
+# --------------------------
+# Streaming / chunked accumulation
+# --------------------------
+
+class NumericAccumulator:
+    """
+    Chunkable version of the kernel for streamed data.
+    Exact: count / min / max / mean / std (Chan merge), spikes across chunk boundaries,
+    range failures for fixed bounds. Quantiles come from a bounded random sample
+    (bottom-k random keys, so partial accumulators merge).
+    """
+
+    def __init__(self, cols, spike_threshold=0.5, bounds=None, sample_size=100_000, seed=0):
+        self.cols = list(cols)
+        k = len(self.cols)
+        self.spike_threshold = spike_threshold
+        self.bounds = bounds or {}
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(seed)
+        self.count = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self.spikes = np.zeros(k, dtype=np.int64)
+        self.range_invalid = np.zeros(k, dtype=np.int64)
+        self.first = np.full(k, np.nan)
+        self.last = np.full(k, np.nan)
+        self._keys = [np.empty(0) for _ in range(k)]
+        self._sample = [np.empty(0) for _ in range(k)]
+
+    def update(self, chunk: pd.DataFrame):
+        block = numeric_block(chunk, self.cols)
+        for j, col in enumerate(self.cols):
+            vals = block[:, j]
+            vals = vals[~np.isnan(vals)]
+            if vals.size == 0:
+                continue
+            self._merge_moments(j, vals.size, vals.mean(), ((vals - vals.mean()) ** 2).sum(), vals.min(), vals.max())
+            seq = vals if np.isnan(self.last[j]) else np.concatenate([[self.last[j]], vals])
+            if seq.size > 1:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    self.spikes[j] += int((np.abs(seq[1:] / seq[:-1] - 1.0) > self.spike_threshold).sum())
+            if np.isnan(self.first[j]):
+                self.first[j] = vals[0]
+            self.last[j] = vals[-1]
+            if col in self.bounds:
+                lo, hi = self.bounds[col]
+                self.range_invalid[j] += int(((vals < lo) | (vals > hi)).sum())
+            self._add_sample(j, self._rng.random(vals.size), vals)
+        return self
+
+    def _merge_moments(self, j, n_b, mean_b, m2_b, min_b, max_b):
+        n_a = self.count[j]
+        n = n_a + n_b
+        delta = mean_b - self.mean[j]
+        self.mean[j] += delta * n_b / n
+        self.m2[j] += m2_b + delta * delta * n_a * n_b / n
+        self.count[j] = n
+        self.min[j] = min(self.min[j], min_b)
+        self.max[j] = max(self.max[j], max_b)
+
+    def _add_sample(self, j, keys, vals):
+        keys = np.concatenate([self._keys[j], keys])
+        vals = np.concatenate([self._sample[j], vals])
+        if keys.size > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, vals = keys[keep], vals[keep]
+        self._keys[j], self._sample[j] = keys, vals
+
+    def merge(self, other: "NumericAccumulator"):
+        """Combine a partial accumulator built over a later partition of the same columns."""
+        for j in range(len(self.cols)):
+            if other.count[j] == 0:
+                continue
+            if self.count[j]:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    self.spikes[j] += int(abs(other.first[j] / self.last[j] - 1.0) > self.spike_threshold)
+            else:
+                self.first[j] = other.first[j]
+            self._merge_moments(j, other.count[j], other.mean[j], other.m2[j], other.min[j], other.max[j])
+            self.spikes[j] += other.spikes[j]
+            self.range_invalid[j] += other.range_invalid[j]
+            self.last[j] = other.last[j]
+            self._add_sample(j, other._keys[j], other._sample[j])
+        return self
+
+    def result(self) -> pd.DataFrame:
+        rows = []
+        for j, col in enumerate(self.cols):
+            cnt = int(self.count[j])
+            sample = self._sample[j]
+            q = np.quantile(sample, QUANTILES) if sample.size else [np.nan] * len(QUANTILES)
+            rows.append({
+                "count": cnt,
+                "min": float(self.min[j]) if cnt else np.nan,
+                "max": float(self.max[j]) if cnt else np.nan,
+                "mean": float(self.mean[j]) if cnt else np.nan,
+                "std": float(np.sqrt(self.m2[j] / (cnt - 1))) if cnt > 1 else np.nan,
+                "q1": float(q[0]), "median": float(q[1]), "q3": float(q[2]), "q99": float(q[3]),
+                "spikes": int(self.spikes[j]),
+                "range_invalid": int(self.range_invalid[j]),
+            })
+        return pd.DataFrame(rows, index=pd.Index(self.cols, dtype=object))
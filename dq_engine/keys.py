@@ -0,0 +1,189 @@
+# dq_engine/keys.py
+import numpy as np
+import pandas as pd
+
+# Candidate key discovery over stripped partitions (TANE-style).
+# A column set X partitions the rows into classes of equal values; the stripped
+# partition keeps only the classes with more than one row. X is a key when its
+# stripped partition is empty, and a near-key when the share of duplicate rows
+# e(X) = (rows in stripped classes - stripped classes) / n stays within a tolerance.
+# X ∪ {A} is obtained by refining X's stripped partition with A's factorized codes,
+# which only touches the rows still in duplicate classes.
+#
+# The search is level-wise (1, 2, ... columns). Candidates X ∪ {A} are first screened
+# on a row sample, for all extensions A of X at once (one sort over a sample x columns
+# code matrix); only sets that look like (near-)keys there are refined on the full data.
+# Supersets of keys and near-keys and sets whose cardinality product can't reach a key
+# are pruned; only the `beam` most selective non-key sets of a level are extended.
+
+KEY_TOLERANCE = 0.01
+KEY_MAX_COLUMNS = 3
+KEY_MAX_RESULTS = 20
+KEY_BEAM = 50
+KEY_SAMPLE_ROWS = 5_000
+SCREEN_SLACK = 2.0   # sample screening margin on the tolerance
+
+
+class _Stripped:
+    """Rows in non-singleton classes and their class labels (not compacted)."""
+
+    __slots__ = ("rows", "labels", "n_classes")
+
+    def __init__(self, rows, labels, n_classes):
+        self.rows, self.labels, self.n_classes = rows, labels, n_classes
+
+    def duplicates(self):
+        return len(self.rows) - self.n_classes
+
+
+def _strip(labels, rows):
+    """Drop singleton classes of `labels` (non-negative ints)."""
+    labels, _ = pd.factorize(labels)
+    counts = np.bincount(labels)
+    keep = counts[labels] > 1
+    return _Stripped(rows[keep], labels[keep], int((counts > 1).sum()))
+
+
+def _codes(ser):
+    """Factorized codes; nulls get -1 (each null row is its own class, as in a UNIQUE constraint)."""
+    codes, uniques = pd.factorize(ser, use_na_sentinel=True)
+    return codes.astype(np.int64), len(uniques)
+
+
+def refine(part, codes, cardinality):
+    """Stripped partition of X ∪ {A} from X's stripped partition and A's codes."""
+    sub = codes[part.rows]
+    ok = sub >= 0
+    combined = part.labels[ok].astype(np.int64) * (cardinality + 1) + sub[ok]
+    return _strip(combined, part.rows[ok])
+
+
+def _sample_duplicates(labels, sample_codes, cards):
+    """Duplicate rows of X ∪ {A} in the sample for every column A of `sample_codes` at once."""
+    combined = labels[:, None] * (cards[None, :] + 2) + (sample_codes + 1)
+    combined.sort(axis=0)
+    distinct = 1 + (combined[1:] != combined[:-1]).sum(axis=0)
+    return len(labels) - distinct
+
+
+def _candidate_columns(df, tolerance, include_float):
+    cols = []
+    for c in df.columns:
+        ser = df[c]
+        if ser.isna().sum() > tolerance * len(ser):
+            continue   # a key column can't be (mostly) empty
+        if not include_float and pd.api.types.is_float_dtype(ser) and (ser.dropna() % 1 != 0).any():
+            continue   # measurements, not identifiers (integral floats are ints with nulls)
+        cols.append(c)
+    return cols
+
+
+def near_key_duplicates(n, nulls, distinct, fractional=False, tolerance=KEY_TOLERANCE):
+    """
+    Single-column near-key test from counts alone (streaming / SQL sources): the column's
+    duplicate rows when 0 < duplicates <= tolerance * n and it is a key candidate, else 0.
+    """
+    if fractional or distinct <= 1 or nulls > tolerance * n:
+        return 0
+    dups = n - nulls - distinct
+    return dups if dups <= tolerance * n else 0
+
+
+def discover_keys(df: pd.DataFrame, max_columns=KEY_MAX_COLUMNS, tolerance=KEY_TOLERANCE, max_keys=KEY_MAX_RESULTS,
+                  beam=KEY_BEAM, sample_rows=KEY_SAMPLE_ROWS, include_float=False, seed=0):
+    """
+    Minimal unique column combinations (keys) and near-keys of `df`.
+    Returns a DataFrame with columns: columns (tuple), size, duplicate_rows, error, exact,
+    sorted by size then error. Every entry is minimal: no subset of it is a key or
+    near-key (0 < error <= tolerance) itself.
+    Floats with fractional values are skipped unless include_float=True, as are columns
+    with more than `tolerance` nulls. Composite candidates are verified most key-like first and the
+    search stops after `max_keys` results.
+    """
+    n = len(df)
+    result_cols = ["columns", "size", "duplicate_rows", "error", "exact"]
+    cols = _candidate_columns(df, tolerance, include_float) if n else []
+    codes, card = {}, {}
+    for c in cols:
+        codes[c], card[c] = _codes(df[c])
+    cols = [c for c in cols if card[c] > 1]   # constants never help
+    if not cols:
+        return pd.DataFrame(columns=result_cols)
+
+    limit = tolerance * n
+    needed = n - limit   # distinct combinations a (near-)key must reach
+    sample = np.sort(np.random.default_rng(seed).choice(n, sample_rows, replace=False)) if n > sample_rows else np.arange(n)
+    s = len(sample)
+    screen = SCREEN_SLACK * tolerance * s + (0 if s == n else 1)
+    sample_codes = np.column_stack([codes[c][sample] for c in cols])
+    cards = np.array([card[c] for c in cols], dtype=np.int64)
+    index = {c: i for i, c in enumerate(cols)}
+
+    found = []   # (columns, duplicate rows, error, exact); supersets of these are never minimal
+    parts = {}   # full stripped partitions, computed on demand
+
+    def full_part(combo):
+        if combo not in parts:
+            if len(combo) == 1:
+                c = combo[0]
+                valid = np.flatnonzero(codes[c] >= 0)
+                parts[combo] = _strip(codes[c][valid], valid)
+            else:
+                parts[combo] = refine(full_part(combo[:-1]), codes[combo[-1]], card[combo[-1]])
+        return parts[combo]
+
+    def verify(combo):
+        """Record combo if it is a key / near-key on the full data; True if it was recorded."""
+        dups = full_part(combo).duplicates()
+        if dups > limit:
+            return False
+        found.append((combo, dups, dups / n, dups == 0))
+        return True
+
+    # level 1: duplicates straight from the codes
+    level = []
+    for c in cols:
+        dups = int((codes[c] >= 0).sum()) - card[c]
+        if dups <= limit:
+            found.append(((c,), dups, dups / n, dups == 0))
+        else:
+            level.append((c,))
+
+    size = 1
+    while level and size < max_columns and len(found) < max_keys:
+        # screen every extension of the level on the sample: (sample duplicates, columns)
+        candidates = []
+        for combo in level:
+            ext = cols[index[combo[-1]] + 1:]
+            if not ext:
+                continue
+            labels = pd.factorize(pd.MultiIndex.from_arrays([sample_codes[:, index[c]] for c in combo])
+                                  if len(combo) > 1 else sample_codes[:, index[combo[0]]])[0].astype(np.int64)
+            pos = np.array([index[c] for c in ext])
+            sample_dups = _sample_duplicates(labels, sample_codes[:, pos], cards[pos])
+            base = np.prod([float(card[x]) for x in combo])
+            for c, d in zip(ext, sample_dups):
+                if base * card[c] >= needed:   # else too few combinations to be unique
+                    candidates.append((int(d), combo + (c,)))
+        # most key-like first; ties in column order (keys tend to lead the table)
+        candidates.sort(key=lambda dc: (dc[0], [index[c] for c in dc[1]]))
+        level = []
+        for d, combo in candidates:
+            if any(set(k) <= set(combo) for k, *_ in found):
+                continue   # not minimal
+            if d <= screen and len(found) < max_keys and verify(combo):
+                continue
+            if len(level) < beam:
+                level.append(combo)
+        size += 1
+
+    out = pd.DataFrame(
+        [{"columns": combo, "size": len(combo), "duplicate_rows": dups, "error": err, "exact": exact}
+         for combo, dups, err, exact in found],
+        columns=result_cols,
+    )
+    return out.sort_values(["size", "error"], kind="stable").reset_index(drop=True)
+
+
+def key_label(columns):
+    return ", ".join(str(c) for c in columns)
@@ -0,0 +1,316 @@
+# dq_engine/memory.py
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.kernels import DEFAULT_BATCH_COLS
+
+# Memory governor for run_checks. The frame's footprint and a per-row cost model of every
+# check give an estimate of each stage's extra memory; when the resident set plus that
+# estimate would pass the budget, the stage switches to its cheaper strategy (column chunks,
+# row chunks, a row sample, sketches) or optional stages are skipped. Every stage records
+# what it actually used: peak RSS (Linux resets the high-water mark per stage through
+# /proc/self/clear_refs) and the tracemalloc peak, so the cost model and worker sizes can be
+# tuned from real runs. Both are process-wide: governors share one tracemalloc session
+# (reference-counted), and while several runs are active (job pool threads) no stage resets
+# the peaks - those stages record the process high-water mark with peak_is_stage=False.
+
+MEMORY_FRACTION = 0.6      # default budget: this share of the memory available at start
+SAMPLE_ROWS = 200_000      # "sample" strategy
+CHUNK_ROWS = 262_144       # "chunked" strategy (multiple of 8: bitmap bytes line up)
+CHUNK_COLS = 4             # "chunked" numeric stats: columns per block
+
+# extra bytes per row: fixed + per numeric / text / any column (rough; calibrate from stages)
+STAGE_COSTS = {
+    "stats": (0, 26, 0, 0),            # float64 block + quantile copy + masks per batch column
+    "datatype": (0, 0, 0, 0),
+    "range": (0, 2, 0, 0),
+    "missing": (0, 0, 10, 1),          # factorized codes kept by the TextCache + masks
+    "lookup": (0, 0, 9, 0),
+    "patterns": (0, 0, 9, 0),
+    "contact": (0, 0, 9, 0),
+    "keys": (24, 0, 0, 8),             # codes of every candidate column + partitions
+    "duplicates": (32, 0, 0, 0),
+    "history": (25, 0, 0, 8),          # fingerprints, sorted copy, masks + one hash per column
+    "near_duplicates": (400, 0, 0, 0), # row texts, grams, signatures
+    "foreign_keys": (8, 0, 0, 0),
+    "outliers": (0, 1, 0, 0),
+    "spikes": (16, 16, 0, 0),
+    "completeness_table": (0, 0, 0, 1),
+    "rules": (0, 0, 0, 9),
+    "original_checks": (24, 0, 0, 1),
+}
+
+# cheaper strategy per stage once over budget; stages not listed always run in full
+FALLBACKS = {
+    "stats": "chunked",
+    "missing": "chunked",
+    "contact": "chunked",
+    "lookup": "sketch",
+    "keys": "sample",
+    "patterns": "skip",
+    "near_duplicates": "skip",
+    "spikes": "skip",
+}
+
+
+# --------------------------
+# Process memory
+# --------------------------
+
+def _page_size():
+    try:
+        return os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+def available_memory():
+    """Bytes the system can still hand out (MemAvailable), None if unknown."""
+    try:
+        with open("/proc/meminfo") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * _page_size()
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def current_rss():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _page_size()
+    except (OSError, IndexError, ValueError):
+        return peak_rss()
+
+
+def peak_rss():
+    """High-water mark of the resident set (since start or the last reset_peak_rss)."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def reset_peak_rss():
+    """Reset the high-water mark to the current RSS (Linux); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# governed runs in this process: active runs, tracemalloc users, whether a governor started
+# tracing, and how often stage peaks were reset (a stage whose peaks another run reset is not per-stage)
+_RUNS = {"active": 0, "tracing": 0, "owns_trace": False, "resets": 0}
+_RUNS_LOCK = threading.Lock()
+
+
+# --------------------------
+# Footprint / estimates
+# --------------------------
+
+def frame_footprint(df: pd.DataFrame, sample=1_000):
+    """Bytes held by df; object columns are sized from a sample of their values (no deep scan)."""
+    total = int(df.index.memory_usage())
+    for i in range(df.shape[1]):
+        ser = df.iloc[:, i]
+        if ser.dtype == object and len(ser):
+            values = ser.iloc[:: max(1, len(ser) // sample)].to_numpy()
+            per_value = np.mean([sys.getsizeof(v) for v in values]) if len(values) else 0
+            total += int(len(ser) * (8 + per_value))
+        else:
+            total += int(ser.memory_usage(index=False, deep=False))
+    return total
+
+
+def frame_shape(df: pd.DataFrame):
+    numeric = sum(pd.api.types.is_numeric_dtype(df[c]) for c in df.columns)
+    text = len(df.select_dtypes(include=["object", "string"]).columns)
+    return {"rows": len(df), "numeric": numeric, "text": text, "columns": df.shape[1]}
+
+
+def estimate_stage(stage, shape):
+    """Estimated extra bytes of a run_checks stage for a frame of `shape` (see frame_shape)."""
+    fixed, per_numeric, per_text, per_column = STAGE_COSTS.get(stage, (0, 0, 0, 1))
+    numeric = shape["numeric"]
+    if stage == "stats":   # one block of at most DEFAULT_BATCH_COLS columns at a time
+        numeric = min(numeric, DEFAULT_BATCH_COLS)
+    per_row = fixed + per_numeric * numeric + per_text * shape["text"] + per_column * shape["columns"]
+    return int(per_row * shape["rows"])
+
+
+# --------------------------
+# Governor
+# --------------------------
+
+class MemoryGovernor:
+    """
+    budget: bytes the process may hold (RSS); default: current RSS + MEMORY_FRACTION of the
+    memory available now. trace=True also records tracemalloc peaks per stage (slower).
+    """
+
+    def __init__(self, budget=None, fraction=MEMORY_FRACTION, trace=True):
+        if budget is None:
+            available = available_memory()
+            budget = current_rss() + int(available * fraction) if available else None
+        self.budget = budget
+        self.trace = trace
+        self.stages = []
+        self.footprint = None
+        self._shape = None
+        self._tracing = False
+
+    @classmethod
+    def coerce(cls, memory):
+        """run_checks' `memory` argument: None, "auto", a budget in bytes or a governor."""
+        if memory is None or isinstance(memory, cls):
+            return memory
+        if memory == "auto":
+            return cls()
+        return cls(budget=int(memory))
+
+    def begin(self, df: pd.DataFrame):
+        self.footprint = frame_footprint(df)
+        self._shape = frame_shape(df)
+        with _RUNS_LOCK:
+            _RUNS["active"] += 1
+            if self.trace:
+                self._tracing = True
+                _RUNS["tracing"] += 1
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _RUNS["owns_trace"] = True
+        return self
+
+    def end(self):
+        with _RUNS_LOCK:
+            _RUNS["active"] -= 1
+            if self._tracing:
+                self._tracing = False
+                _RUNS["tracing"] -= 1
+                if not _RUNS["tracing"] and _RUNS["owns_trace"]:
+                    tracemalloc.stop()
+                    _RUNS["owns_trace"] = False
+
+    def estimate(self, stage):
+        return estimate_stage(stage, self._shape) if self._shape else 0
+
+    def strategy(self, stage):
+        """"full", or the stage's fallback when the estimate doesn't fit in the budget."""
+        if self.budget is None or stage not in FALLBACKS:
+            return "full"
+        return FALLBACKS[stage] if current_rss() + self.estimate(stage) > self.budget else "full"
+
+    @contextmanager
+    def stage(self, name, strategy="full"):
+        record = {"stage": name, "strategy": strategy, "estimated_bytes": self.estimate(name) if strategy == "full" else 0}
+        record["rss_before"] = current_rss()
+        traced_start = 0
+        with _RUNS_LOCK:
+            alone = _RUNS["active"] <= 1
+            per_stage = alone and reset_peak_rss()
+            traced = alone and tracemalloc.is_tracing()
+            if traced:
+                tracemalloc.reset_peak()
+                traced_start = tracemalloc.get_traced_memory()[0]
+            if alone:
+                _RUNS["resets"] += 1
+            resets = _RUNS["resets"]
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            record["rss_after"] = current_rss()
+            with _RUNS_LOCK:
+                own_peaks = _RUNS["resets"] == resets   # no other run reset them meanwhile
+                record["peak_rss"] = peak_rss()   # without a per-stage reset: the process high-water mark
+                record["peak_is_stage"] = bool(per_stage and own_peaks)
+                record["traced_peak_bytes"] = (tracemalloc.get_traced_memory()[1] - traced_start) \
+                    if traced and own_peaks and tracemalloc.is_tracing() else None
+            record["over_budget"] = bool(self.budget is not None and record["peak_rss"] > self.budget)
+            self.stages.append(record)
+
+    def report(self):
+        return {
+            "budget": self.budget,
+            "footprint": self.footprint,
+            "stages": pd.DataFrame(self.stages, columns=[
+                "stage", "strategy", "estimated_bytes", "rss_before", "rss_after", "peak_rss",
+                "peak_is_stage", "traced_peak_bytes", "over_budget", "seconds",
+            ]),
+        }
+
+
+# --------------------------
+# Cheaper strategies
+# --------------------------
+
+def run_chunked(func, df: pd.DataFrame, bitmap=None, chunk_rows=CHUNK_ROWS, **kwargs):
+    """
+    func(chunk, bitmap=..., cache=...) over row chunks, for validations with one row of counts
+    per column (null_blank_validation, email_phone_validation): *_count columns are summed and
+    *_pct columns recomputed over all rows. Each chunk gets its own TextCache, so only one
+    chunk's codes are alive at a time.
+    """
+    from dq_engine.bitmap import ViolationBitmap
+    from dq_engine.normalize import TextCache
+
+    chunk_rows = max(8, chunk_rows - chunk_rows % 8)
+    frames = []
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        part = ViolationBitmap(len(chunk)) if bitmap is not None else None
+        frames.append(func(chunk, bitmap=part, cache=TextCache(chunk), **kwargs))
+        if part is not None:
+            bitmap.merge(part, offset=start)
+    frames = [f for f in frames if isinstance(f, pd.DataFrame) and not f.empty]
+    if not frames:
+        return None
+    out = pd.concat(frames, ignore_index=True)
+    counts = [c for c in out.columns if c.endswith("_count")]
+    keys = [c for c in out.columns if c not in counts and not c.endswith("_pct")]
+    out = out.groupby(keys, sort=False, dropna=False)[counts].sum().reset_index()
+    for c in counts:
+        pct = c.replace("_count", "_pct")
+        if pct in frames[0].columns:
+            out[pct] = out[c] / len(df) if len(df) else 0
+    return out[frames[0].columns]
+
+
+def lookup_by_sketch(df: pd.DataFrame, chunk_rows=CHUNK_ROWS):
+    """lookup_validation's table from chunk-built sketches (no row masks)."""
+    from dq_engine.sketches import CategoricalSketch, lookup_from_sketches
+    cols = df.select_dtypes(include=["object", "string"]).columns
+    sketches = {c: CategoricalSketch() for c in cols}
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        for c in cols:
+            sketches[c].update(chunk[c])
+    return lookup_from_sketches(sketches)
+
+
+def sample_rows(df: pd.DataFrame, n=SAMPLE_ROWS, seed=0):
+    return df if len(df) <= n else df.sample(n, random_state=seed).sort_index()
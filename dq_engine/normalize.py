@@ -0,0 +1,80 @@
+# dq_engine/normalize.py
+import numpy as np
+import pandas as pd
+
+# Normal forms, applied to the distinct values of a column only.
+FORMS = {
+    "raw": lambda u: u.astype(str),
+    "strip": lambda u: u.astype(str).str.strip(),
+    "canonical": lambda u: u.astype(str).str.strip().str.lower().str.replace(r"\s+", " ", regex=True),
+}
+
+
+class TextCache:
+    """
+    Factorize-once cache for the text work of validations and repairs.
+    Each column is factorized a single time (codes + distinct values); every normal
+    form is computed over the distinct values and kept per (column, form), so string
+    work scales with cardinality instead of row count. Missing values have code -1.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._factorized = {}
+        self._forms = {}
+
+    def invalidate(self, col=None):
+        if col is None:
+            self._factorized.clear()
+            self._forms.clear()
+            return
+        self._factorized.pop(col, None)
+        for key in [k for k in self._forms if k[0] == col]:
+            del self._forms[key]
+
+    def factorized(self, col):
+        """(codes ndarray, distinct values Series)."""
+        if col not in self._factorized:
+            ser = self.df[col]
+            try:
+                codes, uniques = pd.factorize(ser)
+            except TypeError:
+                # unhashable cells (lists / dicts): fall back to their text form
+                codes, uniques = pd.factorize(ser.where(ser.isnull(), ser.astype(str)))
+            self._factorized[col] = (codes, pd.Series(np.asarray(uniques, dtype=object)))
+        return self._factorized[col]
+
+    def normalized(self, col, form="strip"):
+        """(codes, normalized distinct values) - same codes for every form."""
+        key = (col, form)
+        if key not in self._forms:
+            codes, uniques = self.factorized(col)
+            self._forms[key] = FORMS[form](uniques).reset_index(drop=True)
+        return self.factorized(col)[0], self._forms[key]
+
+    # -------------------------------------------------------------
+    # row-level views built from per-distinct-value results
+    # -------------------------------------------------------------
+    def take(self, col, values, fill):
+        """Broadcast one value per distinct entry back to rows; missing rows get `fill`."""
+        codes = self.factorized(col)[0]
+        values = np.asarray(values)
+        return np.append(values, np.array([fill], dtype=values.dtype))[codes]
+
+    def materialize(self, col, form="canonical"):
+        codes, norm = self.normalized(col, form)
+        values = self.take(col, norm.to_numpy(dtype=object), np.nan)
+        return pd.Series(values, index=self.df.index, name=col)
+
+    def mask(self, col, predicate, form="strip", missing=False):
+        """Row mask of predicate(normalized distinct values) -> bool array; missing rows get `missing`."""
+        codes, norm = self.normalized(col, form)
+        hits = np.asarray(predicate(norm), dtype=bool)
+        return self.take(col, hits, missing)
+
+    def counts(self, col, form="strip") -> pd.Series:
+        """Row counts per normalized value (distinct raw values that normalize alike are merged)."""
+        codes, norm = self.normalized(col, form)
+        per_unique = np.bincount(codes[codes >= 0], minlength=len(norm))
+        counts = pd.Series(per_unique, index=norm.to_numpy()).groupby(level=0, sort=False).sum()
+        return counts.sort_values(ascending=False, kind="stable")
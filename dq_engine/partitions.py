@@ -0,0 +1,146 @@
+# dq_engine/partitions.py
+import numpy as np
+import pandas as pd
+
+from dq_engine.timeseries import _parse_datetimes, detect_timestamp_column
+
+# Quality metrics per time partition (day, hour, ...) or partition value of one dataset.
+# run_checks runs once over the whole frame; its ViolationBitmap already says which rows fail
+# which check. Per row we then have indicator columns - null per column, invalid per column,
+# invalid anywhere, duplicate within its partition - and one groupby(partition).sum() over
+# that block gives every metric of every partition. The result is a tidy table
+# (partition, column, metric, value, rows); column "ALL" holds the dataset-level metrics.
+
+DEFAULT_FREQ = "D"
+METRICS = ("completeness", "validity", "duplicate_rate")
+# bitmap types that aren't value validity: missingness, uniqueness, statistical anomalies,
+# the column-level type check (it flags every value of a mostly non-numeric column) and the
+# lookup heuristic (anything outside a column's 10 most common values, valid or not)
+NON_VALIDITY_TYPES = frozenset({
+    "Missing Data", "High Missingness", "Duplicate Rows", "Duplicate Values", "Near Duplicate Rows",
+    "Outlier Detected", "Sudden Spike/Drop", "Type Conformance", "Lookup Violation",
+})
+
+
+# --------------------------
+# Partition keys
+# --------------------------
+
+def partition_keys(df: pd.DataFrame, by=None, freq=DEFAULT_FREQ) -> pd.Series:
+    """
+    Partition of each row: `by` (default: the detected timestamp column) floored to `freq`
+    ("D", "h", "W", "M", ...) when it holds datetimes, else its values as-is (freq=None: always as-is).
+    """
+    by = by if by is not None else detect_timestamp_column(df)
+    if by is None:
+        raise ValueError("no partition column given and no timestamp column detected")
+    ser = df[by]
+    if freq is None:
+        return ser
+    if not pd.api.types.is_datetime64_any_dtype(ser):
+        if pd.api.types.is_numeric_dtype(ser):
+            return ser
+        parsed = _parse_datetimes(ser)
+        if parsed.notna().sum() < 0.9 * ser.notna().sum():
+            return ser
+        ser = parsed
+    if getattr(ser.dt, "tz", None) is not None:
+        ser = ser.dt.tz_localize(None)
+    return ser.dt.to_period(freq).dt.start_time.rename(by)
+
+
+# --------------------------
+# Metrics
+# --------------------------
+
+def _invalid_masks(bitmap, columns, explicit=frozenset()):
+    """
+    Per column: rows failing any validity check of that column; plus row-level ("ALL") checks.
+    explicit: (type, column) of declared rules - they count even under a NON_VALIDITY_TYPES name.
+    """
+    per_column = {}
+    for rule, col in bitmap.keys():
+        if rule in NON_VALIDITY_TYPES and (rule, col) not in explicit:
+            continue
+        packed = bitmap.packed(rule, col)
+        per_column[col] = per_column[col] | packed if col in per_column else packed
+    masks = np.zeros((bitmap.n_rows, len(columns)), dtype=bool)
+    for j, c in enumerate(columns):
+        if c in per_column:
+            masks[:, j] = bitmap.unpack(per_column[c])
+    row_level = bitmap.unpack(per_column["ALL"]) if "ALL" in per_column and "ALL" not in columns \
+        else np.zeros(bitmap.n_rows, dtype=bool)
+    return masks, row_level
+
+
+def partition_metrics(df: pd.DataFrame, by=None, freq=DEFAULT_FREQ, checks=None, rules=None) -> pd.DataFrame:
+    """
+    Completeness, validity and duplicate rate per partition (see partition_keys), as a tidy
+    table: partition, column, metric, value, rows.
+      completeness    non-null share of the column (ALL: of all cells)
+      validity        share of non-null values passing every validity check of the column -
+                      declared rules, range / format / contact checks, not the lookup heuristic
+                      (ALL: share of rows with no failing value and no failing row-level rule)
+      duplicate_rate  ALL only: rows repeating an earlier row of the same partition
+    checks: a run_checks result for df to take failing rows from (run here, with `rules`, when None).
+    """
+    from dq_engine.checks import run_checks
+    from dq_engine.history import fingerprints
+
+    keys = partition_keys(df, by, freq)
+    checks = checks if checks is not None else run_checks(df, rules=rules, exclude_checks=["near_duplicates", "lookup"])
+    columns = list(df.columns)
+    k = len(columns)
+
+    null = df.isna().to_numpy()
+    declared = checks["validations"].get("rules")
+    explicit = set(zip(declared["type"], declared["column"])) if isinstance(declared, pd.DataFrame) else set()
+    invalid, row_level = _invalid_masks(checks["bitmap"], columns, explicit)
+    invalid &= ~null
+    codes, partitions = pd.factorize(keys, sort=True, use_na_sentinel=False)
+    fps = fingerprints(df, [str(c) for c in columns])
+    dup = pd.MultiIndex.from_arrays([codes, fps]).duplicated()
+
+    # one grouped pass over all indicators: [null x k, invalid x k, row invalid, duplicate]
+    block = np.column_stack([null, invalid, invalid.any(axis=1) | row_level, dup])
+    grouped = pd.DataFrame(block).groupby(codes, sort=True)
+    sums = grouped.sum().to_numpy(dtype="float64")
+    rows = grouped.size().to_numpy(dtype="float64")
+    nulls, invalids = sums[:, :k], sums[:, k:2 * k]
+
+    completeness = 1.0 - nulls / rows[:, None]
+    present = rows[:, None] - nulls
+    validity = np.divide(present - invalids, present, out=np.ones_like(present), where=present > 0)
+    overall = {
+        "completeness": 1.0 - nulls.sum(axis=1) / (rows * k) if k else np.ones_like(rows),
+        "validity": 1.0 - sums[:, 2 * k] / rows,
+        "duplicate_rate": sums[:, 2 * k + 1] / rows,
+    }
+
+    n_parts = len(rows)
+    part_index = np.asarray(partitions)
+    frames = [
+        pd.DataFrame({"partition": np.repeat(part_index, k), "column": np.tile(np.asarray(columns, dtype=object), n_parts),
+                      "metric": name, "value": values.ravel(), "rows": np.repeat(rows, k).astype("int64")})
+        for name, values in (("completeness", completeness), ("validity", validity))
+    ]
+    frames += [
+        pd.DataFrame({"partition": part_index, "column": "ALL", "metric": name, "value": values,
+                      "rows": rows.astype("int64")})
+        for name, values in overall.items()
+    ]
+    return pd.concat([f for f in frames if len(f)], ignore_index=True)
+
+
+def metrics_trend(table: pd.DataFrame, metric=None, column="ALL") -> pd.DataFrame:
+    """
+    Wide view of partition_metrics for plotting: partitions x metrics of `column`, or
+    partitions x columns for one `metric` (column=None: every column).
+    """
+    if metric is None:
+        sub = table[table["column"] == column]
+        return sub.pivot(index="partition", columns="metric", values="value")
+    sub = table[table["metric"] == metric]
+    if column is not None:
+        sub = sub[sub["column"] == column]
+    return sub.pivot(index="partition", columns="column", values="value")
@@ -0,0 +1,130 @@
+# dq_engine/patterns.py
+import string
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.normalize import TextCache
+
+# Value shapes: every value is reduced to a signature with upper-case letters -> "A",
+# other letters -> "a" and digits -> "9" ("AB12 3CD" -> "AA99 9AA", "José" -> "Aaaa"), one
+# str.translate over the distinct values of a column; row counts come from the factorized codes.
+# A column is "patterned" when a few shapes cover nearly all of it (IDs, postcodes, dates);
+# values in rare shapes are format anomalies. Shapes are compared at two levels: the coarse
+# shape folds runs ("AA99 9AA" -> "A9 9A"), so variable-width fields (id7, id12, id345) are
+# one format, and within a coarse shape that is fixed-width (one fine shape dominates) a
+# rare fine shape (a postcode with a missing character) is an anomaly too. Variable-width
+# runs of letters and spaces (names, free text) are not a format.
+
+SHAPE_TABLE = str.maketrans(
+    string.ascii_uppercase + string.ascii_lowercase + string.digits,
+    "A" * 26 + "a" * 26 + "9" * 10,
+)
+RARE_SHAPE_PCT = 0.01     # shapes below this share of a column's values are rare
+PATTERN_COVERAGE = 0.95   # common shapes must cover this share for a column to have a format
+PATTERN_MIN_DISTINCT = 20 # fewer distinct values = a category list, not a format
+TOP_SHAPES = 5
+
+
+def _shape_table(texts):
+    """SHAPE_TABLE plus the non-ASCII letters / digits occurring in `texts`, by Unicode category."""
+    table = dict(SHAPE_TABLE)
+    for ch in set("".join(texts)):
+        if ord(ch) < 128:
+            continue
+        category = unicodedata.category(ch)
+        if category in ("Lu", "Lt"):
+            table[ord(ch)] = "A"
+        elif category[0] == "L":
+            table[ord(ch)] = "a"
+        elif category == "Nd":
+            table[ord(ch)] = "9"
+    return table
+
+
+def shape_signatures(values: pd.Series) -> pd.Series:
+    """Fine shape of each value (punctuation and other symbols are kept as-is)."""
+    values = values.astype(str)
+    return values.str.translate(_shape_table(values.tolist()))
+
+
+def coarse_shapes(shapes: pd.Series) -> pd.Series:
+    """Runs of letters / digits folded to one symbol (no backreferences: str-dtype regex is RE2)."""
+    for sym in "Aa9":
+        shapes = shapes.str.replace(f"{sym}+", sym, regex=True)
+    return shapes
+
+
+def shape_counts(values: pd.Series, counts) -> pd.Series:
+    """Rows per fine shape from distinct values and their row counts (blank values skipped)."""
+    values = pd.Series(np.asarray(values, dtype=object))
+    counts = np.asarray(counts, dtype=np.int64)
+    keep = (values.astype(str).str.strip() != "").to_numpy()
+    shapes = shape_signatures(values[keep])
+    return pd.Series(counts[keep], index=shapes.to_numpy()).groupby(level=0, sort=False).sum()
+
+
+def rare_shapes(counts: pd.Series, n_distinct, rare_pct=RARE_SHAPE_PCT, coverage=PATTERN_COVERAGE,
+                min_distinct=PATTERN_MIN_DISTINCT):
+    """
+    Fine shapes of `counts` (shape -> rows) that are format anomalies; None if the column has
+    no dominant format (too few distinct values, or common shapes cover less than `coverage`).
+    """
+    total = counts.sum()
+    if n_distinct < min_distinct or total == 0:
+        return None
+    rows = pd.Series(counts.to_numpy(), index=counts.index)
+    coarse = coarse_shapes(counts.index.to_series())
+    groups = rows.groupby(coarse.to_numpy(), sort=False)
+    group_rows, group_max = groups.transform("sum"), groups.transform("max")
+    common = group_rows / total >= rare_pct
+    # fixed-width format: one fine shape holds nearly all rows of its coarse shape
+    fixed = group_max >= coverage * group_rows
+    free_text = coarse.str.fullmatch("[Aa ]+").to_numpy(dtype=bool) & ~fixed.to_numpy()
+    if rows[common.to_numpy() & ~free_text].sum() < coverage * total:
+        return None
+    rare = ~common | (fixed & (rows < group_max) & (rows / total < rare_pct))
+    return rows.index[rare.to_numpy()].tolist()
+
+
+def shape_profile(column, counts: pd.Series, n_distinct, rare_pct=RARE_SHAPE_PCT):
+    """pattern_validation's row for one column from its shape counts; None without a dominant format."""
+    rare = rare_shapes(counts, n_distinct, rare_pct)
+    if rare is None:
+        return None
+    top = counts.astype("int64").sort_values(ascending=False, kind="stable")
+    is_rare = top.index.isin(set(rare))
+    return {
+        "column": column,
+        "n_shapes": int(len(top)),
+        "top_shapes": {s: int(n) for s, n in top.head(TOP_SHAPES).items()},
+        "rare_shapes": top.index[is_rare].tolist(),
+        "invalid_count": int(top[is_rare].sum()),
+    }
+
+
+def pattern_validation(df: pd.DataFrame, bitmap=None, cache=None, rare_pct=RARE_SHAPE_PCT):
+    """
+    Shape profile of the text columns; returns one row per column with a dominant format:
+    column, n_shapes, top_shapes ({shape: rows}), rare_shapes, invalid_count. Rows in rare
+    shapes go to `bitmap` as "Format Anomaly".
+    """
+    cols = df.select_dtypes(include=["object", "string"]).columns
+    cache = cache if cache is not None else TextCache(df)
+    results = []
+    for col in cols:
+        codes, uniques = cache.factorized(col)
+        if len(uniques) < PATTERN_MIN_DISTINCT:
+            continue
+        per_unique = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        row = shape_profile(col, shape_counts(uniques, per_unique), len(uniques), rare_pct)
+        if row is None:
+            continue
+        if bitmap is not None and row["invalid_count"]:
+            rare = set(row["rare_shapes"])
+            bitmap.add("Format Anomaly", col,
+                       cache.mask(col, lambda u: shape_signatures(u).isin(rare).to_numpy()
+                                  & (u.str.strip() != "").to_numpy(), "raw"))
+        results.append(row)
+    return pd.DataFrame(results) if results else None
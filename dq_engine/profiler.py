@@ -1,5 +1,9 @@
 import pandas as pd
 
+from dq_engine.kernels import numeric_kernel
+from dq_engine.sketches import sketch_columns
+from dq_engine.validations import heuristic_range_bounds
+
 def profile_dataframe(df: pd.DataFrame):
     summary = {
         "n_rows": int(df.shape[0]),
@@ -7,27 +11,33 @@ def profile_dataframe(df: pd.DataFrame):
         "missing_values": int(df.isnull().sum().sum())
     }
 
+    # one fused pass over all numeric columns; run_checks reuses it via profile["numeric_stats"]
+    numeric_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    numeric_stats = numeric_kernel(df, numeric_cols, range_rule=heuristic_range_bounds)
+
     cols = {}
     for c in df.columns:
         ser = df[c]
-        non_null = ser.dropna()
+        missing = int(ser.isnull().sum())
 
         col_info = {
             "dtype": str(ser.dtype),
-            "non_null_count": int(non_null.shape[0]),
-            "missing_count": int(df[c].isnull().sum()),
+            "non_null_count": int(ser.shape[0] - missing),
+            "missing_count": missing,
             "unique_count": int(ser.nunique())
         }
 
-        if pd.api.types.is_numeric_dtype(ser):
-            if not non_null.empty:
+        if c in numeric_stats:
+            st = numeric_stats.row(c)
+            if st["count"] > 0:
                 col_info.update({
-                    "min": float(non_null.min()),
-                    "max": float(non_null.max()),
-                    "mean": float(non_null.mean()),
-                    "std": float(non_null.std())
+                    "min": float(st["min"]),
+                    "max": float(st["max"]),
+                    "mean": float(st["mean"]),
+                    "std": float(st["std"])
                 })
 
         cols[c] = col_info
 
-    return {"summary": summary, "columns": cols}
+    # bounded top-k / frequency sketches of the text columns (merge across runs, see dq_engine.sketches)
+    return {"summary": summary, "columns": cols, "numeric_stats": numeric_stats, "sketches": sketch_columns(df)}
@@ -0,0 +1,357 @@
+# dq_engine/reconcile.py
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.violation_table import concat_violations, make_violations
+
+# Keyed diff of two versions of a dataset (yesterday vs today, source vs target).
+# Each row is reduced to a uint64 key hash plus one uint64 hash per compared column.
+# Rows are hash-partitioned on the key hash (spilled to disk when there is more than
+# one partition), and matching partitions of the two sides are diffed independently,
+# so memory follows the partition size: 8 * (2 + n_columns) bytes per row.
+
+CHUNK_ROWS = 500_000
+PARTITION_ROWS = 2_000_000
+NULL_HASH = np.uint64(0)
+
+
+# --------------------------
+# Sources and hashing
+# --------------------------
+
+def _chunk_source(source, chunk_rows):
+    """
+    Callable returning a fresh chunk iterator, or the iterator itself for one-shot sources.
+    DataFrame, .csv / .parquet / .xlsx path, callable -> re-iterable (samples get row values).
+    """
+    if isinstance(source, pd.DataFrame):
+        return lambda: (source.iloc[i:i + chunk_rows] for i in range(0, max(len(source), 1), chunk_rows))
+    if isinstance(source, (str, os.PathLike)):
+        path = str(source)
+        low = path.lower()
+        if low.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            return lambda: (b.to_pandas() for b in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows))
+        if low.endswith(".xlsx"):
+            from utils.io import iter_excel_chunks
+            return lambda: iter_excel_chunks(path, chunk_rows=chunk_rows)
+        return lambda: pd.read_csv(path, chunksize=chunk_rows)
+    if callable(source):
+        return source
+    return iter(source)
+
+
+def _is_numeric(ser):
+    return pd.api.types.is_numeric_dtype(ser) and not pd.api.types.is_bool_dtype(ser)
+
+
+def _column_hash(ser):
+    """uint64 per value; numbers hash as float64 (int / float sides agree), nulls as NULL_HASH."""
+    vals = ser.astype("float64") if _is_numeric(ser) else ser
+    h = pd.util.hash_pandas_object(vals, index=False).to_numpy(copy=True)
+    if ser.dtype == object:
+        # mixed columns (e.g. a stray "n/a"): numbers inside still hash like a float64 column
+        raw = ser.to_numpy()
+        num = np.fromiter((isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_))
+                           for v in raw), dtype=bool, count=len(raw))
+        if num.any():
+            h[num] = pd.util.hash_array(raw[num].astype("float64"))
+    h[ser.isna().to_numpy()] = NULL_HASH
+    return h
+
+
+def _key_hash(chunk, keys):
+    h = _column_hash(chunk[keys[0]])
+    for k in keys[1:]:
+        # order-dependent combine: (a, b) and (b, a) hash differently
+        h = h * np.uint64(1000003) ^ _column_hash(chunk[k])
+    return h
+
+
+def hash_rows(chunk, keys, columns, start=0):
+    """(n, 2 + len(columns)) uint64 matrix: key hash, stream position, column hashes."""
+    out = np.empty((len(chunk), 2 + len(columns)), dtype=np.uint64)
+    out[:, 0] = _key_hash(chunk, keys)
+    out[:, 1] = np.arange(start, start + len(chunk), dtype=np.uint64)
+    for j, c in enumerate(columns):
+        out[:, 2 + j] = _column_hash(chunk[c]) if c in chunk.columns else NULL_HASH
+    return out
+
+
+# --------------------------
+# Partitions
+# --------------------------
+
+class _Partitions:
+    """Hash matrices grouped by key-hash partition; in memory for one partition, else files."""
+
+    def __init__(self, n, width, directory=None):
+        self.n, self.width, self.directory = n, width, directory
+        self.memory = [[] for _ in range(n)] if directory is None else None
+        self.rows = 0
+
+    def _path(self, i):
+        return os.path.join(self.directory, f"p{i:05d}.bin")
+
+    def add(self, block):
+        self.rows += len(block)
+        part = block[:, 0] % np.uint64(self.n)
+        order = np.argsort(part, kind="stable")
+        block, part = block[order], part[order]
+        bounds = np.searchsorted(part, np.arange(self.n + 1, dtype=np.uint64))
+        for i in range(self.n):
+            lo, hi = bounds[i], bounds[i + 1]
+            if lo == hi:
+                continue
+            if self.memory is not None:
+                self.memory[i].append(block[lo:hi])
+            else:
+                with open(self._path(i), "ab") as fh:
+                    block[lo:hi].tofile(fh)
+
+    def load(self, i):
+        if self.memory is not None:
+            parts = self.memory[i]
+            return np.concatenate(parts) if parts else np.empty((0, self.width), dtype=np.uint64)
+        path = self._path(i)
+        if not os.path.exists(path):
+            return np.empty((0, self.width), dtype=np.uint64)
+        return np.fromfile(path, dtype=np.uint64).reshape(-1, self.width)
+
+
+def _partition(chunks, keys, columns, n, directory):
+    parts = _Partitions(n, 2 + len(columns), directory)
+    for chunk in chunks:
+        if len(chunk):
+            parts.add(hash_rows(chunk, keys, columns, start=parts.rows))
+    return parts
+
+
+def _dedupe(block):
+    """Sort by key hash; keep the first row per key. Returns (block, n_duplicate_rows)."""
+    block = block[np.lexsort((block[:, 1], block[:, 0]))]
+    keep = np.ones(len(block), dtype=bool)
+    keep[1:] = block[1:, 0] != block[:-1, 0]
+    return block[keep], int((~keep).sum())
+
+
+def _diff_partition(left, right, sample_rows):
+    left, dup_left = _dedupe(left)
+    right, dup_right = _dedupe(right)
+    _, li, ri = np.intersect1d(left[:, 0], right[:, 0], assume_unique=True, return_indices=True)
+    removed = np.ones(len(left), dtype=bool)
+    removed[li] = False
+    added = np.ones(len(right), dtype=bool)
+    added[ri] = False
+
+    diff = left[li, 2:] != right[ri, 2:]
+    changed = diff.any(axis=1)
+    changed_idx = np.flatnonzero(changed)
+    # smallest stream positions first, so samples don't depend on the partitioning
+    removed_pos = np.sort(left[removed, 1])[:sample_rows]
+    added_pos = np.sort(right[added, 1])[:sample_rows]
+    order = np.argsort(left[li[changed_idx], 1])[:sample_rows]
+    pick = changed_idx[order]
+    return {
+        "matched": len(li),
+        "removed": int(removed.sum()),
+        "added": int(added.sum()),
+        "changed": int(changed.sum()),
+        "column_changed": diff.sum(axis=0),
+        "dup_left": dup_left,
+        "dup_right": dup_right,
+        "removed_pos": removed_pos,
+        "added_pos": added_pos,
+        "changed_pos": np.column_stack([left[li[pick], 1], right[ri[pick], 1]]),
+        "changed_mask": diff[pick],
+    }
+
+
+# --------------------------
+# Samples
+# --------------------------
+
+def _fetch_rows(chunks_fn, positions):
+    """Rows at stream `positions` (sorted result, indexed by position); one pass over the source."""
+    wanted = np.unique(np.asarray(positions, dtype=np.int64))
+    if not callable(chunks_fn) or wanted.size == 0:
+        return None
+    frames, start = [], 0
+    for chunk in chunks_fn():
+        stop = start + len(chunk)
+        sel = wanted[(wanted >= start) & (wanted < stop)]
+        if sel.size:
+            part = chunk.iloc[sel - start].copy()
+            part.index = sel
+            frames.append(part)
+        start = stop
+        if start > wanted[-1]:
+            break
+    return pd.concat(frames) if frames else None
+
+
+def _value(rows, pos, col):
+    if rows is None or col not in rows.columns:
+        return None
+    v = rows.at[pos, col]
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def _records(rows, positions, cols):
+    return [{"row": int(p), **({c: _value(rows, p, c) for c in cols} if rows is not None else {})}
+            for p in positions]
+
+
+# --------------------------
+# Public API
+# --------------------------
+
+def reconcile(left, right, keys, columns=None, partitions=None, max_workers=None,
+              sample_rows=5, chunk_rows=CHUNK_ROWS, spill_dir=None):
+    """
+    Keyed diff of `left` (old / source) against `right` (new / target).
+    left / right: DataFrame, .csv / .parquet / .xlsx path, a callable returning chunk
+    iterators, or a one-shot iterable of chunks (samples then carry row positions only).
+    keys: key column(s). columns: compared columns (default: non-key columns of both sides).
+    partitions: number of hash partitions (default: one per PARTITION_ROWS of the larger
+    DataFrame side, 64 for streamed sources); more than one spills hashes to `spill_dir`.
+    Returns {"summary", "column_changes", "samples", "violations"}.
+    """
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    left_fn, right_fn = _chunk_source(left, chunk_rows), _chunk_source(right, chunk_rows)
+    left_chunks = left_fn() if callable(left_fn) else left_fn
+    right_chunks = right_fn() if callable(right_fn) else right_fn
+
+    # column lists come from the first chunk of each side
+    first_left, first_right = next(left_chunks, pd.DataFrame()), next(right_chunks, pd.DataFrame())
+    left_cols = [c for c in first_left.columns if c not in keys]
+    right_cols = [c for c in first_right.columns if c not in keys]
+    missing_keys = [k for k in keys if k not in first_left.columns or k not in first_right.columns]
+    if missing_keys:
+        raise KeyError(f"key column(s) missing: {missing_keys}")
+    if columns is None:
+        columns = [c for c in left_cols if c in right_cols]
+
+    if partitions is None:
+        sizes = [len(s) for s in (left, right) if isinstance(s, pd.DataFrame)]
+        partitions = max(1, -(-max(sizes) // PARTITION_ROWS)) if len(sizes) == 2 else 64
+    tmp = tempfile.mkdtemp(prefix="dq_reconcile_", dir=spill_dir) if partitions > 1 else None
+    try:
+        def _side(first, rest, name):
+            directory = None
+            if tmp:
+                directory = os.path.join(tmp, name)
+                os.makedirs(directory)
+            return _partition(_prepend(first, rest), keys, columns, partitions, directory)
+
+        lp = _side(first_left, left_chunks, "left")
+        rp = _side(first_right, right_chunks, "right")
+
+        workers = max(1, min(partitions, max_workers or os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(lambda i: _diff_partition(lp.load(i), rp.load(i), sample_rows), range(partitions)))
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    total = {k: sum(p[k] for p in parts) for k in ("matched", "removed", "added", "changed", "dup_left", "dup_right")}
+    column_changed = np.sum([p["column_changed"] for p in parts], axis=0) if columns else np.zeros(0)
+    summary = {
+        "left_rows": lp.rows,
+        "right_rows": rp.rows,
+        "matched": total["matched"],
+        "added": total["added"],
+        "removed": total["removed"],
+        "changed": total["changed"],
+        "unchanged": total["matched"] - total["changed"],
+        "duplicate_keys_left": total["dup_left"],
+        "duplicate_keys_right": total["dup_right"],
+        "columns_only_left": [c for c in left_cols if c not in right_cols],
+        "columns_only_right": [c for c in right_cols if c not in left_cols],
+    }
+    column_changes = pd.DataFrame({
+        "column": list(columns),
+        "changed": column_changed.astype("int64"),
+        "change_rate": column_changed / max(1, total["matched"]),
+    })
+
+    # samples: smallest positions across partitions, values fetched in one extra pass
+    removed_pos = np.sort(np.concatenate([p["removed_pos"] for p in parts]))[:sample_rows]
+    added_pos = np.sort(np.concatenate([p["added_pos"] for p in parts]))[:sample_rows]
+    pairs = np.concatenate([p["changed_pos"] for p in parts]).reshape(-1, 2)
+    masks = np.concatenate([p["changed_mask"] for p in parts]).reshape(len(pairs), len(columns))
+    order = np.argsort(pairs[:, 0], kind="stable")[:sample_rows]
+    pairs, masks = pairs[order], masks[order]
+
+    left_rows = _fetch_rows(left_fn, np.concatenate([removed_pos, pairs[:, 0]]))
+    right_rows = _fetch_rows(right_fn, np.concatenate([added_pos, pairs[:, 1]]))
+    changed = []
+    for (lpos, rpos), mask in zip(pairs, masks):
+        rec = {"left_row": int(lpos), "right_row": int(rpos)}
+        if left_rows is not None:
+            rec.update({k: _value(left_rows, lpos, k) for k in keys})
+        for c, is_changed in zip(columns, mask):
+            if is_changed:
+                rec[c] = {"left": _value(left_rows, lpos, c), "right": _value(right_rows, rpos, c)}
+        changed.append(rec)
+    samples = {
+        "removed": _records(left_rows, removed_pos, first_left.columns),
+        "added": _records(right_rows, added_pos, first_right.columns),
+        "changed": changed,
+    }
+    return {
+        "summary": summary,
+        "column_changes": column_changes,
+        "samples": samples,
+        "violations": reconcile_violations(summary, column_changes, samples),
+    }
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+def _column_sample(sample, column):
+    """Changed-row sample reduced to its keys / positions and one column's before / after."""
+    out = {k: v for k, v in sample.items() if not isinstance(v, dict)}
+    out[column] = sample[column]
+    return out
+
+
+def reconcile_violations(summary, column_changes, samples):
+    """Diff summary in the violations format; sampled rows go to params["samples"]."""
+    base = max(1, summary["left_rows"])
+    rows = []
+    for kind, label, n in (("removed", "Rows Removed", summary["removed"]),
+                           ("added", "Rows Added", summary["added"]),
+                           ("changed", "Rows Changed", summary["changed"])):
+        if n:
+            rows.append(make_violations(
+                ["ALL"], label, n, f"{n} rows {kind} ({n / base * 100:.2f}% of {summary['left_rows']})",
+                params=[{"pct": n / base * 100, "samples": samples[kind]}],
+            ))
+    for side in ("left", "right"):
+        n = summary[f"duplicate_keys_{side}"]
+        if n:
+            rows.append(make_violations(["ALL"], "Duplicate Keys", n, f"{n} duplicate keys on the {side} side",
+                                        params=[{"side": side}]))
+    for side in ("left", "right"):
+        cols = summary[f"columns_only_{side}"]
+        if cols:
+            rows.append(make_violations(cols, "Schema Change", 0, f"column only on the {side} side",
+                                        params=[{"side": side} for _ in cols]))
+    f = column_changes[column_changes["changed"] > 0]
+    if not f.empty:
+        rows.append(make_violations(
+            f["column"], "Column Changed", f["changed"],
+            f["changed"].astype(str) + " matched rows changed (" + (f["change_rate"] * 100).round(2).astype(str) + "%)",
+            params=[{"change_rate": float(r), "samples": [_column_sample(s, c) for s in samples["changed"] if c in s]}
+                    for c, r in zip(f["column"], f["change_rate"])],
+        ))
+    return concat_violations(rows)
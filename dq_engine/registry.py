@@ -0,0 +1,80 @@
+# dq_engine/registry.py
+import importlib
+import importlib.util
+import threading
+
+# Checks and reports whose modules pull in heavy dependencies. Entries are
+# "module:attribute" strings and are only imported the first time get() asks for them;
+# available() answers from the import system without importing anything.
+#
+#   name -> (target, top-level packages it needs)
+CHECKS = {
+    "isolation_forest": ("dq_engine.anomaly:detect_outliers_isolationforest", ("sklearn",)),
+    "psi": ("dq_engine.anomaly:psi", ()),
+    "knn_impute": ("dq_engine.repairs:knn_impute", ("sklearn",)),
+    "infer_schema": ("dq_engine.schema_infer:infer_schema", ("dateutil",)),
+}
+
+REPORTS = {
+    "pdf": ("reports.pdf_report:generate_pdf", ("reportlab",)),
+    "report_builder": ("dq_engine.reporting:ReportBuilder", ("matplotlib",)),
+    "issue_logger": ("dq_engine.issues:IssueLogger", ()),
+}
+
+_resolved = {}
+_lock = threading.Lock()
+
+
+def _entry(name):
+    if name in CHECKS:
+        return CHECKS[name]
+    if name in REPORTS:
+        return REPORTS[name]
+    raise KeyError(f"unknown check / report: {name}")
+
+
+def register(name, target, requires=(), kind="check"):
+    """Add (or replace) a lazily loaded check / report."""
+    (REPORTS if kind == "report" else CHECKS)[name] = (target, tuple(requires))
+    with _lock:
+        _resolved.pop(name, None)
+
+
+def available(name) -> bool:
+    """True if the entry's module and dependencies are installed (nothing is imported)."""
+    target, requires = _entry(name)
+    module = target.split(":")[0]
+    try:
+        return all(importlib.util.find_spec(m) is not None for m in (*requires, module))
+    except (ImportError, ValueError):
+        return False
+
+
+def get(name):
+    """Import the entry's module on first use and return the registered object."""
+    if name in _resolved:
+        return _resolved[name]
+    target, requires = _entry(name)
+    module, _, attr = target.partition(":")
+    with _lock:
+        if name not in _resolved:
+            try:
+                obj = importlib.import_module(module)
+            except ImportError as e:
+                missing = ", ".join(requires) or module
+                raise ImportError(f"'{name}' needs {missing}: {e}") from e
+            _resolved[name] = getattr(obj, attr) if attr else obj
+    return _resolved[name]
+
+
+def loaded():
+    return sorted(_resolved)
+
+
+def preload(names=None):
+    """Import every available entry up front (long-running services); returns the loaded names."""
+    names = list(CHECKS) + list(REPORTS) if names is None else names
+    for name in names:
+        if available(name):
+            get(name)
+    return loaded()
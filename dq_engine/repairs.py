@@ -1,29 +1,167 @@
+import numpy as np
 import pandas as pd
-from sklearn.impute import KNNImputer
 
-def suggest_imputations(df: pd.DataFrame):
+from dq_engine.kernels import numeric_kernel
+from dq_engine.normalize import TextCache
+from dq_engine.sketches import load_sketches
+
+MODEL_STRATEGIES = ("knn", "regression")
+
+
+def _stats_for(df, profile=None):
+    """Numeric column stats shared with profiling (profile["numeric_stats"]) or one fused kernel pass."""
+    stats = (profile or {}).get("numeric_stats")
+    cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    if stats is None or not all(c in stats for c in cols):
+        stats = numeric_kernel(df, cols)
+    return stats
+
+
+def _mode(ser: pd.Series):
+    """Single value_counts pass; ties resolve to the smallest value like Series.mode()."""
+    counts = ser.value_counts(dropna=True)
+    if len(counts) == 0:
+        return None
+    ties = counts.index[counts.to_numpy() == counts.iloc[0]]
+    try:
+        return min(ties)
+    except TypeError:
+        return ties[0]
+
+
+def suggest_imputations(df: pd.DataFrame, profile: dict = None, strategy: str = "simple"):
+    """
+    Per-column fill suggestions for columns with missing values.
+    strategy="simple": median (numeric, from the shared stats) / mode (others; text columns
+    take it from the profile's sketches when present instead of a value_counts pass).
+    strategy="knn" / "regression": numeric columns are filled by a model at apply time.
+    """
+    stats = _stats_for(df, profile)
+    sketches = load_sketches(profile) if profile else {}
+    missing = df.isnull().sum()
     suggestions = {}
     for col in df.columns:
-        ser = df[col]
-        if ser.isnull().sum() == 0:
+        if missing[col] == 0:
             continue
-        if pd.api.types.is_numeric_dtype(ser):
-            suggestions[col] = {"strategy": "median", "value": float(ser.median())}
+        ser = df[col]
+        if pd.api.types.is_numeric_dtype(ser) and not pd.api.types.is_bool_dtype(ser):
+            if strategy in MODEL_STRATEGIES:
+                suggestions[col] = {"strategy": strategy, "value": float(stats.row(col)["median"])}
+            else:
+                suggestions[col] = {"strategy": "median", "value": float(stats.row(col)["median"])}
         else:
-            mode_val = ser.mode().iloc[0] if ser.mode().shape[0] else None
-            suggestions[col] = {"strategy": "mode", "value": mode_val}
+            sketch = sketches.get(col) if pd.api.types.is_string_dtype(ser) else None
+            suggestions[col] = {"strategy": "mode", "value": sketch.mode() if sketch is not None else _mode(ser)}
     return suggestions
 
-def apply_suggestions(df: pd.DataFrame, suggestions: dict):
-    df2 = df.copy()
+
+def apply_suggestions(df: pd.DataFrame, suggestions: dict, inplace: bool = False, **model_kwargs):
+    """
+    Fill missing values per suggestion. Only the filled columns are rebuilt:
+    inplace=True replaces them on df itself, otherwise a shallow copy shares every
+    untouched column with df. Model strategies (knn / regression) take the
+    knn_impute / regression_impute keyword arguments (sample_size, chunk_rows, ...).
+    """
+    out = df if inplace else df.copy(deep=False)
+    stats = None
     for col, info in suggestions.items():
-        val = info.get("value")
-        df2[col] = df2[col].fillna(val)
-    return df2
+        strategy = info.get("strategy")
+        if strategy in MODEL_STRATEGIES:
+            stats = stats if stats is not None else _stats_for(df)
+            fill = knn_impute if strategy == "knn" else regression_impute
+            out[col] = fill(df, col, stats=stats, fallback=info.get("value"), **model_kwargs)
+        else:
+            out[col] = out[col].fillna(info.get("value"))
+    return out
+
+
+# --------------------------
+# Model-based imputation (fit on a subsample, fill in chunks)
+# --------------------------
+
+def _feature_matrix(df, features, stats, rows=None):
+    """Standardized float32 features; missing feature values sit at the column mean (0)."""
+    part = df if rows is None else df.iloc[rows]
+    X = part[features].to_numpy(dtype="float64", na_value=np.nan)
+    mean = np.array([stats.row(c)["mean"] for c in features])
+    std = np.array([stats.row(c)["std"] for c in features])
+    std = np.where((std > 0) & np.isfinite(std), std, 1.0)
+    X = (X - mean) / std
+    return np.nan_to_num(X, nan=0.0).astype("float32")
+
+
+def _model_inputs(df, target, features, stats, sample_size, random_state):
+    if features is None:
+        features = [c for c in df.columns
+                    if c != target and pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    y_all = df[target].to_numpy(dtype="float64", na_value=np.nan)
+    donors = np.flatnonzero(~np.isnan(y_all))
+    if len(donors) > sample_size:
+        donors = np.sort(np.random.default_rng(random_state).choice(donors, sample_size, replace=False))
+    return features, y_all, donors
+
+
+def _fill_chunks(df, y_all, features, stats, predict, chunk_rows):
+    targets = np.flatnonzero(np.isnan(y_all))
+    filled = y_all.copy()
+    for start in range(0, len(targets), chunk_rows):
+        rows = targets[start:start + chunk_rows]
+        filled[rows] = predict(_feature_matrix(df, features, stats, rows))
+    return filled
+
+
+def knn_impute(df: pd.DataFrame, target, features=None, n_neighbors=5, sample_size=50_000,
+               chunk_rows=100_000, stats=None, fallback=None, random_state=42):
+    """
+    Fill a numeric column with the mean of its nearest donors. The KD-tree is built on at
+    most `sample_size` donor rows; missing rows are queried `chunk_rows` at a time, so peak
+    memory is the column copy plus one chunk of features.
+    """
+    from sklearn.neighbors import KDTree
+
+    stats = stats if stats is not None else _stats_for(df)
+    features, y_all, donors = _model_inputs(df, target, features, stats, sample_size, random_state)
+    if not features or len(donors) == 0 or not np.isnan(y_all).any():
+        return df[target].fillna(fallback)
+
+    tree = KDTree(_feature_matrix(df, features, stats, donors))
+    y_donors = y_all[donors]
+    k = min(n_neighbors, len(donors))
+
+    def predict(X):
+        _, idx = tree.query(X, k=k)
+        return y_donors[idx].mean(axis=1)
+
+    filled = _fill_chunks(df, y_all, features, stats, predict, chunk_rows)
+    return pd.Series(filled, index=df.index, name=target)
+
+
+def regression_impute(df: pd.DataFrame, target, features=None, sample_size=200_000,
+                      chunk_rows=500_000, stats=None, fallback=None, random_state=42):
+    """Least-squares linear fit on a donor subsample, predictions applied in chunks."""
+    stats = stats if stats is not None else _stats_for(df)
+    features, y_all, donors = _model_inputs(df, target, features, stats, sample_size, random_state)
+    if not features or len(donors) <= len(features) or not np.isnan(y_all).any():
+        return df[target].fillna(fallback)
+
+    X = _feature_matrix(df, features, stats, donors).astype("float64")
+    X = np.column_stack([np.ones(len(X)), X])
+    coef, *_ = np.linalg.lstsq(X, y_all[donors], rcond=None)
+
+    def predict(Xc):
+        return coef[0] + Xc.astype("float64") @ coef[1:]
+
+    filled = _fill_chunks(df, y_all, features, stats, predict, chunk_rows)
+    return pd.Series(filled, index=df.index, name=target)
+
 
-def normalize_categorical(out: pd.DataFrame, cols):
+def normalize_categorical(out: pd.DataFrame, cols, cache=None):
+    """strip / lower / collapse whitespace, computed once per distinct value (missing stays missing)."""
+    cache = cache if cache is not None else TextCache(out)
     for c in cols:
-        out[c] = out[c].astype(str).str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+        normalized = cache.materialize(c, "canonical")
+        cache.invalidate(c)
+        out[c] = normalized
     return out
 
 def drop_duplicate_rows(df: pd.DataFrame, subset=None):
@@ -1,8 +1,12 @@
 # dq_engine/reporting.py
 
+import numpy as np
 import pandas as pd
 from dq_engine.charts import bar_chart, line_chart, pie_chart
 from dq_engine.issues import IssueLogger
+from dq_engine.partitions import metrics_trend
+from dq_engine.violation_table import violation_summary
+from reports.export import export_failed_rows, export_filename
 import json
 import os
 
@@ -40,7 +44,8 @@ class ReportBuilder:
         summary = {
             "total_rules_failed": len(violations_df),
             "columns_failed": list(violations_df["column"].unique()),
-            "violation_counts": violations_df["type"].value_counts().to_dict()
+            "violation_counts": violations_df["type"].value_counts().to_dict(),
+            "by_type": violation_summary(violations_df).to_dict(orient="records"),
         }
         file = f"{self.output_dir}/pipeline_summary.json"
         json.dump(summary, open(file, "w"), indent=4)
@@ -49,9 +54,16 @@ class ReportBuilder:
     # -------------------------------------------------------------
     # 4. Trend Analysis (you pass 7/30 day history)
     # -------------------------------------------------------------
-    def build_trend_report(self, dq_history: pd.Series):
+    def build_trend_report(self, dq_history, metric=None, column="ALL"):
+        """
+        dq_history: a DQ score series, or partition_metrics' tidy table - plotted as one line
+        per metric of `column`, or one line per column for a single `metric`.
+        """
         file = f"{self.output_dir}/dq_trend.png"
-        line_chart(dq_history, "DQ Score Trend", file)
+        if isinstance(dq_history, pd.DataFrame):
+            line_chart(metrics_trend(dq_history, metric, column), "DQ Metrics by Partition", file)
+        else:
+            line_chart(dq_history, "DQ Score Trend", file)
         return file
 
     # -------------------------------------------------------------
@@ -66,9 +78,15 @@ class ReportBuilder:
     # -------------------------------------------------------------
     # 6. Save failing rows into CSV
     # -------------------------------------------------------------
-    def save_failed_rows(self, df_failed: pd.DataFrame, rule_name: str):
-        file = f"{self.output_dir}/failed_{rule_name}.csv"
-        df_failed.to_csv(file, index=False)
+    def save_failed_rows(self, df_failed: pd.DataFrame, rule_name: str, mask=None, fmt="csv", compression=None):
+        """
+        Stream failing rows to disk. Pass the full frame plus a row mask to export
+        only the failing rows without building the filtered copy first.
+        """
+        file = f"{self.output_dir}/{export_filename(f'failed_{rule_name}', fmt, compression)}"
+        if mask is None:
+            mask = np.ones(df_failed.shape[0], dtype=bool)
+        export_failed_rows(df_failed, mask, path=file, fmt=fmt, compression=compression)
         return file
 
     # -------------------------------------------------------------
@@ -0,0 +1,292 @@
+# dq_engine/rules.py
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.normalize import TextCache
+from dq_engine.keys import KEY_MAX_COLUMNS, KEY_TOLERANCE
+from dq_engine.patterns import RARE_SHAPE_PCT
+from dq_engine.violation_table import concat_violations, empty_violations, make_violations
+
+# Rule spec (JSON / YAML / dict):
+#
+#   settings:
+#     completeness_threshold: 0.8     # run_original_checks "Missing Data"
+#     missing_pct_threshold: 20       # "High Missingness"
+#     spike_threshold: 0.5            # spike_drop_detection (row-order |pct_change|)
+#     timestamp_column: null          # time-series spikes: a timestamp column or "auto" (null: row order)
+#     entity_columns: [store_id]      # one series per entity key
+#     spike_method: robust_z          # or ewma
+#     spike_window: 30
+#     spike_z: 3.5
+#     heuristics: true                # keep the name-based range / email / phone validations
+#     key_tolerance: 0.01             # near-key: at most this share of duplicate rows
+#     key_max_columns: 3              # largest composite key searched
+#     near_duplicates: false          # fuzzy duplicate rows (MinHash / LSH + rapidfuzz)
+#     near_duplicate_columns: [name, address]   # default: all text columns
+#     near_duplicate_threshold: 85    # rapidfuzz token_sort_ratio
+#     pattern_rare_pct: 0.01          # value shapes below this share are format anomalies
+#   rules:
+#     - column: age                   # or `match: "(?i)age"` to target columns by name regex
+#       range: {min: 0, max: 120}     # bounds may be {quantile: 0.99, scale: 5}
+#     - column: email
+#       regex: "^[^@]+@[^@]+$"
+#     - column: status
+#       allowed: [active, inactive]
+#     - column: id
+#       not_null: true
+#       unique: true
+#     - expression: "end_date >= start_date"
+#
+# Every rule may carry `name` (violation type) and `severity`.
+
+DEFAULT_SETTINGS = {
+    "completeness_threshold": 0.8,
+    "missing_pct_threshold": 20.0,
+    "spike_threshold": 0.5,
+    "timestamp_column": None,
+    "entity_columns": None,
+    "spike_method": "robust_z",
+    "spike_window": 30,
+    "spike_z": 3.5,
+    "heuristics": True,
+    "key_tolerance": KEY_TOLERANCE,
+    "key_max_columns": KEY_MAX_COLUMNS,
+    "near_duplicates": False,
+    "near_duplicate_columns": None,
+    "near_duplicate_threshold": 85.0,
+    "pattern_rare_pct": RARE_SHAPE_PCT,
+}
+
+CHECKS = ("range", "regex", "allowed", "not_null", "unique")
+
+RESULT_COLUMNS = [
+    "rule_id", "column", "check", "type", "severity", "failed", "evaluated",
+    "threshold_lower", "threshold_upper", "params",
+]
+
+DEFAULT_NAMES = {
+    "range": "Range Violation",
+    "regex": "Format Violation",
+    "allowed": "Lookup Violation",
+    "not_null": "Not Null Violation",
+    "unique": "Uniqueness Violation",
+    "expression": "Expression Violation",
+}
+
+
+# --------------------------
+# Loading / compiling
+# --------------------------
+
+def load_rules(source):
+    """Load a spec from a dict, a JSON/YAML string or a .json/.yaml/.yml path."""
+    if isinstance(source, (dict, list)):
+        return source
+    if isinstance(source, (str, os.PathLike)) and os.path.exists(source):
+        with open(source, "r", encoding="utf-8") as fh:
+            return parse_rules(fh.read(), is_yaml=str(source).lower().endswith((".yaml", ".yml")))
+    return parse_rules(source)
+
+
+def parse_rules(text, is_yaml=False):
+    """Parse spec text (JSON, else YAML) without touching the filesystem; ValueError if it isn't a spec."""
+    spec = None
+    if not is_yaml:
+        try:
+            spec = json.loads(text)
+        except ValueError:
+            pass
+    if spec is None:
+        try:
+            import yaml
+        except Exception:
+            raise ImportError("YAML rule specs require the 'pyyaml' package")
+        try:
+            spec = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"rule spec is neither JSON nor YAML: {e}")
+    if not isinstance(spec, (dict, list)):
+        raise ValueError("rule spec must be a mapping or a list of rules")
+    return spec
+
+
+def _expand_rule(item):
+    """One spec entry can hold several checks -> one rule dict per check."""
+    out = []
+    for check in CHECKS:
+        if check not in item or item[check] in (None, False):
+            continue
+        out.append({
+            "check": check,
+            "params": item[check],
+            "name": item.get("name", DEFAULT_NAMES[check]),
+            "severity": item.get("severity"),
+        })
+    return out
+
+
+def compile_rules(spec, columns):
+    """
+    Compile a spec against the dataset's columns into an execution plan:
+      {"settings": {...}, "columns": {col: [rule, ...]}, "expressions": [rule, ...]}
+    All rules for a column end up in one list so execute_plan scans it once.
+    A `column:` rule naming a column the dataset doesn't have raises ValueError.
+    """
+    spec = load_rules(spec)
+    if isinstance(spec, list):
+        spec = {"rules": spec}
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(spec.get("settings") or {})
+
+    plan_cols = {}
+    expressions = []
+    unknown = []
+    for i, item in enumerate(spec.get("rules") or []):
+        rule_id = item.get("id", f"rule_{i}")
+        if "expression" in item:
+            expressions.append({
+                "id": rule_id,
+                "check": "expression",
+                "params": item["expression"],
+                "name": item.get("name", DEFAULT_NAMES["expression"]),
+                "severity": item.get("severity"),
+            })
+            continue
+        if "column" in item:
+            if item["column"] not in columns:
+                unknown.append(f"{item['column']} (rule {rule_id})")
+                continue
+            targets = [item["column"]]
+        elif "match" in item:
+            pattern = re.compile(item["match"])
+            targets = [c for c in columns if pattern.search(str(c))]
+        else:
+            raise ValueError(f"rule {rule_id} needs 'column', 'match' or 'expression'")
+        for col in targets:
+            for rule in _expand_rule(item):
+                rule["id"] = rule_id
+                plan_cols.setdefault(col, []).append(rule)
+    if unknown:
+        raise ValueError(f"rules name unknown columns: {', '.join(unknown)}")
+
+    return {"settings": settings, "columns": plan_cols, "expressions": expressions}
+
+
+# --------------------------
+# Execution
+# --------------------------
+
+def _bound(value, values):
+    if isinstance(value, dict):
+        q = np.nanquantile(values, float(value.get("quantile", 1.0))) if values.size else np.nan
+        return float(q * float(value.get("scale", 1.0)))
+    return np.nan if value is None else float(value)
+
+
+def _column_pass(ser: pd.Series, rules, cache, col):
+    """
+    Evaluate every rule of one column over shared intermediates:
+    one numeric coercion, one factorize shared through the TextCache (text rules then
+    run on distinct values only).
+    Yields (rule, failing_mask, extra) per rule.
+    """
+    notnull = ser.notna().to_numpy()
+    checks = {r["check"] for r in rules}
+
+    numeric = None
+    if "range" in checks:
+        numeric = pd.to_numeric(ser, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+    codes = uniques = None
+    if checks & {"regex", "allowed", "unique"}:
+        codes, uniques = cache.normalized(col, "strip")
+
+    # all range rules on this column in one broadcast comparison (n x k)
+    range_rules = [r for r in rules if r["check"] == "range"]
+    if range_rules:
+        finite = numeric[~np.isnan(numeric)]
+        lows = np.array([_bound(r["params"].get("min"), finite) for r in range_rules])
+        highs = np.array([_bound(r["params"].get("max"), finite) for r in range_rules])
+        with np.errstate(invalid="ignore"):
+            below = numeric[:, None] < np.where(np.isnan(lows), -np.inf, lows)[None, :]
+            above = numeric[:, None] > np.where(np.isnan(highs), np.inf, highs)[None, :]
+        failing = below | above
+        for k, rule in enumerate(range_rules):
+            yield rule, failing[:, k], {"threshold_lower": lows[k], "threshold_upper": highs[k]}
+
+    for rule in rules:
+        check = rule["check"]
+        if check == "range":
+            continue
+        if check == "regex":
+            ok = uniques.str.match(rule["params"]).fillna(False).to_numpy(dtype=bool)
+            mask = (codes >= 0) & ~np.append(ok, True)[codes]
+        elif check == "allowed":
+            ok = uniques.isin([str(v) for v in rule["params"]]).to_numpy()
+            mask = (codes >= 0) & ~np.append(ok, True)[codes]
+        elif check == "not_null":
+            mask = ~notnull
+        elif check == "unique":
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            mask = (codes >= 0) & (np.append(counts, 0)[codes] > 1)
+        else:
+            raise ValueError(f"unknown rule check: {check}")
+        yield rule, mask, {}
+
+
+def execute_plan(df: pd.DataFrame, plan, bitmap=None, cache=None):
+    """
+    Run a compiled plan. Returns (results, violations):
+      results    -> one row per (rule, column) with failed / evaluated counts
+      violations -> typed violations frame (see violation_table)
+    """
+    records = []
+    n = len(df)
+    cache = cache if cache is not None else TextCache(df)
+
+    def _record(rule, column, mask, extra):
+        failed = int(mask.sum())
+        if bitmap is not None:
+            bitmap.add(rule["name"], column, mask)
+        records.append({
+            "rule_id": rule["id"],
+            "column": column,
+            "check": rule["check"],
+            "type": rule["name"],
+            "severity": rule["severity"],
+            "failed": failed,
+            "evaluated": n,
+            "threshold_lower": extra.get("threshold_lower", np.nan),
+            "threshold_upper": extra.get("threshold_upper", np.nan),
+            "params": rule["params"],
+        })
+
+    for col, rules in plan["columns"].items():
+        for rule, mask, extra in _column_pass(df[col], rules, cache, col):
+            _record(rule, col, mask, extra)
+
+    for rule in plan["expressions"]:
+        passed = df.eval(rule["params"])
+        mask = ~pd.Series(passed, index=df.index).fillna(False).astype(bool).to_numpy()
+        _record(rule, "ALL", mask, {})
+
+    results = pd.DataFrame(records, columns=RESULT_COLUMNS)
+    return results, plan_violations(results)
+
+
+def plan_violations(results: pd.DataFrame) -> pd.DataFrame:
+    """Typed violations for the failing (rule, column) rows of a results frame."""
+    failed = results[results["failed"] > 0]
+    if failed.empty:   # also: a spec with settings only
+        return empty_violations()
+    return concat_violations([make_violations(
+        failed["column"], failed["type"], failed["failed"],
+        failed["failed"].astype(str) + " rows fail " + failed["check"] + " rule " + failed["rule_id"].astype(str),
+        threshold_lower=failed["threshold_lower"], threshold_upper=failed["threshold_upper"],
+        params=({"rule_id": r, "check": c, "rule": p} for r, c, p in zip(failed["rule_id"], failed["check"], failed["params"])),
+        severity=failed["severity"],
+    )])
@@ -1,7 +1,8 @@
 import pandas as pd
-from dateutil.parser import parse as date_parse
 
 def is_date_like(value):
+    from dateutil.parser import parse as date_parse
+
     try:
         if pd.isna(value):
             return False
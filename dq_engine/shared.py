@@ -0,0 +1,283 @@
+# dq_engine/shared.py
+import os
+import pickle
+import shutil
+import tempfile
+import uuid
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Zero-copy DataFrame handoff to worker processes. A frame is published once as an Arrow IPC
+# file in shared memory (/dev/shm when available): numeric / bool / datetime columns as raw
+# buffers, text columns as Arrow string buffers, and optionally a TextCache's factorized codes.
+# Workers receive a small manifest, memory-map the file and rebuild the DataFrame as views of
+# the mapped buffers - nothing is pickled per worker except the manifest and the results.
+# Columns Arrow can't hold as-is (mixed objects, extension dtypes) are pickled once to the
+# segment. Segments are removed when the SharedFrame is closed, collected or the process exits;
+# segments left by a killed process are swept (by owner pid) the next time one is published.
+
+SHARED_PREFIX = "dq-shared-"
+
+
+# --------------------------
+# Segments
+# --------------------------
+
+def _base_dir():
+    shm = "/dev/shm"
+    return shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else tempfile.gettempdir()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_stale(base_dir=None):
+    """Remove segments whose owning process no longer exists; returns how many were removed."""
+    base_dir = base_dir or _base_dir()
+    removed = 0
+    for name in os.listdir(base_dir):
+        if not name.startswith(SHARED_PREFIX):
+            continue
+        try:
+            pid = int(name[len(SHARED_PREFIX):].split("-")[0])
+        except ValueError:
+            continue
+        if not _pid_alive(pid):
+            shutil.rmtree(os.path.join(base_dir, name), ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def _remove(path, owner):
+    if os.getpid() == owner:   # never from a forked child
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# --------------------------
+# Publish / attach
+# --------------------------
+
+def _column_array(ser):
+    """(kind, Arrow array) for a column that maps back without copying, else None."""
+    import pyarrow as pa
+    dtype = ser.dtype
+    if isinstance(dtype, pd.StringDtype) and dtype.storage == "pyarrow":
+        return "str", pa.array(ser.array).cast(pa.large_string())
+    if dtype == object:
+        try:
+            return "str", pa.array(ser.to_numpy(), type=pa.large_string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return None
+    if not isinstance(dtype, np.dtype):
+        return None
+    values = ser.to_numpy()
+    if dtype.kind in "iuf":
+        return "numpy", pa.array(values, from_pandas=False)   # NaN stays a value, no validity bitmap
+    if dtype.kind in "bmM":
+        return "numpy", pa.array(values.view(f"i{dtype.itemsize}"))
+    return None
+
+
+def _text_array(values):
+    import pyarrow as pa
+    try:
+        return pa.array(np.asarray(values, dtype=object), type=pa.large_string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+
+def _publish(df, cache, path):
+    import pyarrow as pa
+    fields, columns = {}, []
+    for i, col in enumerate(df.columns):
+        ser = df.iloc[:, i]
+        spec = {"name": col, "dtype": str(ser.dtype)}
+        packed = _column_array(ser)
+        if packed is None:
+            spec["kind"] = "pickle"
+            with open(os.path.join(path, f"p{i}.pkl"), "wb") as fh:
+                pickle.dump(ser.array, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            spec["kind"], fields[f"c{i}"] = packed[0], packed[1]
+        # factorized codes of the caller's TextCache: workers skip the factorize
+        factorized = cache._factorized.get(col) if cache is not None else None
+        uniques = _text_array(factorized[1]) if factorized is not None else None
+        if uniques is not None:
+            fields[f"k{i}"] = pa.array(np.asarray(factorized[0], dtype=np.int64))
+            with pa.OSFile(os.path.join(path, f"u{i}.arrow"), "wb") as sink:
+                with pa.ipc.new_file(sink, pa.schema([("u", pa.large_string())])) as writer:
+                    writer.write_table(pa.table({"u": uniques}))
+            spec["codes"] = True
+        columns.append(spec)
+    table = pa.table(fields) if fields else pa.table({"_": pa.nulls(len(df))})
+    with pa.OSFile(os.path.join(path, "data.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        index_spec = ("range", index.start, index.stop, index.step)
+    else:
+        with open(os.path.join(path, "index.pkl"), "wb") as fh:
+            pickle.dump(index, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        index_spec = ("pickle",)
+    return {"path": path, "n_rows": len(df), "columns": columns, "index": index_spec}
+
+
+class SharedFrame:
+    """
+    A DataFrame published for worker processes (see attach). Use as a context manager or call
+    close(); the segment is also removed when the object is collected or the process exits.
+    cache: a TextCache whose factorized columns are shared along with the data.
+    """
+
+    def __init__(self, df: pd.DataFrame, cache=None, base_dir=None):
+        base_dir = base_dir or _base_dir()
+        sweep_stale(base_dir)
+        self.path = os.path.join(base_dir, f"{SHARED_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:12]}")
+        os.mkdir(self.path)
+        self._finalizer = weakref.finalize(self, _remove, self.path, os.getpid())
+        try:
+            self.manifest = _publish(df, cache, self.path)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_arrow(path):
+    import pyarrow as pa
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def attach(manifest):
+    """
+    (DataFrame, TextCache) over a published frame, with the parent's dtypes. Numeric and "str"
+    columns are views of the memory-mapped buffers; object text columns are rebuilt from theirs
+    (one copy per worker, missing values as None). The TextCache holds the shared factorized
+    codes (or is empty).
+    """
+    import pyarrow as pa
+    from dq_engine.normalize import TextCache
+
+    path = manifest["path"]
+    table = _read_arrow(os.path.join(path, "data.arrow"))
+    if manifest["index"][0] == "range":
+        index = pd.RangeIndex(*manifest["index"][1:])
+    else:
+        with open(os.path.join(path, "index.pkl"), "rb") as fh:
+            index = pickle.load(fh)
+    data, factorized = {}, {}
+    for i, spec in enumerate(manifest["columns"]):
+        if spec["kind"] == "pickle":
+            with open(os.path.join(path, f"p{i}.pkl"), "rb") as fh:
+                values = pickle.load(fh)
+        else:
+            chunk = table.column(f"c{i}").chunk(0)
+            if spec["kind"] == "str" and spec["dtype"] == "object":
+                # the parent's object dtype (a Series: the frame constructor would infer "str")
+                values = pd.Series(chunk.to_numpy(zero_copy_only=False), index=index, dtype=object, copy=False)
+            elif spec["kind"] == "str":
+                values = pd.arrays.ArrowStringArray(pa.chunked_array([chunk]),
+                                                    dtype=pd.StringDtype("pyarrow", na_value=np.nan))
+            else:
+                values = chunk.to_numpy(zero_copy_only=True).view(np.dtype(spec["dtype"]))
+        data[i] = values   # positions: column names may repeat
+        if spec.get("codes"):
+            uniques = _read_arrow(os.path.join(path, f"u{i}.arrow")).column(0).to_numpy(zero_copy_only=False)
+            codes = table.column(f"k{i}").chunk(0).to_numpy(zero_copy_only=True)
+            factorized[spec["name"]] = (codes, pd.Series(uniques.astype(object)))
+    df = pd.DataFrame(data, index=index, copy=False)
+    df.columns = pd.Index([spec["name"] for spec in manifest["columns"]], dtype=object)
+    cache = TextCache(df)
+    cache._factorized.update(factorized)
+    return df, cache
+
+
+# --------------------------
+# Process-parallel validations
+# --------------------------
+
+def _run_group(manifest, func, columns, kwargs, with_bitmap, with_cache):
+    from dq_engine.bitmap import ViolationBitmap
+    from dq_engine.normalize import TextCache
+
+    df, shared_cache = attach(manifest)
+    view = df[list(columns)]
+    kwargs = dict(kwargs)
+    bitmap = ViolationBitmap(len(view)) if with_bitmap else None
+    if with_bitmap:
+        kwargs["bitmap"] = bitmap
+    if with_cache:
+        cache = TextCache(view)
+        cache._factorized.update({c: v for c, v in shared_cache._factorized.items() if c in columns})
+        kwargs["cache"] = cache
+    return func(view, **kwargs), bitmap
+
+
+def column_groups(columns, n_groups):
+    """Round-robin split of `columns` into at most n_groups non-empty groups."""
+    columns = list(columns)
+    n_groups = max(1, min(n_groups, len(columns)))
+    return [columns[i::n_groups] for i in range(n_groups)]
+
+
+def parallel_apply(df: pd.DataFrame, func, groups=None, max_workers=None, bitmap=None, cache=None, **kwargs):
+    """
+    func(df[group], **kwargs) for every column group, each in a worker process attached to one
+    shared copy of df. func must be picklable (a module-level function such as
+    validations.lookup_validation). bitmap: failing rows recorded by the workers are merged into
+    it (func must take `bitmap`); cache: a TextCache whose codes the workers reuse (func must take
+    `cache`). Returns the results in group order. With one worker the groups run in this process.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    groups = groups if groups is not None else column_groups(df.columns, workers)
+    if not groups:
+        return []
+    if workers == 1 or len(groups) == 1:
+        extra = {**kwargs, **({"bitmap": bitmap} if bitmap is not None else {}),
+                 **({"cache": cache} if cache is not None else {})}
+        return [func(df[list(g)], **extra) for g in groups]
+
+    with SharedFrame(df, cache=cache) as shared:
+        with ProcessPoolExecutor(max_workers=min(workers, len(groups))) as pool:
+            futures = [pool.submit(_run_group, shared.manifest, func, list(g), kwargs,
+                                   bitmap is not None, cache is not None) for g in groups]
+            outputs = [f.result() for f in futures]
+    if bitmap is not None:
+        for _, part in outputs:
+            bitmap.merge(part)
+    return [result for result, _ in outputs]
+
+
+def parallel_validation(df: pd.DataFrame, func, max_workers=None, bitmap=None, cache=None, **kwargs):
+    """
+    parallel_apply over column groups for a per-column validation (one result row per column);
+    the result frames concatenated in df's column order.
+    """
+    frames = [r for r in parallel_apply(df, func, max_workers=max_workers, bitmap=bitmap, cache=cache, **kwargs)
+              if isinstance(r, pd.DataFrame) and not r.empty]
+    if not frames:
+        return None
+    out = pd.concat(frames, ignore_index=True)
+    if "column" in out:
+        position = {c: i for i, c in enumerate(df.columns)}
+        out = out.iloc[np.argsort(out["column"].map(position).to_numpy(), kind="stable")].reset_index(drop=True)
+    return out
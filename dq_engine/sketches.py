@@ -0,0 +1,260 @@
+# dq_engine/sketches.py
+import numpy as np
+import pandas as pd
+
+# Bounded-memory frequency summaries for categorical columns, built chunk by chunk.
+# SpaceSaving keeps the `capacity` heaviest values with overestimated counts and an upper
+# bound (`floor`) on the count of anything it dropped; while a column has at most
+# `capacity` distinct values it is exact. A Count-Min sketch answers "how often did v
+# occur" for any value (never under the true count). Both merge by addition, so chunk,
+# sheet or partition sketches combine into the dataset's sketch, and a stored profile's
+# sketches are enough for lookup checks, mode imputation and categorical drift.
+# Values are counted by their text form (str(value)); missing values are not counted.
+
+SKETCH_CAPACITY = 1024
+CMS_WIDTH = 2048   # power of two
+CMS_DEPTH = 4
+LOOKUP_TOP = 10
+
+
+# --------------------------
+# Count-Min
+# --------------------------
+
+class CountMin:
+    """depth x width counter table; estimate(v) = min over rows, >= the true count."""
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH, seed=7):
+        if width & (width - 1):
+            raise ValueError("width must be a power of two")
+        self.width, self.depth, self.seed = width, depth, seed
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 1 << 63, depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, depth, dtype=np.uint64)
+        self._shift = np.uint64(64 - int(width).bit_length() + 1)
+
+    def _buckets(self, keys):
+        h = pd.util.hash_array(np.asarray(keys, dtype=object))
+        return [((a * h + b) >> self._shift).astype(np.int64) for a, b in zip(self._a, self._b)]   # wraps mod 2**64
+
+    def add(self, keys, counts):
+        counts = np.asarray(counts, dtype=np.int64)
+        for row, idx in enumerate(self._buckets(keys)):
+            self.table[row] += np.bincount(idx, weights=counts, minlength=self.width).astype(np.int64)
+        return self
+
+    def estimate(self, keys):
+        if len(keys) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.min([self.table[row][idx] for row, idx in enumerate(self._buckets(keys))], axis=0)
+
+    def merge(self, other):
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Count-Min sketches differ in shape or seed")
+        self.table += other.table
+        return self
+
+
+# --------------------------
+# SpaceSaving (top-k)
+# --------------------------
+
+class SpaceSaving:
+    """
+    Mergeable SpaceSaving summary: counts[v] >= true count of v >= counts[v] - errors[v],
+    and every value not in counts occurred at most `floor` times.
+    """
+
+    def __init__(self, capacity=SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+        self.errors = pd.Series(dtype="int64")
+        self.floor = 0
+
+    @classmethod
+    def exact(cls, counts: pd.Series, capacity=SKETCH_CAPACITY):
+        """Summary of exact counts (a chunk's value_counts), truncated to `capacity`."""
+        out = cls(capacity)
+        counts = counts.astype("int64").sort_values(ascending=False, kind="stable")
+        out.counts = counts.iloc[:capacity]
+        out.errors = pd.Series(0, index=out.counts.index, dtype="int64")
+        out.floor = int(counts.iloc[capacity]) if len(counts) > capacity else 0
+        return out
+
+    def merge(self, other):
+        if other.counts.empty and not other.floor:
+            return self
+        index = self.counts.index.append(other.counts.index[~other.counts.index.isin(self.counts.index)])
+        counts = (self.counts.reindex(index, fill_value=self.floor)
+                  + other.counts.reindex(index, fill_value=other.floor))
+        errors = (self.errors.reindex(index, fill_value=self.floor)
+                  + other.errors.reindex(index, fill_value=other.floor))
+        counts = counts.sort_values(ascending=False, kind="stable")
+        kept = counts.iloc[:self.capacity]
+        dropped = int(counts.iloc[self.capacity]) if len(counts) > self.capacity else 0
+        self.counts, self.errors = kept, errors.reindex(kept.index)
+        self.floor = max(self.floor + other.floor, dropped)
+        return self
+
+    @property
+    def exact_counts(self):
+        return self.floor == 0
+
+
+# --------------------------
+# Per-column sketch
+# --------------------------
+
+class CategoricalSketch:
+    """SpaceSaving top values + Count-Min frequencies + the number of values counted."""
+
+    def __init__(self, capacity=SKETCH_CAPACITY, width=CMS_WIDTH, depth=CMS_DEPTH, seed=7):
+        self.n = 0
+        self.heavy = SpaceSaving(capacity)
+        self.cms = CountMin(width, depth, seed)
+
+    def update(self, ser: pd.Series):
+        """Count the non-null values of one chunk (string work per distinct value only)."""
+        counts = ser.value_counts(dropna=True, sort=False)
+        if len(counts) == 0:
+            return self
+        if not isinstance(counts.index.dtype, pd.StringDtype):
+            counts = pd.Series(counts.to_numpy(dtype=np.int64), index=counts.index.astype(str))
+            if not counts.index.is_unique:   # 1 and "1" share a text form
+                counts = counts.groupby(level=0, sort=False).sum()
+        self.n += int(counts.sum())
+        self.heavy.merge(SpaceSaving.exact(counts, self.heavy.capacity))
+        self.cms.add(counts.index.to_numpy(dtype=object), counts.to_numpy())
+        return self
+
+    def merge(self, other):
+        self.n += other.n
+        self.heavy.merge(other.heavy)
+        self.cms.merge(other.cms)
+        return self
+
+    @property
+    def exact(self):
+        """True while every distinct value is tracked (counts are then exact)."""
+        return self.heavy.exact_counts
+
+    def top(self, k=LOOKUP_TOP):
+        """The k heaviest values with their (over-)estimated counts, most frequent first."""
+        return self.heavy.counts.iloc[:k]
+
+    def heavy_hitters(self, k=LOOKUP_TOP):
+        """Top values certainly more frequent than anything the summary dropped."""
+        top = self.top(k)
+        certain = top - self.heavy.errors.reindex(top.index) > self.heavy.floor
+        return top[certain.to_numpy()]
+
+    def estimate(self, values):
+        """Estimated counts of `values` (never below the truth): min of SpaceSaving and Count-Min."""
+        keys = pd.Index([str(v) for v in values], dtype=object)
+        cms = self.cms.estimate(keys.to_numpy())
+        tracked = self.heavy.counts.reindex(keys).to_numpy(dtype="float64")
+        return np.where(np.isnan(tracked), cms, np.minimum(tracked, cms)).astype(np.int64)
+
+    def mode(self):
+        """Most frequent value; ties resolve to the smallest like Series.mode(). None if empty."""
+        counts = self.heavy.counts
+        if counts.empty:
+            return None
+        return min(counts.index[counts.to_numpy() == counts.iloc[0]])
+
+    def to_dict(self):
+        return {
+            "n": self.n,
+            "capacity": self.heavy.capacity,
+            "floor": self.heavy.floor,
+            "values": self.heavy.counts.index.tolist(),
+            "counts": self.heavy.counts.tolist(),
+            "errors": self.heavy.errors.tolist(),
+            "cms": {"width": self.cms.width, "depth": self.cms.depth, "seed": self.cms.seed,
+                    "table": self.cms.table.tolist()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        cms = data["cms"]
+        out = cls(data["capacity"], cms["width"], cms["depth"], cms["seed"])
+        out.n = int(data["n"])
+        index = pd.Index(data["values"], dtype=object)
+        out.heavy.counts = pd.Series(data["counts"], index=index, dtype="int64")
+        out.heavy.errors = pd.Series(data["errors"], index=index, dtype="int64")
+        out.heavy.floor = int(data["floor"])
+        out.cms.table = np.asarray(cms["table"], dtype=np.int64).reshape(cms["depth"], cms["width"])
+        return out
+
+
+def sketch_columns(df: pd.DataFrame, columns=None, capacity=SKETCH_CAPACITY):
+    """{column: CategoricalSketch} for the text (non-numeric, non-datetime) columns of df."""
+    if columns is None:
+        columns = [c for c in df.columns if is_categorical(df[c])]
+    return {c: CategoricalSketch(capacity).update(df[c]) for c in columns}
+
+
+def is_categorical(ser):
+    return not (pd.api.types.is_numeric_dtype(ser) or pd.api.types.is_datetime64_any_dtype(ser))
+
+
+def load_sketches(source):
+    """A profile (its "sketches") or a {column: sketch | sketch dict} mapping."""
+    if isinstance(source, dict) and "summary" in source:
+        source = source.get("sketches") or {}
+    return {c: s if isinstance(s, CategoricalSketch) else CategoricalSketch.from_dict(s) for c, s in source.items()}
+
+
+# --------------------------
+# Checks from sketches
+# --------------------------
+
+def lookup_from_sketches(sketches, top=LOOKUP_TOP) -> pd.DataFrame:
+    """
+    lookup_validation's table from sketches alone: allowed values = the `top` most frequent
+    stripped categories, invalid = every other value. Exact while the sketch is exact; otherwise
+    the invalid count can be low by at most top * floor.
+    """
+    rows = []
+    for col, sketch in load_sketches(sketches).items():
+        if sketch.n == 0:
+            continue
+        counts = sketch.heavy.counts
+        counts = counts.groupby(counts.index.str.strip(), sort=False).sum().sort_values(ascending=False, kind="stable")
+        allowed = counts.iloc[:top]
+        rows.append({
+            "column": col,
+            "allowed_values": allowed.index.tolist(),
+            "invalid_values_count": max(0, sketch.n - int(allowed.sum())),
+        })
+    return pd.DataFrame(rows) if rows else None
+
+
+def categorical_drift(baseline, current, top=LOOKUP_TOP, threshold=0.1) -> pd.DataFrame:
+    """
+    Category distribution shift per column shared by two runs (profiles or sketch mappings).
+    distance: total variation over the union of both runs' heavy hitters plus an "other" bucket
+    (0 = same mix, 1 = disjoint); new_values / missing_values: heavy hitters of one run that the
+    other run's summary never tracked.
+    """
+    base, cur = load_sketches(baseline), load_sketches(current)
+    rows = []
+    for col in [c for c in cur if c in base]:
+        b, c = base[col], cur[col]
+        if b.n == 0 or c.n == 0:
+            continue
+        b_top, c_top = b.heavy_hitters(top).index, c.heavy_hitters(top).index
+        values = list(b_top.append(c_top[~c_top.isin(b_top)]))
+        p = b.estimate(values) / b.n
+        q = c.estimate(values) / c.n
+        p_other, q_other = max(0.0, 1 - p.sum()), max(0.0, 1 - q.sum())
+        distance = 0.5 * (np.abs(p - q).sum() + abs(p_other - q_other))
+        rows.append({
+            "column": col,
+            "distance": float(min(1.0, distance)),
+            "new_values": list(c_top[~c_top.isin(b.heavy.counts.index)]),
+            "missing_values": list(b_top[~b_top.isin(c.heavy.counts.index)]),
+            "drifted": bool(distance > threshold),
+        })
+    return pd.DataFrame(rows, columns=["column", "distance", "new_values", "missing_values", "drifted"])
@@ -0,0 +1,298 @@
+# dq_engine/streaming.py
+import numpy as np
+import pandas as pd
+
+from dq_engine.keys import near_key_duplicates
+from dq_engine.kernels import NumericAccumulator
+from dq_engine.rules import DEFAULT_SETTINGS
+from dq_engine.patterns import shape_counts, shape_profile
+from dq_engine.scoring import compute_dq_score
+from dq_engine.sketches import CategoricalSketch, is_categorical, lookup_from_sketches
+from dq_engine.validations import _fmt_bound, is_email, is_phone
+from dq_engine.violation_table import (
+    concat_violations, from_contact, from_lookup, from_missing, from_patterns, from_range, from_records,
+)
+
+# Profiling and checks over a stream of DataFrame chunks (Excel sheets, large CSVs):
+# state per column is a handful of counters, a NumericAccumulator and the sorted
+# distinct value hashes, so memory follows chunk size and cardinality, not row count.
+# Text columns also carry a CategoricalSketch (bounded top-k + Count-Min), which gives
+# the profile's sketches and the lookup check without holding the column.
+
+
+def _is_numeric(ser):
+    return pd.api.types.is_numeric_dtype(ser) and not pd.api.types.is_bool_dtype(ser)
+
+
+def _value_hashes(ser):
+    """uint64 hashes of the non-null values; numbers hash as float64 so int / float chunks agree."""
+    vals = ser.dropna()
+    if _is_numeric(vals):
+        vals = vals.astype("float64")
+    return np.unique(pd.util.hash_array(vals.to_numpy()))
+
+
+def _row_hashes(chunk):
+    norm = chunk.copy(deep=False)
+    for c in chunk.columns:
+        if _is_numeric(chunk[c]):
+            norm[c] = chunk[c].astype("float64")
+    return pd.util.hash_pandas_object(norm, index=False).to_numpy()
+
+
+def _is_text(ser):
+    return pd.api.types.is_object_dtype(ser) or isinstance(ser.dtype, pd.StringDtype)
+
+
+def _merge_dtype(seen, dtype):
+    if seen is None or seen == dtype:
+        return dtype
+    if {seen, dtype} <= {"int64", "float64"}:
+        return "float64"
+    return "object"
+
+
+class ChunkProfiler:
+    """profile_dataframe over chunks (same output shape; numeric_stats is None)."""
+
+    def __init__(self, sample_size=100_000):
+        self.sample_size = sample_size
+        self.columns = None
+        self.n_rows = 0
+        self.dtypes = {}
+        self.non_null = {}
+        self.hashes = {}
+        self.non_numeric = set()   # columns that were non-numeric in some chunk
+        self.sketches = {}
+        self.acc = None
+
+    def update(self, chunk: pd.DataFrame):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.acc = NumericAccumulator(self.columns, sample_size=self.sample_size)
+            for c in self.columns:
+                self.non_null[c] = 0
+                self.hashes[c] = np.empty(0, dtype=np.uint64)
+        self.n_rows += len(chunk)
+        numeric = {}
+        for c in self.columns:
+            ser = chunk[c]
+            n = int(ser.notna().sum())
+            self.non_null[c] += n
+            if n == 0:
+                numeric[c] = np.full(len(chunk), np.nan)   # all-null chunk: dtype says nothing
+                continue
+            self.dtypes[c] = _merge_dtype(self.dtypes.get(c), str(ser.dtype))
+            self.hashes[c] = np.union1d(self.hashes[c], _value_hashes(ser))
+            if _is_numeric(ser):
+                numeric[c] = ser
+            else:
+                self.non_numeric.add(c)
+                numeric[c] = np.full(len(chunk), np.nan)
+            if is_categorical(ser):
+                self.sketches.setdefault(c, CategoricalSketch()).update(ser)
+        self.acc.update(pd.DataFrame(numeric, index=chunk.index))
+        return self
+
+    def result(self):
+        columns = self.columns or []
+        stats = self.acc.result() if self.acc is not None else None
+        missing_total = 0
+        cols = {}
+        for c in columns:
+            non_null = self.non_null[c]
+            missing = self.n_rows - non_null
+            missing_total += missing
+            dtype = self.dtypes.get(c, "object")
+            if missing and dtype == "int64":
+                dtype = "float64"
+            info = {
+                "dtype": dtype,
+                "non_null_count": non_null,
+                "missing_count": missing,
+                "unique_count": int(self.hashes[c].size),
+            }
+            if c not in self.non_numeric and stats.loc[c, "count"] > 0:
+                st = stats.loc[c]
+                info.update({"min": float(st["min"]), "max": float(st["max"]),
+                             "mean": float(st["mean"]), "std": float(st["std"])})
+            cols[c] = info
+        summary = {"n_rows": self.n_rows, "n_cols": len(columns), "missing_values": int(missing_total)}
+        sketches = {c: s for c, s in self.sketches.items() if c in self.non_numeric}
+        return {"summary": summary, "columns": cols, "numeric_stats": None, "sketches": sketches}
+
+
+class ChunkChecks:
+    """
+    The chunk-decomposable subset of run_checks, exact over any chunking:
+    completeness / missing data, nulls & blanks, type conformance, full-row duplicates and
+    single-column (near-)key duplicates, email / phone formats and fixed-bound (age) ranges.
+    Lookup categories come from per-column sketches, exact up to SKETCH_CAPACITY distinct values;
+    value-shape counts add up across chunks.
+    Checks needing the whole column at once (IQR outliers, spikes,
+    quantile-based ranges, composite key discovery, declarative rules) need the
+    materialized frame - use run_checks.
+    """
+
+    RANGE_RULES = {"age": (0.0, 120.0)}
+
+    def __init__(self, settings=None):
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(settings or {})
+        self.columns = None
+        self.n_rows = 0
+        self.nulls = {}
+        self.blanks = {}
+        self.bad_numeric = {}
+        self.contact_invalid = {}
+        self.range = {}
+        self.row_hashes = np.empty(0, dtype=np.uint64)
+        self.value_hashes = {}
+        self.fractional = set()   # numeric columns with non-integral values (not key candidates)
+        self.sketches = {}        # text columns -> CategoricalSketch (lookup categories)
+        self.shapes = {}          # text columns -> rows per value shape (format anomalies)
+
+    def _setup(self, chunk):
+        self.columns = list(chunk.columns)
+        for c in self.columns:
+            self.nulls[c] = self.blanks[c] = self.bad_numeric[c] = 0
+            self.value_hashes[c] = np.empty(0, dtype=np.uint64)
+            name = str(c).lower()
+            if self.settings["heuristics"]:
+                if "email" in name:
+                    self.contact_invalid[c] = ["email", 0]
+                elif "phone" in name or "mobile" in name:
+                    self.contact_invalid[c] = ["phone", 0]
+                for key, bounds in self.RANGE_RULES.items():
+                    if key in name:
+                        self.range[c] = {"bounds": bounds, "invalid": 0, "min": np.inf, "max": -np.inf, "numeric": True}
+
+    def update(self, chunk: pd.DataFrame):
+        if self.columns is None:
+            self._setup(chunk)
+        self.n_rows += len(chunk)
+        self.row_hashes = np.union1d(self.row_hashes, _row_hashes(chunk))
+        for c in self.columns:
+            ser = chunk[c]
+            null = ser.isnull()
+            self.nulls[c] += int(null.sum())
+            present = ser[~null]
+            self.value_hashes[c] = np.union1d(self.value_hashes[c], _value_hashes(ser))
+            if pd.api.types.is_float_dtype(ser) and c not in self.fractional and (present % 1 != 0).any():
+                self.fractional.add(c)
+            if not _is_numeric(ser) and not pd.api.types.is_datetime64_any_dtype(ser):
+                # text work once per distinct value, weighted by its row count
+                counts = present.value_counts(sort=False)
+                uniques = counts.index.to_series(index=None)
+                counts = counts.to_numpy()
+                self.blanks[c] += int(counts[(uniques.astype(str).str.strip() == "").to_numpy()].sum())
+                self.bad_numeric[c] += int(counts[pd.to_numeric(uniques, errors="coerce").isnull().to_numpy()].sum())
+            if _is_text(ser) and len(present):
+                self.sketches.setdefault(c, CategoricalSketch()).update(present)
+                shapes = shape_counts(uniques, counts)
+                self.shapes[c] = shapes if c not in self.shapes else self.shapes[c].add(shapes, fill_value=0)
+            if c in self.contact_invalid:
+                kind = self.contact_invalid[c][0]
+                counts = present.value_counts(sort=False)
+                ok = counts.index.to_series(index=None).map(is_email if kind == "email" else is_phone).astype(bool).to_numpy()
+                # missing cells count as invalid, as in email_phone_validation
+                self.contact_invalid[c][1] += int(counts.to_numpy()[~ok].sum()) + int(null.sum())
+            if c in self.range:
+                rng = self.range[c]
+                if not _is_numeric(present) and len(present):
+                    rng["numeric"] = False
+                    continue
+                vals = present.to_numpy(dtype="float64")
+                if vals.size:
+                    lo, hi = rng["bounds"]
+                    rng["invalid"] += int(((vals < lo) | (vals > hi)).sum())
+                    rng["min"], rng["max"] = min(rng["min"], vals.min()), max(rng["max"], vals.max())
+        return self
+
+    def result(self):
+        n = self.n_rows
+        columns = self.columns or []
+        completeness = {c: {"pct_non_null": (n - self.nulls[c]) / (n if n > 0 else 1)} for c in columns}
+        threshold = self.settings["completeness_threshold"]
+
+        orig = []
+        for c, v in completeness.items():
+            if v["pct_non_null"] < threshold:
+                orig.append({"column": c, "type": "Missing Data", "affected_rows": self.nulls[c],
+                             "threshold_lower": threshold, "details": f"{(1 - v['pct_non_null']) * 100:.1f}% missing"})
+        dup_rows = n - int(self.row_hashes.size)
+        dup_records = []
+        if dup_rows > 0:
+            record = {"column": "ALL", "type": "Duplicate Rows", "affected_rows": dup_rows,
+                      "details": f"{dup_rows} duplicate rows found"}
+            orig.append(dict(record))
+            dup_records.append(record)
+        for c in columns:
+            non_null = n - self.nulls[c]
+            bad = self.bad_numeric[c]
+            if non_null and bad / non_null > 0.2:
+                orig.append({"column": c, "type": "Type Conformance", "affected_rows": bad, "threshold_upper": 0.2,
+                             "details": f"{bad / non_null * 100:.1f}% values not numeric"})
+            dups = near_key_duplicates(n, self.nulls[c], int(self.value_hashes[c].size), c in self.fractional,
+                                       self.settings["key_tolerance"])
+            if dups > 0:
+                dup_records.append({"type": "Duplicate Values", "column": c, "affected_rows": dups,
+                                    "details": f"{dups} duplicate keys in {c}"})
+
+        missing = pd.DataFrame([
+            {"column": c, "null_count": self.nulls[c], "blank_count": self.blanks[c],
+             "null_pct": self.nulls[c] / n if n else 0, "blank_pct": self.blanks[c] / n if n else 0}
+            for c in columns
+        ])
+        contact = pd.DataFrame([{"column": c, "type": k, "invalid_count": bad}
+                                for c, (k, bad) in self.contact_invalid.items()]) if self.contact_invalid else None
+        range_rows = [
+            {"column": c, "min": float(r["min"]), "max": float(r["max"]),
+             "rule_range": f"{_fmt_bound(r['bounds'][0])} - {_fmt_bound(r['bounds'][1])}",
+             "rule_min": r["bounds"][0], "rule_max": r["bounds"][1], "invalid_values": r["invalid"]}
+            for c, r in self.range.items() if r["numeric"] and np.isfinite(r["min"])
+        ]
+        pattern_rows = [shape_profile(c, shapes, int(self.value_hashes[c].size), self.settings["pattern_rare_pct"])
+                        for c, shapes in self.shapes.items()]
+        pattern_rows = [r for r in pattern_rows if r is not None]
+        validations = {
+            "range": pd.DataFrame(range_rows) if range_rows else None,
+            "missing": missing,
+            "lookup": lookup_from_sketches(self.sketches),
+            "patterns": pd.DataFrame(pattern_rows) if pattern_rows else None,
+            "contact": contact,
+            "duplicates": pd.DataFrame(dup_records),
+        }
+
+        violations = concat_violations([
+            from_records(orig),
+            from_range(validations["range"]),
+            from_missing(missing, n, self.settings["missing_pct_threshold"]),
+            from_lookup(validations["lookup"]),
+            from_patterns(validations["patterns"]),
+            from_contact(contact),
+            from_records(dup_records),
+        ])
+        avg_completeness = float(np.mean([v["pct_non_null"] for v in completeness.values()])) if completeness else 1.0
+        return {
+            "violations": violations,
+            "dq_score": compute_dq_score(avg_completeness, len(violations)),
+            "validations": validations,
+            "completeness": completeness,
+        }
+
+
+def profile_chunks(chunks, sample_size=100_000):
+    profiler = ChunkProfiler(sample_size)
+    for chunk in chunks:
+        profiler.update(chunk)
+    return profiler.result()
+
+
+def stream_dq(chunks, settings=None, sample_size=100_000):
+    """One pass over `chunks`: {"profile": ..., "checks": ...} without materializing the data."""
+    profiler, checks = ChunkProfiler(sample_size), ChunkChecks(settings)
+    for chunk in chunks:
+        profiler.update(chunk)
+        checks.update(chunk)
+    return {"profile": profiler.result(), "checks": checks.result()}
@@ -0,0 +1,177 @@
+# dq_engine/timeseries.py
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+TIME_NAME_PATTERN = re.compile(r"(date|time|timestamp|_at$|^ts$|_ts$|period|day|month)", re.IGNORECASE)
+METHODS = ("robust_z", "ewma")
+
+
+# --------------------------
+# Timestamp / series detection
+# --------------------------
+
+def _parse_datetimes(ser: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(ser):
+        return ser
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            return pd.to_datetime(ser, errors="coerce", format="mixed")
+        except (TypeError, ValueError):
+            return pd.to_datetime(ser, errors="coerce")
+
+
+def detect_timestamp_column(df: pd.DataFrame, sample=200, min_parse_rate=0.9):
+    """datetime64 columns first, then text columns with a time-like name that parse as dates."""
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            return col
+    for col in df.columns:
+        ser = df[col]
+        if pd.api.types.is_numeric_dtype(ser) or not TIME_NAME_PATTERN.search(str(col)):
+            continue
+        head = ser.dropna().head(sample)
+        if head.empty:
+            continue
+        if _parse_datetimes(head).notna().mean() >= min_parse_rate:
+            return col
+    return None
+
+
+def _series_layout(df, time_col, entity_cols):
+    """
+    Sort once by (entity, timestamp). Returns (order, keys) where `order` maps sorted
+    positions back to frame positions and `keys` are contiguous integer series ids.
+    """
+    ts = _parse_datetimes(df[time_col])
+    valid = ts.notna().to_numpy()
+    t = ts.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    if entity_cols:
+        keys = df[list(entity_cols)].groupby(list(entity_cols), sort=False, dropna=False).ngroup().to_numpy()
+    else:
+        keys = np.zeros(len(df), dtype=np.int64)
+    order = np.lexsort((t, keys))
+    order = order[valid[order]]
+    return order, keys[order]
+
+
+def _group_starts(keys):
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = keys[1:] != keys[:-1]
+    return starts
+
+
+def _shift_within(values, starts):
+    """Value of the previous row in the same series (NaN at series start)."""
+    out = np.empty_like(values)
+    out[0:1] = np.nan
+    out[1:] = values[:-1]
+    out[starts] = np.nan
+    return out
+
+
+# --------------------------
+# Scores
+# --------------------------
+
+def _grouped(values, keys):
+    return pd.Series(values).groupby(keys, sort=False)
+
+
+def _unwind(result, n):
+    # groupby(sort=False).rolling/ewm keeps group order == sorted order because series are contiguous
+    return result.reset_index(level=0, drop=True).sort_index().to_numpy(dtype="float64")[:n]
+
+
+def _series_rolling_median(values, starts, window, min_periods):
+    """
+    Rolling median per series in one flat pass: every series is followed by `window`
+    NaNs, so no window spans two series (NaNs don't count towards min_periods).
+    """
+    offsets = np.arange(len(values)) + window * np.cumsum(starts)
+    padded = np.full(len(values) + window * int(starts.sum()), np.nan)
+    padded[offsets] = values
+    return pd.Series(padded).rolling(window, min_periods=min_periods).median().to_numpy()[offsets]
+
+
+def robust_z_scores(values, keys, window=30, min_periods=5):
+    """
+    Residual vs the trailing rolling median of the same series, scaled by the
+    trailing rolling median absolute deviation (x 1.4826). Baselines exclude the current row.
+    """
+    starts = _group_starts(keys)
+    med = _series_rolling_median(values, starts, window, min_periods)
+    dev = np.abs(values - _shift_within(med, starts))
+    mad = _series_rolling_median(dev, starts, window, min_periods)
+    return _scaled(values - _shift_within(med, starts), 1.4826 * _shift_within(mad, starts))
+
+
+def ewma_scores(values, keys, span=30, min_periods=5):
+    """Residual vs the previous EWMA level, scaled by the EW mean absolute residual (x 1.2533). O(n)."""
+    n = len(values)
+    starts = _group_starts(keys)
+    level = _shift_within(_unwind(_grouped(values, keys).ewm(span=span, min_periods=min_periods).mean(), n), starts)
+    resid = values - level
+    scale = _unwind(_grouped(np.abs(resid), keys).ewm(span=span, min_periods=min_periods).mean(), n)
+    return _scaled(resid, 1.2533 * _shift_within(scale, starts))
+
+
+def _scaled(resid, scale):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = resid / scale
+    # flat baseline: any move away from it is anomalous
+    z = np.where((scale == 0) & (resid != 0), np.inf, z)
+    return np.where((scale == 0) & (resid == 0), 0.0, z)
+
+
+# --------------------------
+# Engine
+# --------------------------
+
+def timeseries_anomalies(df: pd.DataFrame, value_cols=None, time_col=None, entity_cols=None,
+                         method="robust_z", window=30, threshold=3.5, min_periods=5):
+    """
+    Per-series spike detection for every value column.
+    Rows are sorted once by (entity_cols, time_col); all series are scored together
+    with one grouped rolling / EWM pass per value column.
+    Returns (summary DataFrame, {column: bool row mask in frame order}).
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown spike method: {method}")
+    time_col = time_col or detect_timestamp_column(df)
+    if time_col is None:
+        raise ValueError("no timestamp column found; pass time_col")
+    entity_cols = [c for c in (entity_cols or []) if c in df.columns]
+    if value_cols is None:
+        skip = set(entity_cols) | {time_col}
+        value_cols = [c for c in df.columns
+                      if c not in skip and pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+
+    order, keys = _series_layout(df, time_col, entity_cols)
+    n_series = int(len(np.unique(keys))) if len(keys) else 0
+    score = robust_z_scores if method == "robust_z" else ewma_scores
+
+    rows, masks = [], {}
+    for col in value_cols:
+        values = df[col].to_numpy(dtype="float64", na_value=np.nan)[order]
+        if len(values) == 0:
+            continue
+        z = score(values, keys, window, min_periods)
+        flags = np.abs(np.nan_to_num(z, nan=0.0)) > threshold
+        mask = np.zeros(len(df), dtype=bool)
+        mask[order[flags]] = True
+        if flags.any():
+            masks[col] = mask
+        rows.append({
+            "column": col,
+            "time_column": time_col,
+            "series": n_series,
+            "method": method,
+            "threshold": threshold,
+            "anomalies": int(flags.sum()),
+        })
+
+    return pd.DataFrame(rows), masks
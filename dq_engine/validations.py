@@ -3,6 +3,11 @@ import pandas as pd
 import numpy as np
 import re
 
+from dq_engine.keys import KEY_MAX_COLUMNS, KEY_TOLERANCE, discover_keys, key_label
+from dq_engine.kernels import numeric_kernel
+from dq_engine.normalize import TextCache
+from dq_engine.timeseries import detect_timestamp_column, timeseries_anomalies
+
 # --------------------------
 # Email / Phone Pattern
 # --------------------------
@@ -55,37 +60,54 @@ def datatype_validation(df: pd.DataFrame):
 # 2) RANGE VALIDATION (NUMERIC)
 # --------------------------
 
-def range_validation(df: pd.DataFrame):
+def heuristic_range_bounds(col, stats):
+    """Name-based range rule (age / salary, else observed min-max); stats from the numeric kernel."""
+    name = str(col).lower()
+    if "age" in name:
+        return 0, 120
+    if "salary" in name:
+        return 0, stats["q99"] * 5
+    return stats["min"], stats["max"]
+
+
+def _fmt_bound(x):
+    x = float(x)
+    return str(int(x)) if x.is_integer() else str(x)
+
+
+def _numeric_stats(df, cols, stats=None, **params):
+    """Reuse a NumericStats computed upstream (profile / run_checks) when it covers cols with the same params."""
+    if stats is not None and stats.compatible(**params) and all(c in stats for c in cols):
+        return stats
+    return numeric_kernel(df, cols, **params)
+
+
+def range_validation(df: pd.DataFrame, bitmap=None, stats=None):
     numeric_cols = df.select_dtypes(include=[np.number]).columns
 
     if len(numeric_cols) == 0:
         return None
 
+    stats = _numeric_stats(df, numeric_cols, stats, range_rule=heuristic_range_bounds)
     results = []
 
     for col in numeric_cols:
-        series = df[col].dropna()
-        if len(series) == 0:
+        row = stats.row(col)
+        if row["count"] == 0:
             continue
 
-        min_val = series.min()
-        max_val = series.max()
-
-        # smart rule detection
-        if "age" in col.lower():
-            lower, upper = 0, 120
-        elif "salary" in col.lower():
-            lower, upper = 0, series.quantile(0.99) * 5
-        else:
-            lower, upper = min_val, max_val
-
-        invalid = int(((series < lower) | (series > upper)).sum())
+        lower, upper = row["range_lower"], row["range_upper"]
+        invalid = int(row["range_invalid"])
+        if bitmap is not None and invalid > 0:
+            bitmap.add("Range Violation", col, stats.range_masks[col])
 
         results.append({
             "column": col,
-            "min": float(min_val),
-            "max": float(max_val),
-            "rule_range": f"{lower} - {upper}",
+            "min": float(row["min"]),
+            "max": float(row["max"]),
+            "rule_range": f"{_fmt_bound(lower)} - {_fmt_bound(upper)}",
+            "rule_min": float(lower),
+            "rule_max": float(upper),
             "invalid_values": invalid
         })
 
@@ -123,27 +145,32 @@ def null_blank_validation(df: pd.DataFrame):
 # 4) LOOKUP VALIDATION (CATEGORICAL)
 # --------------------------
 
-def lookup_validation(df: pd.DataFrame):
-    cat_cols = df.select_dtypes(include=["object"]).columns
+def lookup_validation(df: pd.DataFrame, bitmap=None, cache=None):
+    cat_cols = df.select_dtypes(include=["object", "string"]).columns
 
     if len(cat_cols) == 0:
         return None
 
+    cache = cache if cache is not None else TextCache(df)
     results = []
 
     for col in cat_cols:
-        data = df[col].dropna().astype(str).str.strip()
-        if data.empty:
+        # counts per stripped distinct value (no per-row string work)
+        counts = cache.counts(col, "strip")
+        if counts.sum() == 0:
             continue
 
         # infer allowed values = top 10 most frequent categories
-        allowed = data.value_counts().head(10).index.tolist()
-        invalid = data[~data.isin(allowed)]
+        allowed = counts.head(10).index.tolist()
+        n_invalid = int(counts.iloc[10:].sum())
+        if bitmap is not None and n_invalid > 0:
+            allowed_set = set(allowed)
+            bitmap.add("Lookup Violation", col, cache.mask(col, lambda u: ~u.isin(allowed_set), "strip"))
 
         results.append({
             "column": col,
             "allowed_values": allowed,
-            "invalid_values_count": int(len(invalid))
+            "invalid_values_count": n_invalid
         })
 
     return pd.DataFrame(results)
@@ -153,32 +180,27 @@ def lookup_validation(df: pd.DataFrame):
 # 5) EMAIL + PHONE VALIDATION
 # --------------------------
 
-def email_phone_validation(df: pd.DataFrame):
+def email_phone_validation(df: pd.DataFrame, bitmap=None, cache=None):
     email_cols = [c for c in df.columns if "email" in c.lower()]
     phone_cols = [c for c in df.columns if "phone" in c.lower() or "mobile" in c.lower()]
 
     if len(email_cols) == 0 and len(phone_cols) == 0:
         return None
 
+    cache = cache if cache is not None else TextCache(df)
     results = []
 
-    for col in email_cols:
-        series = df[col].astype(str).fillna("")
-        invalid = series[~series.apply(is_email)]
-        results.append({
-            "column": col,
-            "type": "email",
-            "invalid_count": int(len(invalid))
-        })
-
-    for col in phone_cols:
-        series = df[col].astype(str).fillna("")
-        invalid = series[~series.apply(is_phone)]
-        results.append({
-            "column": col,
-            "type": "phone",
-            "invalid_count": int(len(invalid))
-        })
+    # patterns are matched once per distinct value; missing cells count as invalid
+    for kind, cols, check in (("email", email_cols, is_email), ("phone", phone_cols, is_phone)):
+        for col in cols:
+            bad = cache.mask(col, lambda u: ~u.map(check).astype(bool), "raw", missing=True)
+            if bitmap is not None:
+                bitmap.add(f"{kind.capitalize()} Validation", col, bad)
+            results.append({
+                "column": col,
+                "type": kind,
+                "invalid_count": int(bad.sum())
+            })
 
     return pd.DataFrame(results)
 def datatype_validation(df):
@@ -195,11 +217,23 @@ def datatype_validation(df):
     return pd.DataFrame(result)
 
 
-def null_blank_validation(df):
+def null_blank_validation(df, bitmap=None, cache=None, pct_threshold=20.0):
+    """
+    Null / blank counts per column. Rows of columns whose missing share passes pct_threshold
+    (the "High Missingness" violation, see from_missing) go to `bitmap`.
+    """
+    cache = cache if cache is not None else TextCache(df)
     res = []
     for col in df.columns:
-        nulls = df[col].isnull().sum()
-        blanks = (df[col].astype(str).str.strip() == "").sum()
+        null_mask = df[col].isnull().to_numpy()
+        if pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_datetime64_any_dtype(df[col]):
+            blank_mask = np.zeros(len(df), dtype=bool)
+        else:
+            blank_mask = cache.mask(col, lambda u: u == "", "strip")
+        nulls = int(null_mask.sum())
+        blanks = int(blank_mask.sum())
+        if bitmap is not None and nulls + blanks and round((nulls + blanks) / len(df) * 100, 2) > pct_threshold:
+            bitmap.add("High Missingness", col, null_mask | blank_mask)
 
         res.append({
             "column": col,
@@ -215,29 +249,58 @@ def null_blank_validation(df):
 # B. CONSISTENCY RULES
 # -----------------------------
 
-def duplicate_detection(df):
+def reported_keys(keys):
+    """
+    Near-keys worth a uniqueness violation: those of the smallest size found. Next to an
+    `id` key or a near-unique `email`, a 3-column near-key is coincidence, not a broken identifier.
+    """
+    if keys is None or keys.empty:
+        return []
+    near = keys[~keys["exact"] & (keys["size"] == keys["size"].min())]
+    return [tuple(c) for c in near["columns"]]
+
+
+def duplicate_detection(df, bitmap=None, keys=None, tolerance=KEY_TOLERANCE, max_columns=KEY_MAX_COLUMNS):
+    """
+    Full-row duplicates, plus repeated values of the discovered (near-)keys only.
+    keys: discover_keys() output (discovered here when None).
+    """
     violations = []
 
-    dup_rows = df[df.duplicated()]
+    dup_mask = df.duplicated()
+    dup_rows = df[dup_mask]
+    if bitmap is not None:
+        bitmap.add("Duplicate Rows", "ALL", dup_mask)
     if not dup_rows.empty:
         violations.append({
             "type": "Duplicate Rows",
+            "column": "ALL",
+            "affected_rows": int(len(dup_rows)),
             "details": f"{len(dup_rows)} duplicate rows found"
         })
 
-    for col in df.columns:
-        dup_vals = df[df[col].duplicated()][col]
-        if len(dup_vals) > 0:
+    if keys is None:
+        keys = discover_keys(df, max_columns=max_columns, tolerance=tolerance)
+    for cols in reported_keys(keys):
+        sub = df[list(cols)]
+        # rows repeating an earlier key; keys with a null are never duplicates (UNIQUE semantics)
+        key_dups = sub.duplicated() & sub.notna().all(axis=1)
+        label = key_label(cols)
+        if bitmap is not None:
+            bitmap.add("Duplicate Values", label, key_dups)
+        count = int(key_dups.sum())
+        if count > 0:
             violations.append({
                 "type": "Duplicate Values",
-                "column": col,
-                "details": f"{len(dup_vals)} duplicates in {col}"
+                "column": label,
+                "affected_rows": count,
+                "details": f"{count} duplicate keys in {label}"
             })
 
     return pd.DataFrame(violations)
 
 
-def foreign_key_validation(df):
+def foreign_key_validation(df, bitmap=None):
     """auto-detect FK-like columns & validate"""
     violations = []
 
@@ -247,11 +310,14 @@ def foreign_key_validation(df):
             if ref_col in df.columns:
                 missing_refs = ~df[col].isin(df[ref_col])
                 count = missing_refs.sum()
+                if bitmap is not None:
+                    bitmap.add("Foreign Key Mismatch", col, missing_refs)
 
                 if count > 0:
                     violations.append({
                         "type": "Foreign Key Mismatch",
                         "column": col,
+                        "affected_rows": int(count),
                         "details": f"{count} values not found in reference column {ref_col}"
                     })
 
@@ -262,53 +328,112 @@ def foreign_key_validation(df):
 # C. STATISTICAL ANOMALIES
 # -----------------------------
 
-def outlier_detection(df):
+def outlier_detection(df, bitmap=None, stats=None):
     violations = []
 
-    for col in df.select_dtypes(include=['number']):
-        series = df[col].dropna()
-        if len(series) < 5:
-            continue
+    cols = list(df.select_dtypes(include=['number']).columns)
+    stats = _numeric_stats(df, cols, stats, iqr_k=1.5, min_rows=5)
 
-        Q1 = series.quantile(0.25)
-        Q3 = series.quantile(0.75)
-        IQR = Q3 - Q1
+    for col in cols:
+        row = stats.row(col)
+        if row["count"] < 5:
+            continue
 
-        lower = Q1 - 1.5 * IQR
-        upper = Q3 + 1.5 * IQR
+        lower = row["iqr_lower"]
+        upper = row["iqr_upper"]
+        n_outliers = int(row["outliers"])
 
-        outliers = series[(series < lower) | (series > upper)]
+        if bitmap is not None and n_outliers > 0:
+            bitmap.add("Outlier Detected", col, stats.outlier_masks[col])
 
-        if len(outliers) > 0:
+        if n_outliers > 0:
             violations.append({
                 "type": "Outlier Detected",
                 "column": col,
-                "details": f"{len(outliers)} outliers found"
+                "affected_rows": n_outliers,
+                "threshold_lower": float(lower),
+                "threshold_upper": float(upper),
+                "details": f"{n_outliers} outliers found"
             })
 
     return pd.DataFrame(violations)
 
 
-def spike_drop_detection(df):
+_ID_NAME = re.compile(r"(?i)(^|_)id$|[a-z]Id$")
+
+
+def _row_order_measure(ser: pd.Series) -> bool:
+    """
+    Numeric column worth a row-order spike check: not an identifier (id-like name, or
+    distinct integers) and not monotonic (sequence numbers, running totals).
+    """
+    if not pd.api.types.is_numeric_dtype(ser) or pd.api.types.is_bool_dtype(ser):
+        return False
+    if _ID_NAME.search(str(ser.name)):
+        return False
+    present = ser.dropna()
+    if present.is_monotonic_increasing or present.is_monotonic_decreasing:
+        return False
+    return not ((present % 1 == 0).all() and present.is_unique)
+
+
+def spike_drop_detection(df, bitmap=None, threshold=0.5, stats=None,
+                         time_col=None, entity_cols=None, method="robust_z", window=30, z_threshold=3.5):
+    """
+    With a timestamp column (time_col, or "auto" to detect one) spikes are scored per series
+    (entity_cols) in time order by the time-series engine; otherwise (and when "auto" finds
+    none) |pct_change| > threshold over row order for monotonic indexes, on measure columns
+    only (identifiers and monotonic columns are skipped).
+    """
+    if time_col == "auto":
+        time_col = detect_timestamp_column(df)
+    if time_col is not None:
+        return _timeseries_spikes(df, bitmap, time_col, entity_cols, method, window, z_threshold)
+
     violations = []
 
-    for col in df.columns:
-        if np.issubdtype(df[col].dtype, np.number) and df.index.is_monotonic:
-            series = df[col].dropna()
+    cols = [c for c in df.columns if df.index.is_monotonic_increasing and _row_order_measure(df[c])]
+    stats = _numeric_stats(df, cols, stats, spike_threshold=threshold, min_rows=5)
 
-            if len(series) < 5:
-                continue
+    for col in cols:
+        row = stats.row(col)
+        if row["count"] < 5:
+            continue
 
-            pct_change = series.pct_change().abs()
-            spikes = pct_change[pct_change > 0.5]  # >50% jump
+        n_spikes = int(row["spikes"])
+        if bitmap is not None and n_spikes > 0:
+            bitmap.add("Sudden Spike/Drop", col, stats.spike_masks[col])
+
+        if n_spikes > 0:
+            violations.append({
+                "type": "Sudden Spike/Drop",
+                "column": col,
+                "affected_rows": n_spikes,
+                "threshold_upper": threshold,
+                "details": f"{n_spikes} anomalies detected"
+            })
+
+    return pd.DataFrame(violations)
 
-            if len(spikes) > 0:
-                violations.append({
-                    "type": "Sudden Spike/Drop",
-                    "column": col,
-                    "details": f"{len(spikes)} anomalies detected"
-                })
 
+def _timeseries_spikes(df, bitmap, time_col, entity_cols, method, window, z_threshold):
+    violations = []
+    summary, masks = timeseries_anomalies(
+        df, time_col=time_col, entity_cols=entity_cols, method=method, window=window, threshold=z_threshold
+    )
+    for row in summary.to_dict("records"):
+        col = row["column"]
+        if row["anomalies"] == 0:
+            continue
+        if bitmap is not None:
+            bitmap.add("Sudden Spike/Drop", col, masks[col])
+        violations.append({
+            "type": "Sudden Spike/Drop",
+            "column": col,
+            "affected_rows": row["anomalies"],
+            "threshold_upper": z_threshold,
+            "details": f"{row['anomalies']} anomalies detected across {row['series']} series ({method} by {time_col})"
+        })
     return pd.DataFrame(violations)
 
 
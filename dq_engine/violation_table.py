@@ -0,0 +1,180 @@
+# dq_engine/violation_table.py
+import numpy as np
+import pandas as pd
+
+# Typed violations table:
+#   column / type / severity -> categorical
+#   affected_rows            -> int64 (failing rows / cells for the rule)
+#   threshold_lower / _upper -> float64 (bound(s) the rule compared against, NaN if n/a)
+#   details                  -> human readable text (PDF / UI)
+#   params                   -> dict with the structured rule details
+VIOLATION_COLUMNS = [
+    "column", "type", "severity", "affected_rows",
+    "threshold_lower", "threshold_upper", "details", "params",
+]
+SEVERITY_LEVELS = ["LOW", "MEDIUM", "HIGH"]
+
+
+def default_severity(types: pd.Series) -> pd.Series:
+    t = types.astype(str)
+    high = t.str.contains("Missing") | t.str.contains("Duplicate")
+    return pd.Series(np.where(high, "HIGH", "MEDIUM"), index=types.index)
+
+
+def empty_violations() -> pd.DataFrame:
+    return finalize_violations(pd.DataFrame({c: [] for c in VIOLATION_COLUMNS}))
+
+
+def make_violations(column, type, affected_rows, details,
+                    threshold_lower=np.nan, threshold_upper=np.nan, params=None, severity=None):
+    """Build a violations frame from array-likes (scalars broadcast)."""
+    out = pd.DataFrame({
+        "column": column,
+        "type": type,
+        "affected_rows": affected_rows,
+        "threshold_lower": threshold_lower,
+        "threshold_upper": threshold_upper,
+        "details": details,
+    })
+    if out.empty:
+        return out.reindex(columns=VIOLATION_COLUMNS)
+    out["severity"] = default_severity(out["type"]) if severity is None else severity
+    out["params"] = [{} for _ in range(len(out))] if params is None else list(params)
+    return out[VIOLATION_COLUMNS]
+
+
+def finalize_violations(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast to the typed schema (categoricals, int counts, float thresholds)."""
+    df = df.reindex(columns=VIOLATION_COLUMNS).reset_index(drop=True)
+    df["column"] = df["column"].where(df["column"].notna(), "ALL").astype(str).astype("category")
+    df["type"] = df["type"].astype(str).astype("category")
+    sev = df["severity"].where(df["severity"].notna(), default_severity(df["type"]))
+    df["severity"] = pd.Categorical(sev, categories=SEVERITY_LEVELS, ordered=True)
+    df["affected_rows"] = pd.to_numeric(df["affected_rows"], errors="coerce").fillna(0).astype("int64")
+    df["threshold_lower"] = pd.to_numeric(df["threshold_lower"], errors="coerce").astype("float64")
+    df["threshold_upper"] = pd.to_numeric(df["threshold_upper"], errors="coerce").astype("float64")
+    df["details"] = df["details"].fillna("").astype(str)
+    df["params"] = [p if isinstance(p, dict) else {} for p in df["params"]]
+    return df
+
+
+def concat_violations(frames) -> pd.DataFrame:
+    frames = [f for f in frames if isinstance(f, pd.DataFrame) and not f.empty]
+    if not frames:
+        return empty_violations()
+    return finalize_violations(pd.concat(frames, ignore_index=True))
+
+
+# --------------------------
+# Converters: validation output -> violations (vectorized, one row per column)
+# --------------------------
+
+def from_records(records) -> pd.DataFrame:
+    """Violation dicts from run_original_checks (already O(columns))."""
+    if not records:
+        return empty_violations()
+    return pd.DataFrame(records).reindex(columns=VIOLATION_COLUMNS)
+
+
+def from_range(frame) -> pd.DataFrame:
+    if not isinstance(frame, pd.DataFrame) or frame.empty:
+        return None
+    f = frame[frame["invalid_values"] > 0]
+    return make_violations(
+        f["column"], "Range Violation", f["invalid_values"],
+        f["invalid_values"].astype(str) + " values outside " + f["rule_range"].astype(str),
+        threshold_lower=f["rule_min"], threshold_upper=f["rule_max"],
+        params=({"rule_range": r} for r in f["rule_range"]),
+    )
+
+
+def from_missing(frame, n_rows: int, pct_threshold: float = 20.0) -> pd.DataFrame:
+    if not isinstance(frame, pd.DataFrame) or frame.empty:
+        return None
+    nulls = frame["nulls"] if "nulls" in frame else frame["null_count"]
+    blanks = frame["blanks"] if "blanks" in frame else frame["blank_count"]
+    total = nulls.astype("int64") + blanks.astype("int64")
+    pct = (total / max(1, n_rows) * 100).round(2)
+    keep = (total > 0) & (pct > pct_threshold)
+    f, total, pct = frame[keep], total[keep], pct[keep]
+    return make_violations(
+        f["column"], "High Missingness", total,
+        total.astype(str) + " missing/blank cells (~" + pct.astype(str) + "%)",
+        threshold_upper=pct_threshold,
+        params=({"pct_missing": float(p)} for p in pct),
+    )
+
+
+def from_lookup(frame) -> pd.DataFrame:
+    if not isinstance(frame, pd.DataFrame) or frame.empty:
+        return None
+    f = frame[frame["invalid_values_count"] > 0]
+    return make_violations(
+        f["column"], "Lookup Violation", f["invalid_values_count"],
+        f["invalid_values_count"].astype(str) + " values not in top allowed categories",
+        params=({"allowed_values": list(a)} for a in f["allowed_values"]),
+    )
+
+
+def from_patterns(frame) -> pd.DataFrame:
+    if not isinstance(frame, pd.DataFrame) or frame.empty:
+        return None
+    f = frame[frame["invalid_count"] > 0]
+    return make_violations(
+        f["column"], "Format Anomaly", f["invalid_count"],
+        [f"{n} values in rare shapes ({', '.join(r[:3])})" for n, r in zip(f["invalid_count"], f["rare_shapes"])],
+        params=({"rare_shapes": list(r), "top_shapes": dict(t)} for r, t in zip(f["rare_shapes"], f["top_shapes"])),
+    )
+
+
+def from_contact(frame) -> pd.DataFrame:
+    if not isinstance(frame, pd.DataFrame) or frame.empty:
+        return None
+    f = frame[frame["invalid_count"] > 0]
+    kind = f["type"].fillna("contact").astype(str)
+    return make_violations(
+        f["column"], kind.str.capitalize() + " Validation", f["invalid_count"],
+        f["invalid_count"].astype(str) + " invalid " + kind + " values",
+        params=({"format": k} for k in kind),
+    )
+
+
+def from_rule_frame(frame, default_type: str) -> pd.DataFrame:
+    """Frames that are already violation-shaped (duplicates / fk / outliers / spikes)."""
+    if not isinstance(frame, pd.DataFrame) or frame.empty:
+        return None
+    f = frame.reindex(columns=VIOLATION_COLUMNS)
+    f["type"] = f["type"].fillna(default_type)
+    return f
+
+
+def from_duplicates(frame, history=None) -> pd.DataFrame:
+    """
+    duplicate_detection's frame; with a DuplicateIndex.check result the "Duplicate Rows" row
+    also counts rows seen in earlier batches (params: within_batch / cross_batch / index_rows).
+    """
+    out = from_rule_frame(frame, "duplicates")
+    if not history:
+        return out
+    out = out if out is not None else empty_violations()
+    is_rows = (out["type"] == "Duplicate Rows").to_numpy()
+    within, cross = int(out["affected_rows"][is_rows].sum()), history["cross_batch"]
+    if within + cross == 0:
+        return out
+    params = {"within_batch": within, "cross_batch": cross, "index_rows": history["index_rows"],
+              "keys": history["keys"]}
+    row = make_violations(["ALL"], "Duplicate Rows", within + cross,
+                          f"{within + cross} duplicate rows found ({cross} seen in earlier batches)",
+                          params=[params])
+    return pd.concat([f for f in (row, out[~is_rows]) if not f.empty], ignore_index=True)
+
+
+def violation_summary(violations: pd.DataFrame) -> pd.DataFrame:
+    """Per (type, severity) totals: violations and affected rows (ReportBuilder's pipeline summary)."""
+    if violations is None or violations.empty:
+        return pd.DataFrame(columns=["type", "severity", "violations", "affected_rows"])
+    return (
+        violations.groupby(["type", "severity"], observed=True)
+        .agg(violations=("column", "size"), affected_rows=("affected_rows", "sum"))
+        .reset_index()
+    )
@@ -0,0 +1,89 @@
+# dq_engine/workbook.py
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from utils.io import EXCEL_CHUNK_ROWS, excel_sheet_names, iter_excel_chunks
+
+# Multi-sheet workbooks: every sheet is its own dataset, streamed from a read-only
+# workbook into the chunked profiler / checks in a separate worker process
+# (openpyxl parsing is pure Python, so threads would serialize on the GIL).
+
+
+def _sheet_worker(path, sheet, chunk_rows, full_checks, rules, settings, memory=None):
+    from dq_engine.streaming import ChunkChecks, ChunkProfiler
+
+    start = time.perf_counter()
+    profiler, checks = ChunkProfiler(), ChunkChecks(settings)
+    frames = [] if full_checks else None
+    for chunk in iter_excel_chunks(path, sheet, chunk_rows):
+        profiler.update(chunk)
+        checks.update(chunk)
+        if frames is not None:
+            frames.append(chunk)
+    profile = profiler.result()
+
+    if frames is not None:
+        # full run_checks needs the sheet in memory (this worker only)
+        from dq_engine.checks import run_checks
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        result = run_checks(df, None, rules=rules, memory=memory)
+        result.pop("bitmap", None)
+    else:
+        result = checks.result()
+    return {"sheet": sheet, "profile": profile, "checks": result, "seconds": time.perf_counter() - start}
+
+
+def check_workbook(source, sheets=None, chunk_rows=EXCEL_CHUNK_ROWS, max_workers=None,
+                   full_checks=False, rules=None, settings=None, executor="process", memory=None):
+    """
+    Profile and check every sheet (or `sheets`) of an .xlsx workbook in parallel.
+    source: path, bytes or a file-like object. Returns {sheet: {"profile", "checks", "seconds"}}
+    in workbook order.
+    Default (full_checks=False) runs the streaming subset of checks (dq_engine.streaming), so a
+    worker's memory follows `chunk_rows`. full_checks=True runs run_checks (and `rules`) on each
+    materialized sheet - memory then grows with the largest sheets being processed at once;
+    `memory` ("auto" or a budget in bytes) is passed to each of those run_checks.
+    """
+    tmp = None
+    if not isinstance(source, (str, os.PathLike)):
+        # workers open the workbook themselves: spill uploads to one temp file instead of
+        # pickling the bytes to every process
+        data = source if isinstance(source, (bytes, bytearray)) else source.read()
+        fd, tmp = tempfile.mkstemp(suffix=".xlsx")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        source = tmp
+    try:
+        names = excel_sheet_names(source)
+        sheets = [s for s in names if sheets is None or s in sheets]
+        workers = max(1, min(len(sheets), max_workers or os.cpu_count() or 1))
+        pool_cls = ProcessPoolExecutor if executor == "process" and workers > 1 else ThreadPoolExecutor
+        with pool_cls(max_workers=workers) as pool:
+            futures = [pool.submit(_sheet_worker, str(source), s, chunk_rows, full_checks, rules, settings, memory)
+                       for s in sheets]
+            results = [f.result() for f in futures]
+    finally:
+        if tmp is not None:
+            os.unlink(tmp)
+    return {r["sheet"]: {k: v for k, v in r.items() if k != "sheet"} for r in results}
+
+
+def workbook_summary(results) -> pd.DataFrame:
+    """One row per sheet: size, score and violation count."""
+    rows = []
+    for sheet, res in results.items():
+        summary = res["profile"]["summary"]
+        rows.append({
+            "sheet": sheet,
+            "rows": summary["n_rows"],
+            "columns": summary["n_cols"],
+            "missing_values": summary["missing_values"],
+            "dq_score": round(float(res["checks"]["dq_score"]), 2),
+            "violations": len(res["checks"]["violations"]),
+            "seconds": round(res["seconds"], 3),
+        })
+    return pd.DataFrame(rows, columns=["sheet", "rows", "columns", "missing_values", "dq_score", "violations", "seconds"])
@@ -1,4 +1,275 @@
+# reports/export.py
+import os
+import tempfile
+import zlib
+
+import numpy as np
+import pandas as pd
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+COMPRESSIONS = (None, "gzip", "zstd")
+
+_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+_COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+_MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
 def make_csv_bytes(df):
     if df is None or (hasattr(df, "empty") and df.empty):
         return b""
-    return df.to_csv(index=False).encode("utf-8")
+    return b"".join(iter_csv_chunks(df))
+
+
+# --------------------------
+# Row selection
+# --------------------------
+
+def _row_mask(mask, n_rows):
+    """Normalise a boolean mask / Series / list of row positions to a bool ndarray."""
+    if mask is None:
+        return None
+    if isinstance(mask, pd.Series):
+        mask = mask.to_numpy()
+    arr = np.asarray(mask)
+    if arr.dtype == bool:
+        if arr.shape[0] != n_rows:
+            raise ValueError(f"row mask has {arr.shape[0]} entries, frame has {n_rows} rows")
+        return arr
+    out = np.zeros(n_rows, dtype=bool)
+    out[arr.astype(np.int64)] = True
+    return out
+
+
+def _iter_frames(df, chunk_rows=DEFAULT_CHUNK_ROWS, mask=None):
+    """Yield row slices of df (optionally filtered by mask) without materialising the full selection."""
+    n = df.shape[0]
+    mask = _row_mask(mask, n)
+    chunk_rows = max(1, int(chunk_rows))
+    emitted = False
+    for start in range(0, n, chunk_rows):
+        stop = min(n, start + chunk_rows)
+        part = df.iloc[start:stop]
+        if mask is not None:
+            sel = mask[start:stop]
+            if not sel.any():
+                continue
+            part = part[sel]
+        emitted = True
+        yield part
+    if not emitted:
+        # keep the header / schema for empty selections
+        yield df.iloc[0:0]
+
+
+# --------------------------
+# Compression
+# --------------------------
+
+def available_compressions():
+    """COMPRESSIONS usable here: zstd only when the 'zstandard' package imports."""
+    return tuple(c for c in COMPRESSIONS if c != "zstd" or zstandard is not None)
+
+
+def _compressor(compression):
+    if compression is None:
+        return None
+    if compression == "gzip":
+        # wbits=31 -> gzip container, readable by gzip.open / pandas
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor().compressobj()
+    raise ValueError(f"unsupported compression: {compression}")
+
+
+def _compress_stream(chunks, compression):
+    comp = _compressor(compression)
+    if comp is None:
+        yield from chunks
+        return
+    for chunk in chunks:
+        out = comp.compress(chunk)
+        if out:
+            yield out
+    tail = comp.flush()
+    if tail:
+        yield tail
+
+
+# --------------------------
+# Format writers (each yields bytes)
+# --------------------------
+
+def iter_csv_chunks(df, chunk_rows=DEFAULT_CHUNK_ROWS, mask=None, encoding="utf-8"):
+    header = True
+    for part in _iter_frames(df, chunk_rows, mask):
+        yield part.to_csv(index=False, header=header).encode(encoding)
+        header = False
+
+
+class _DrainSink:
+    """Minimal writable file object whose buffered bytes can be drained between batches."""
+
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def drain(self):
+        out = b"".join(self._parts)
+        self._parts = []
+        return out
+
+
+def _arrow_schema(df):
+    import pyarrow as pa
+    return pa.Schema.from_pandas(df, preserve_index=False)
+
+
+def _iter_arrow_tables(df, chunk_rows, mask):
+    import pyarrow as pa
+    schema = _arrow_schema(df)
+    for part in _iter_frames(df, chunk_rows, mask):
+        yield schema, pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+
+
+def iter_parquet_chunks(df, chunk_rows=DEFAULT_CHUNK_ROWS, mask=None):
+    import pyarrow.parquet as pq
+    sink = _DrainSink()
+    writer = None
+    for schema, table in _iter_arrow_tables(df, chunk_rows, mask):
+        if writer is None:
+            writer = pq.ParquetWriter(sink, schema)
+        writer.write_table(table)
+        data = sink.drain()
+        if data:
+            yield data
+    if writer is not None:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def iter_arrow_chunks(df, chunk_rows=DEFAULT_CHUNK_ROWS, mask=None):
+    import pyarrow as pa
+    sink = _DrainSink()
+    writer = None
+    for schema, table in _iter_arrow_tables(df, chunk_rows, mask):
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, schema)
+        writer.write_table(table)
+        data = sink.drain()
+        if data:
+            yield data
+    if writer is not None:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+_WRITERS = {
+    "csv": iter_csv_chunks,
+    "parquet": iter_parquet_chunks,
+    "arrow": iter_arrow_chunks,
+}
+
+
+# --------------------------
+# Public export API
+# --------------------------
+
+def iter_export(df, fmt="csv", compression=None, chunk_rows=DEFAULT_CHUNK_ROWS, mask=None):
+    """
+    Stream df as bytes in the requested format.
+    fmt: csv / parquet / arrow; compression: None / gzip / zstd (applied to the byte stream).
+    mask: optional boolean row mask (or row positions) -> export only those rows.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"unsupported export format: {fmt}")
+    if df is None:
+        df = pd.DataFrame()
+    return _compress_stream(_WRITERS[fmt](df, chunk_rows=chunk_rows, mask=mask), compression)
+
+
+def export_filename(base, fmt="csv", compression=None):
+    return f"{base}{_EXTENSIONS[fmt]}{_COMPRESSION_EXTENSIONS.get(compression, '')}"
+
+
+def export_mime(fmt="csv", compression=None):
+    if compression == "gzip":
+        return "application/gzip"
+    if compression == "zstd":
+        return "application/zstd"
+    return _MIME_TYPES[fmt]
+
+
+def export_to_file(df, path, fmt="csv", compression=None, chunk_rows=DEFAULT_CHUNK_ROWS, mask=None):
+    with open(path, "wb") as fh:
+        for chunk in iter_export(df, fmt, compression, chunk_rows, mask):
+            fh.write(chunk)
+    return path
+
+
+def export_to_tempfile(df, fmt="csv", compression=None, chunk_rows=DEFAULT_CHUNK_ROWS, mask=None, dir=None):
+    """Write the export to a named temp file and return its path (caller removes it)."""
+    fd, path = tempfile.mkstemp(suffix=export_filename("", fmt, compression), dir=dir)
+    os.close(fd)
+    try:
+        return export_to_file(df, path, fmt, compression, chunk_rows, mask)
+    except Exception:
+        os.remove(path)
+        raise
+
+
+def export_failed_rows(df, mask, path=None, fmt="csv", compression=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Export only the rows selected by a row mask (e.g. from a check's failing-row bitmap).
+    Returns a byte generator when path is None, else writes the file and returns path.
+    """
+    if path is None:
+        return iter_export(df, fmt, compression, chunk_rows, mask)
+    return export_to_file(df, path, fmt, compression, chunk_rows, mask)
+
+
+def download_payload(df, base="export", fmt="csv", compression=None, mask=None):
+    """
+    Data for st.download_button as (bytes, filename, mime). The button holds the whole
+    payload in memory either way; streaming consumers (the HTTP service) use iter_export.
+    """
+    filename = export_filename(base, fmt, compression)
+    return b"".join(iter_export(df, fmt, compression, mask=mask)), filename, export_mime(fmt, compression)
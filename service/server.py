@@ -0,0 +1,532 @@
+# service/server.py
+"""
+Local HTTP API for programmatic DQ runs (stdlib only).
+
+    python -m service.server --port 8765 --data-root /data
+
+    POST   /runs                  upload (raw body + ?filename=, or multipart `file` / `rules`)
+                                  or JSON {"path": ..., "rules": ..., "pdf": true}; ?wait=<seconds>
+    GET    /runs/<id>             status, per-stage progress and (when done) JSON results
+    DELETE /runs/<id>             cancel
+    GET    /runs/<id>/report.pdf
+    GET    /runs/<id>/violations?format=csv|parquet|arrow&compression=gzip|zstd   (streamed)
+    GET    /runs/<id>/failing_rows?format=...                                     (streamed)
+    GET    /health
+    GET    /metrics               JSON, or ?format=prometheus
+"""
+import argparse
+import importlib
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from email.parser import BytesParser
+from email.policy import default as email_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from dq_engine import registry
+from dq_engine.workbook import workbook_summary
+from dq_engine.jobs import JobManager, NamedBytes, run_memory, run_pipeline, DONE, FAILED
+from dq_engine.rules import parse_rules
+from reports.export import EXPORT_FORMATS, export_filename, export_mime, iter_export
+
+# imported once at startup (with every registry entry) so the first request doesn't pay for them
+WARM_MODULES = (
+    "dq_engine.profiler", "dq_engine.checks", "dq_engine.repairs", "dq_engine.timeseries",
+    "sklearn.neighbors", "utils.io", "pyarrow.parquet", "openpyxl",
+)
+
+JOB_MEMORY_FACTOR = float(os.environ.get("DQ_JOB_MEMORY_FACTOR", "6"))
+LATENCY_SAMPLES = 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# --------------------------
+# JSON conversion of pipeline results
+# --------------------------
+
+def to_jsonable(obj):
+    """DataFrames -> records, numpy scalars -> python, NaN / inf -> None."""
+    if isinstance(obj, pd.DataFrame):
+        return json.loads(obj.to_json(orient="records", date_format="iso", default_handler=str))
+    if isinstance(obj, pd.Series):
+        return to_jsonable(obj.to_dict())
+    if isinstance(obj, dict):
+        return {str(k): to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [to_jsonable(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return str(obj)
+
+
+def result_json(result):
+    profile, checks = result["profile"], result["checks"]
+    bitmap = checks.get("bitmap")
+    counts = bitmap.counts() if bitmap is not None and len(bitmap) else pd.Series(dtype="int64")
+    return to_jsonable({
+        "dq_score": checks.get("dq_score"),
+        "summary": profile.get("summary", {}),
+        "columns": profile.get("columns", {}),
+        "violations": checks.get("violations"),
+        "validations": checks.get("validations", {}),
+        "completeness": checks.get("completeness", {}),
+        "failing_rows": int(bitmap.any_mask().sum()) if bitmap is not None and len(bitmap) else 0,
+        "rule_counts": [{"type": t, "column": c, "rows": int(n)} for (t, c), n in counts.items()],
+        "sheets": workbook_summary(result["sheets"]) if result.get("sheets") else None,
+        "pdf": result.get("pdf") is not None,
+    })
+
+
+# --------------------------
+# Metrics
+# --------------------------
+
+class Metrics:
+    """Request counts, per-route latency (last LATENCY_SAMPLES) and in-flight requests."""
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)                       # (method, route, status) -> n
+        self._latency = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))
+        self._totals = defaultdict(lambda: [0, 0.0])          # route -> [count, seconds]
+        self.in_flight = 0
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def observe(self, method, route, status, seconds):
+        with self._lock:
+            self.in_flight -= 1
+            self._counts[(method, route, status)] += 1
+            self._latency[route].append(seconds)
+            self._totals[route][0] += 1
+            self._totals[route][1] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+            latency = {r: np.array(v) for r, v in self._latency.items()}
+            totals = {r: tuple(v) for r, v in self._totals.items()}
+            in_flight = self.in_flight
+        return {
+            "uptime_s": time.time() - self.started,
+            "in_flight": in_flight,
+            "requests": [{"method": m, "route": r, "status": s, "count": n} for (m, r, s), n in sorted(counts.items())],
+            "latency_s": {
+                r: {
+                    "count": totals[r][0],
+                    "sum": totals[r][1],
+                    "p50": float(np.percentile(v, 50)),
+                    "p95": float(np.percentile(v, 95)),
+                    "p99": float(np.percentile(v, 99)),
+                    "max": float(v.max()),
+                }
+                for r, v in latency.items() if len(v)
+            },
+        }
+
+
+def prometheus_text(snapshot, jobs, warmup_s):
+    lines = [
+        "# TYPE dq_requests_total counter",
+        *(f'dq_requests_total{{method="{r["method"]}",route="{r["route"]}",status="{r["status"]}"}} {r["count"]}'
+          for r in snapshot["requests"]),
+        "# TYPE dq_request_latency_seconds summary",
+    ]
+    for route, lat in snapshot["latency_s"].items():
+        for q in ("p50", "p95", "p99"):
+            lines.append(f'dq_request_latency_seconds{{route="{route}",quantile="0.{q[1:]}"}} {lat[q]:.6f}')
+        lines.append(f'dq_request_latency_seconds_count{{route="{route}"}} {lat["count"]}')
+        lines.append(f'dq_request_latency_seconds_sum{{route="{route}"}} {lat["sum"]:.6f}')
+    lines += [
+        "# TYPE dq_requests_in_flight gauge",
+        f"dq_requests_in_flight {snapshot['in_flight']}",
+        "# TYPE dq_jobs_queued gauge",
+        f"dq_jobs_queued {jobs['queued']}",
+        "# TYPE dq_jobs_running gauge",
+        f"dq_jobs_running {jobs['running']}",
+        "# TYPE dq_jobs_reserved_bytes gauge",
+        f"dq_jobs_reserved_bytes {jobs['reserved_bytes']}",
+        "# TYPE dq_warmup_seconds gauge",
+        f"dq_warmup_seconds {warmup_s:.6f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+# --------------------------
+# Service
+# --------------------------
+
+def _warm_frame(n=64):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "age": rng.integers(0, 130, n),
+        "salary": rng.normal(50_000, 5_000, n),
+        "email": ["user{}@example.com".format(i) if i % 7 else "bad" for i in range(n)],
+        "status": rng.choice(["active", "inactive", None], n),
+    })
+
+
+class DQService:
+    """
+    Job pool + metrics behind the HTTP handler. On start every worker thread runs a tiny
+    pipeline once (imports, numeric kernels, PDF fonts), so real requests start warm.
+    Local paths are only read from under `data_roots`. `memory` is every run's memory governor
+    (dq_engine.jobs.run_memory; None reads DQ_RUN_MEMORY).
+    """
+
+    def __init__(self, max_workers=2, max_memory_bytes=None, data_roots=(), keep_finished=64,
+                 max_upload_bytes=1 << 30, warm=True, memory=None):
+        self.manager = JobManager(max_workers=max_workers, max_memory_bytes=max_memory_bytes,
+                                  keep_finished=keep_finished)
+        self.metrics = Metrics()
+        self.data_roots = [os.path.realpath(r) for r in data_roots]
+        self.max_upload_bytes = max_upload_bytes
+        self.memory = run_memory(memory)    # run_checks' memory governor for every run
+        self.warmup_s = self.warm_up() if warm else 0.0
+
+    def warm_up(self):
+        start = time.perf_counter()
+        for name in WARM_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+        registry.preload()
+        frame = _warm_frame()
+        jobs = [self.manager.submit(run_pipeline, frame, memory=self.memory, label="warm-up")
+                for _ in range(self.manager.max_workers)]
+        for job in jobs:
+            job.wait()
+        return time.perf_counter() - start
+
+    def resolve_path(self, path):
+        real = os.path.realpath(path)
+        if not any(os.path.commonpath([real, root]) == root for root in self.data_roots):
+            raise HTTPError(403, f"path not under a configured data root: {path}")
+        if not os.path.isfile(real):
+            raise HTTPError(404, f"no such file: {path}")
+        return real
+
+    def load_rules(self, rules):
+        """
+        A client's rule spec: an object / list, inline JSON / YAML text, or the path of a
+        .json / .yaml / .yml file under a data root. Parse errors don't echo the spec back.
+        """
+        if rules is None or isinstance(rules, (dict, list)):
+            return rules
+        if not isinstance(rules, str):
+            raise HTTPError(400, "rules must be a spec object or spec text")
+        is_yaml = False
+        if "\n" not in rules and rules.strip().lower().endswith((".json", ".yaml", ".yml")):
+            path = self.resolve_path(rules.strip())
+            is_yaml = path.lower().endswith((".yaml", ".yml"))
+            with open(path, "r", encoding="utf-8") as fh:
+                rules = fh.read()
+        try:
+            return parse_rules(rules, is_yaml=is_yaml)
+        except ImportError as e:
+            raise HTTPError(400, str(e))
+        except Exception:
+            raise HTTPError(400, "invalid rule spec: expected a JSON or YAML mapping / list of rules")
+
+    def submit(self, source, rules=None, make_pdf=True, label=""):
+        size = os.path.getsize(source) if isinstance(source, str) else source.size
+        return self.manager.submit(run_pipeline, source, rules=rules, make_pdf=make_pdf,
+                                   memory=self.memory, est_bytes=int(size * JOB_MEMORY_FACTOR), label=label)
+
+    def job_json(self, job):
+        out = {
+            "id": job.id,
+            "label": job.label,
+            "status": job.status,
+            "elapsed_s": job.elapsed(),
+            "stages": {stage: {"state": s, "message": m} for stage, (s, m) in job.stages().items()},
+        }
+        if job.status == DONE:
+            out["result"] = result_json(job.result)
+            base = f"/runs/{job.id}"
+            out["artifacts"] = {"violations": f"{base}/violations", "failing_rows": f"{base}/failing_rows"}
+            if job.result.get("pdf") is not None:
+                out["artifacts"]["report"] = f"{base}/report.pdf"
+        elif job.status == FAILED:
+            out["error"] = str(job.error)
+        return out
+
+
+def _parse_multipart(content_type, body):
+    msg = BytesParser(policy=email_policy).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    fields = {}
+    for part in msg.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        fields[name] = (part.get_filename(), part.get_payload(decode=True))
+    return fields
+
+
+def _flag(value, default=True):
+    if value is None:
+        return default
+    return str(value).lower() not in ("0", "false", "no")
+
+
+class DQRequestHandler(BaseHTTPRequestHandler):
+    server_version = "dq-service/1.0"
+
+    @property
+    def service(self) -> DQService:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    # -------------------------------------------------------------
+    # plumbing
+    # -------------------------------------------------------------
+    def _dispatch(self, method):
+        start = time.perf_counter()
+        self.service.metrics.begin()
+        route, status = "unmatched", 500
+        try:
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            parts = [p for p in url.path.split("/") if p]
+            route, status = self._route(method, parts, query)
+        except HTTPError as e:
+            status = e.status
+            self._send_json(e.status, {"error": e.message})
+        except Exception as e:
+            status = 500
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            self.service.metrics.observe(method, route, status, time.perf_counter() - start)
+
+    def _send_bytes(self, status, data, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, payload):
+        self._send_bytes(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _send_stream(self, chunks, content_type, filename):
+        # HTTP/1.0: no Content-Length, the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(chunk)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.service.max_upload_bytes:
+            raise HTTPError(413, f"upload larger than {self.service.max_upload_bytes} bytes")
+        return self.rfile.read(length) if length else b""
+
+    def _job(self, job_id):
+        job = self.service.manager.get(job_id)
+        if job is None:
+            raise HTTPError(404, f"unknown run: {job_id}")
+        return job
+
+    def _finished_result(self, job_id):
+        job = self._job(job_id)
+        if job.status != DONE:
+            raise HTTPError(409, f"run {job_id} is {job.status}")
+        return job.result
+
+    # -------------------------------------------------------------
+    # routes
+    # -------------------------------------------------------------
+    def _route(self, method, parts, query):
+        if method == "GET" and parts == ["health"]:
+            self._send_json(200, {"status": "ok", "warmup_s": self.service.warmup_s})
+            return "/health", 200
+
+        if method == "GET" and parts == ["metrics"]:
+            snapshot = self.service.metrics.snapshot()
+            jobs = self.service.manager.stats()
+            if query.get("format") == "prometheus":
+                text = prometheus_text(snapshot, jobs, self.service.warmup_s)
+                self._send_bytes(200, text.encode("utf-8"), "text/plain; version=0.0.4")
+            else:
+                self._send_json(200, {**snapshot, "jobs": jobs, "warmup_s": self.service.warmup_s})
+            return "/metrics", 200
+
+        if method == "POST" and parts == ["runs"]:
+            return "/runs", self._create_run(query)
+
+        if len(parts) >= 2 and parts[0] == "runs":
+            job_id = parts[1]
+            if len(parts) == 2 and method == "GET":
+                self._send_json(200, self.service.job_json(self._job(job_id)))
+                return "/runs/{id}", 200
+            if len(parts) == 2 and method == "DELETE":
+                job = self._job(job_id)
+                self.service.manager.cancel(job_id)
+                self._send_json(202, {"id": job.id, "status": job.status, "cancel_requested": True})
+                return "/runs/{id}", 202
+            if len(parts) == 3 and method == "GET":
+                return self._artifact(job_id, parts[2], query)
+
+        raise HTTPError(404, f"no route for {method} {self.path}")
+
+    def _create_run(self, query):
+        body = self._body()
+        content_type = self.headers.get("Content-Type", "application/octet-stream")
+        rules = query.get("rules")
+        make_pdf = _flag(query.get("pdf"))
+
+        if content_type.startswith("application/json"):
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise HTTPError(400, "invalid JSON body")
+            if "path" not in payload:
+                raise HTTPError(400, "JSON runs need a 'path'")
+            source = self.service.resolve_path(payload["path"])
+            rules = payload.get("rules", rules)
+            make_pdf = _flag(payload.get("pdf"), make_pdf)
+            label = os.path.basename(source)
+        elif content_type.startswith("multipart/form-data"):
+            fields = _parse_multipart(content_type, body)
+            if "file" not in fields:
+                raise HTTPError(400, "multipart runs need a 'file' field")
+            filename, data = fields["file"]
+            source = NamedBytes(filename or query.get("filename", "upload.csv"), data)
+            if "rules" in fields:
+                rules = fields["rules"][1].decode("utf-8")
+            label = source.name
+        else:
+            if not body:
+                raise HTTPError(400, "empty upload")
+            source = NamedBytes(query.get("filename", "upload.csv"), body)
+            label = source.name
+
+        rules = self.service.load_rules(rules)
+        job = self.service.submit(source, rules=rules, make_pdf=make_pdf, label=label)
+        status = 202
+        if "wait" in query:
+            job.wait(float(query["wait"] or 0) or None)
+            status = 200 if job.done else 202
+        self._send_json(status, self.service.job_json(job))
+        return status
+
+    def _artifact(self, job_id, name, query):
+        result = self._finished_result(job_id)
+        route = f"/runs/{{id}}/{name}"
+        if name == "report.pdf":
+            if result.get("pdf") is None:
+                raise HTTPError(404, "no PDF report for this run")
+            self._send_bytes(200, result["pdf"], "application/pdf",
+                             {"Content-Disposition": 'attachment; filename="dq_report.pdf"'})
+            return route, 200
+
+        fmt = query.get("format", "csv")
+        compression = query.get("compression") or None
+        if fmt not in EXPORT_FORMATS:
+            raise HTTPError(400, f"unsupported format: {fmt}")
+        if name == "violations":
+            frame, mask = result["checks"]["violations"], None
+        elif name == "failing_rows":
+            bitmap = result["checks"].get("bitmap")
+            frame = result["df"]
+            mask = bitmap.any_mask() if bitmap is not None else np.zeros(len(frame), dtype=bool)
+        else:
+            raise HTTPError(404, f"unknown artifact: {name}")
+        # validate the compression before the status line goes out
+        chunks = iter_export(frame, fmt, compression, mask=mask)
+        first = next(chunks, b"")
+        self._send_stream(_prepend(first, chunks), export_mime(fmt, compression),
+                          export_filename(name, fmt, compression))
+        return route, 200
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+# --------------------------
+# Entry points
+# --------------------------
+
+def make_server(service, host="127.0.0.1", port=8765, verbose=False):
+    """ThreadingHTTPServer bound to host:port (port 0 picks a free one); serve with .serve_forever()."""
+    server = ThreadingHTTPServer((host, port), DQRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local DQ HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("DQ_MAX_JOBS", "2")))
+    parser.add_argument("--max-memory-mb", type=int, default=None)
+    parser.add_argument("--run-memory", default=os.environ.get("DQ_RUN_MEMORY", "auto"),
+                        help='per-run memory governor: "auto", a budget in MB or "off"')
+    parser.add_argument("--data-root", action="append", default=[],
+                        help="directory local paths may be read from (repeatable)")
+    parser.add_argument("--no-warm", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    service = DQService(
+        max_workers=args.workers,
+        max_memory_bytes=args.max_memory_mb * 2**20 if args.max_memory_mb else None,
+        data_roots=args.data_root,
+        warm=not args.no_warm,
+        memory=args.run_memory,
+    )
+    server = make_server(service, args.host, args.port, verbose=args.verbose)
+    print(f"DQ service on http://{args.host}:{server.server_address[1]} (warm-up {service.warmup_s:.2f}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.manager.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from dq_engine.bitmap import ViolationBitmap
+from dq_engine.checks import run_checks
+
+
+def test_bitmap_union_intersection_and_row_scores():
+    bm = ViolationBitmap(10)
+    bm.add("A", "x", np.arange(10) < 3)
+    bm.add("B", "y", np.arange(10) % 2 == 0)
+    bm.add("C", "z", np.zeros(10, dtype=bool))  # empty masks are not stored
+
+    assert len(bm) == 2
+    assert bm.count("A", "x") == 3
+    assert bm.count() == 6  # rows 0,1,2,4,6,8
+    assert bm.any_mask().tolist() == [True, True, True, False, True, False, True, False, True, False]
+    assert bm.unpack(bm.intersection([("A", "x"), ("B", "y")])).sum() == 2
+    assert bm.row_scores()[0] == 0.0 and bm.row_scores()[9] == 100.0
+
+
+def test_run_checks_records_failing_rows():
+    df = pd.DataFrame({
+        "id": [1, 2, 2, 3, 4, 5],
+        "age": [30, 40, 40, 200, 25, 35],
+    })
+    result = run_checks(df)
+    bm = result["bitmap"]
+    assert bm.rows("Range Violation", "age").tolist() == [3]
+    assert bm.rows("Duplicate Rows", "ALL").tolist() == [2]
+    assert bm.failing_rows(df, "Range Violation", "age")["age"].tolist() == [200]
+
+
+def test_bitmap_only_holds_rules_that_produced_a_violation():
+    n = 40
+    df = pd.DataFrame({"rare": [None] * 2 + ["x"] * (n - 2), "often": [None] * 20 + ["y"] * (n - 20)})   # 5% / 50% null
+    result = run_checks(df)
+    bm, v = result["bitmap"], result["violations"]
+    assert ("High Missingness", "rare") not in bm
+    assert bm.count("High Missingness", "often") == 20
+    high = v[v["type"] == "High Missingness"]
+    assert high["column"].tolist() == ["often"]
+    keys = {(t, c) for t, c in bm.keys() if t == "High Missingness"}
+    assert keys == {("High Missingness", c) for c in high["column"]}
+
+    chunked = run_checks(df, memory=1)["bitmap"]
+    assert ("High Missingness", "rare") not in chunked and chunked.count("High Missingness", "often") == 20
@@ -1,4 +1,6 @@
 import pandas as pd
+import pytest
+
 from dq_engine.checks import run_checks
 from dq_engine.profiler import profile_dataframe
 
@@ -14,3 +16,61 @@ def test_run_checks_detects_missing_and_duplicates():
     assert "dq_score" in result
     # should detect duplicates or missing
     assert result["violations"].shape[0] >= 1
+
+
+def test_run_checks_returns_typed_violation_table():
+    df = pd.DataFrame({
+        "age": [30, 40, None, 200, 25, None],
+        "email": ["a@b.com", "bad", "c@d.org", "e@f.net", "g@h.io", "i@j.com"],
+    })
+    violations = run_checks(df)["violations"]
+    assert str(violations["type"].dtype) == "category"
+    assert violations["affected_rows"].dtype == "int64"
+
+    rng = violations[violations["type"] == "Range Violation"].iloc[0]
+    assert rng["affected_rows"] == 1
+    assert (rng["threshold_lower"], rng["threshold_upper"]) == (0.0, 120.0)
+
+    email = violations[violations["type"] == "Email Validation"].iloc[0]
+    assert email["affected_rows"] == 1
+    assert email["params"] == {"format": "email"}
+
+
+def test_pipeline_summary_totals_violations_by_type(tmp_path):
+    import json
+    from dq_engine.reporting import ReportBuilder
+
+    violations = run_checks(pd.DataFrame({"age": [30, 40, None, 200, 25, None]}))["violations"]
+    file = ReportBuilder(output_dir=str(tmp_path)).build_pipeline_summary(violations)
+    by_type = {r["type"]: r for r in json.load(open(file))["by_type"]}
+    assert by_type["Range Violation"]["violations"] == 1 and by_type["Range Violation"]["affected_rows"] == 1
+    assert sum(r["violations"] for r in by_type.values()) == len(violations)
+
+
+def test_run_checks_selects_columns_and_checks():
+    df = pd.DataFrame({
+        "age": [30, 200, 40, 50],
+        "email": ["a@b.com", "bad", "c@d.org", "e@f.net"],
+        "city": ["x", None, "y", "z"],
+    })
+    result = run_checks(df, exclude_columns=["city"], checks=["range", "contact", "outliers"], exclude_checks=["outliers"])
+    assert result["execution"]["ran"] == ["range", "contact"]
+    assert set(result["validations"]) == {"range", "contact"}
+    assert "city" not in set(result["violations"]["column"])
+    assert {"Range Violation", "Email Validation"} <= set(result["violations"]["type"])
+    assert not result["short_circuited"]
+    with pytest.raises(ValueError):
+        run_checks(df, checks=["nope"])
+
+
+def test_fail_fast_stops_once_threshold_is_out_of_reach():
+    df = pd.DataFrame({"a": [1, None, None, None], "b": [None, None, 1, None], "c": ["x", "y", "x", "y"]})
+    full = run_checks(df)
+    result = run_checks(df, min_score=80)
+    assert result["short_circuited"]
+    assert result["execution"]["ran"] == [] and result["execution"]["max_score"] < 80
+    assert set(result["violations"]["type"]) == {"Missing Data"}
+    assert full["dq_score"] <= result["dq_score"] < 80
+
+    passing = run_checks(df, min_score=10)
+    assert not passing["short_circuited"] and passing["dq_score"] == full["dq_score"]
@@ -0,0 +1,45 @@
+import io
+
+import pandas as pd
+
+from utils.io import read_csv_fast, read_file, sniff_csv
+
+CSV = (
+    "id,name,score,joined,flag,empty\n"
+    "1,Ann,3.5,2024-01-02,true,\n"
+    "2,Bob,,2024-02-03,false,\n"
+    "3,,7,,true,\n"
+)
+
+
+def test_read_csv_fast_matches_read_csv(tmp_path):
+    expected = pd.read_csv(io.StringIO(CSV))
+    pd.testing.assert_frame_equal(read_csv_fast(CSV.encode()), expected)
+
+    path = tmp_path / "data.csv"
+    path.write_bytes(CSV.encode())
+    with open(path, "rb") as fh:   # memory-mapped from disk
+        pd.testing.assert_frame_equal(read_file(fh), expected)
+
+    upload = io.BytesIO(CSV.encode())
+    upload.name = "data.csv"
+    pd.testing.assert_frame_equal(read_file(upload), expected)
+
+
+def test_sniffing_and_column_plan():
+    data = CSV.replace(",", ";").replace("Ann", "Änne").encode("cp1252")
+    opts = sniff_csv(data)
+    assert opts["encoding"] == "cp1252" and opts["delimiter"] == ";" and opts["header"]
+    df = read_csv_fast(data, plan={"id": "string", "joined": "datetime"})
+    assert df.loc[0, "name"] == "Änne"
+    assert df["id"].tolist() == ["1", "2", "3"]
+    assert pd.api.types.is_datetime64_any_dtype(df["joined"]) and df["joined"].isna().sum() == 1
+
+    assert not sniff_csv(b"1,2\n3,4\n", header=False)["header"]
+    assert read_csv_fast(b"1,2\n3,4\n", header=False).columns.tolist() == [0, 1]
+    assert read_csv_fast(b"1,2\n3,4\n").columns.tolist() == ["1", "2"]
+
+
+def test_all_text_csv_keeps_its_header_and_mangles_repeats():
+    for data in (b"name,city\nalice,paris\nbob,rome\n", b"a,a,b\nx,y,z\n"):
+        pd.testing.assert_frame_equal(read_csv_fast(data), pd.read_csv(io.BytesIO(data)))
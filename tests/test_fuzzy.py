@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz
+
+from dq_engine.checks import run_checks
+from dq_engine.fuzzy import band_rows, lsh_pairs, minhash, near_duplicates, row_texts
+
+
+def test_near_duplicate_clusters_next_to_exact_duplicates():
+    df = pd.DataFrame({
+        "name": ["Jon Smith", "John Smith", "Alice Wong", "alice  wong", "Bob Stone", "Bob Stone", "Carla Diaz"],
+        "address": ["12 Main St", "12 Main Street", "5 Oak Ave", "5 Oak Ave.", "9 Elm Rd", "9 Elm Rd", "7 Pine Ct"],
+    })
+    res = near_duplicates(df)
+    assert sorted(res["clusters"].groupby("cluster")["row"].apply(list).tolist()) == [[0, 1], [2, 3]]
+
+    out = run_checks(df, rules={"settings": {"near_duplicates": True}})
+    v = out["violations"]
+    affected = lambda t: set(v.loc[v["type"] == t, "affected_rows"])
+    assert affected("Near Duplicate Rows") == {2}
+    assert affected("Duplicate Rows") == {1}   # the Bob Stone copy stays an exact duplicate
+    assert out["bitmap"].rows("Near Duplicate Rows", "ALL").tolist() == [1, 3]
+
+
+def test_lsh_finds_variants_with_few_candidates():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    words = lambda k: pd.Series(["".join(w) for w in rng.choice(letters, (n, k))])
+    df = pd.DataFrame({"name": words(6).str.cat(words(8), sep=" "), "street": words(9) + " street"})
+    variants = df.sample(200, random_state=1).assign(street=lambda d: d["street"].str.replace(" street", " st"))
+    df = pd.concat([df, variants], ignore_index=True)
+
+    texts = row_texts(df).to_numpy(dtype=object)
+    sig = minhash(texts, 16 * band_rows(len(texts)))
+    pairs = lsh_pairs(sig)
+    assert len(pairs) < 10 * len(texts)                       # near-linear candidate volume
+    found = {tuple(p) for p in pairs.tolist()}
+    truth = [(i, n + k) for k, i in enumerate(variants.index)]
+    assert sum(p in found for p in truth) >= 0.9 * len(truth)
+
+    similar = [p for p in truth if fuzz.token_sort_ratio(texts[p[0]], texts[p[1]]) >= 85]
+    clusters = near_duplicates(df)["clusters"]
+    assert clusters["cluster"].nunique() >= 0.9 * len(similar) > 0
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dq_engine.checks import run_checks
+from dq_engine.history import DuplicateIndex
+
+
+def test_index_finds_rows_of_earlier_batches_across_compactions(tmp_path):
+    index = DuplicateIndex(tmp_path / "events", keys=["event_id"], compact_min_rows=100)
+    day1 = pd.DataFrame({"event_id": np.arange(1000), "v": 1.0})
+    assert index.check(day1)["cross_batch"] == 0
+    assert index.meta["base_rows"] == 1000 and index.meta["delta_rows"] == 0   # compacted
+
+    # replays of day 1 (as floats), new events, and one replay repeated within the batch
+    day2 = pd.DataFrame({"event_id": np.r_[np.arange(990, 1050), [995]].astype(float), "v": 2.0})
+    res = index.check(day2)
+    assert res["cross_batch"] == 10 and res["index_rows"] == 1000
+
+    reopened = DuplicateIndex(tmp_path / "events")
+    assert len(reopened) == 1050 and reopened.meta["batches"] == 2
+    probe = pd.DataFrame({"event_id": [0, 1049, 1050, 5000]})
+    assert reopened.contains(reopened.fingerprints(probe)).tolist() == [True, True, False, False]
+
+    plain = DuplicateIndex(tmp_path / "rows", bloom=False)
+    plain.check(day1)
+    assert plain.contains(plain.fingerprints(probe.assign(v=1.0))).tolist() == [True, False, False, False]
+
+
+def test_run_checks_adds_cross_batch_rows_to_duplicate_rows(tmp_path):
+    first = pd.DataFrame({"id": [1, 2, 3], "city": ["Leeds", "York", "Bath"]})
+    run_checks(first, history=tmp_path)
+    batch = pd.DataFrame({"id": [3, 4, 4, 5], "city": ["Bath", "Hull", "Hull", "Ely"]})
+    res = run_checks(batch, history=DuplicateIndex(tmp_path))
+    v = res["violations"]
+    dup = v[(v["type"] == "Duplicate Rows") & (v["params"].map(bool))].iloc[0]
+    assert dup["affected_rows"] == 2
+    assert dup["params"]["within_batch"] == 1 and dup["params"]["cross_batch"] == 1
+    assert res["bitmap"].rows("Duplicate Rows").tolist() == [0, 2]
+    assert res["validations"]["history"]["index_rows"] == 3
+    assert len(DuplicateIndex(tmp_path)) == 5
+
+
+def test_compaction_commits_through_meta_and_removes_old_files(tmp_path, monkeypatch):
+    index = DuplicateIndex(tmp_path, keys=["id"], compact_min_rows=10**9)
+    index.check(pd.DataFrame({"id": np.arange(100)}))
+    index.compact()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["base.1.u64", "bloom.0.u8", "delta.1.u64", "meta.json"]
+
+    # a compaction that dies before meta.json is replaced leaves the index as it was
+    index.check(pd.DataFrame({"id": np.arange(100, 150)}))
+    monkeypatch.setattr(DuplicateIndex, "_save_meta", lambda self: (_ for _ in ()).throw(OSError("disk full")))
+    with pytest.raises(OSError):
+        index.compact()
+    monkeypatch.undo()
+    reopened = DuplicateIndex(tmp_path)
+    assert reopened.meta["generation"] == 1 and reopened.meta["delta_rows"] == 50
+    assert reopened.contains(reopened.fingerprints(pd.DataFrame({"id": [0, 149, 150]}))).tolist() == [True, True, False]
+    reopened.compact()
+    assert len(reopened) == 150 and not (tmp_path / "base.1.u64").exists()
@@ -0,0 +1,80 @@
+import threading
+
+import pandas as pd
+
+from dq_engine.jobs import JobManager, NamedBytes, run_pipeline, DONE, CANCELLED
+
+
+def _wait(job, timeout=30):
+    for _ in range(int(timeout / 0.01)):
+        if job.done:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_pipeline_reports_stage_and_check_progress():
+    csv = b"id,age,email\n1,30,a@b.com\n2,150,bad\n3,,c@d.org\n"
+    manager = JobManager(max_workers=1)
+    job = manager.submit(run_pipeline, NamedBytes("data.csv", csv), make_pdf=False)
+    _wait(job)
+    manager.shutdown()
+
+    assert job.status == DONE, job.error
+    assert isinstance(job.result["df"], pd.DataFrame)
+    stages = job.stages()
+    assert stages["read"][0] == stages["profile"][0] == stages["checks"][0] == "complete"
+    check_steps = [msg for _, stage, state, msg in job.events if stage == "checks" and state == "running" and msg]
+    assert "range" in check_steps and "original_checks" in check_steps
+    assert job.result["checks"]["memory"]["budget"] > 0     # DQ_RUN_MEMORY defaults to "auto"
+
+
+def test_cancel_and_memory_cap():
+    gate = threading.Event()
+
+    def work(job, name):
+        while not gate.is_set():
+            job.checkpoint()
+            gate.wait(0.01)
+        return name
+
+    manager = JobManager(max_workers=2, max_memory_bytes=100)
+    a = manager.submit(work, "a", est_bytes=80)
+    b = manager.submit(work, "b", est_bytes=80)   # over budget while a runs
+    assert manager.stats()["queued"] == 1 and b.status == "queued"
+
+    manager.cancel(a.id)
+    _wait(a)
+    assert a.status == CANCELLED
+    gate.set()
+    _wait(b)
+    manager.shutdown()
+    assert b.status == DONE and b.result == "b"
+
+    job = JobManager(max_workers=1).submit(lambda j: j.cancel() or j.checkpoint())
+    _wait(job)
+    assert job.status == CANCELLED
+
+
+def test_finished_results_count_against_memory_cap():
+    manager = JobManager(max_workers=1, max_memory_bytes=10_000, keep_finished=64)
+    jobs = [manager.submit(lambda j: {"df": pd.DataFrame({"x": range(500)})}) for _ in range(4)]
+    for job in jobs:
+        _wait(job)
+    manager.shutdown()
+
+    assert all(job.status == DONE and job.result_bytes >= 4000 for job in jobs)
+    kept = [job for job in jobs if manager.get(job.id) is not None]
+    assert kept == jobs[-2:]   # two 4 kB results fit the 10 kB budget; the oldest were dropped
+    assert manager.stats()["retained_bytes"] <= 10_000
+
+
+def test_shutdown_finishes_queued_jobs():
+    gate = threading.Event()
+    manager = JobManager(max_workers=1)
+    running = manager.submit(lambda j: gate.wait(5))
+    queued = manager.submit(lambda j: "never")
+    manager.shutdown(wait=False)
+    assert queued.wait(5) and queued.status == CANCELLED
+    gate.set()
+    assert running.wait(5)
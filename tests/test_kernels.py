@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from dq_engine.kernels import numeric_kernel, NumericAccumulator
+
+
+def _frame(n=500):
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({"a": rng.normal(size=n), "b": rng.integers(0, 100, n).astype(float)})
+    df.loc[::9, "a"] = np.nan
+    return df
+
+
+def test_kernel_matches_pandas_stats_and_masks():
+    df = _frame()
+    stats = numeric_kernel(df, range_rule=lambda col, st: (0, 50) if col == "b" else None, batch_cols=1)
+    a = df["a"].dropna()
+    row = stats.row("a")
+    assert row["count"] == len(a)
+    assert np.isclose(row["std"], a.std()) and np.isclose(row["q3"], a.quantile(0.75))
+
+    q1, q3 = a.quantile(0.25), a.quantile(0.75)
+    expected = (df["a"] < q1 - 1.5 * (q3 - q1)) | (df["a"] > q3 + 1.5 * (q3 - q1))
+    assert stats.outlier_masks.get("a", np.zeros(len(df), bool)).tolist() == expected.tolist()
+
+    assert stats.row("b")["range_invalid"] == int((df["b"] > 50).sum())
+    assert stats.row("a")["spikes"] == int((a.pct_change().abs() > 0.5).sum())
+
+
+def test_accumulator_chunks_and_merge_match_single_pass():
+    df = _frame()
+    full = numeric_kernel(df).table
+    left = NumericAccumulator(["a", "b"]).update(df.iloc[:123]).update(df.iloc[123:300])
+    right = NumericAccumulator(["a", "b"]).update(df.iloc[300:])
+    merged = left.merge(right).result()
+    for col in ("count", "min", "max", "mean", "std", "spikes"):
+        assert np.allclose(merged[col].to_numpy(float), full[col].to_numpy(float)), col
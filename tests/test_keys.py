@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from dq_engine.bitmap import ViolationBitmap
+from dq_engine.keys import discover_keys
+from dq_engine.validations import duplicate_detection
+
+
+def _orders(n=4_000):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "region": np.array(["n", "s", "e", "w"])[np.arange(n) % 4],
+        "order_no": np.arange(n) // 4,                  # unique within a region only
+        "status": rng.choice(["open", "closed"], n),
+        "amount": rng.normal(100, 5, n),
+        "ref": [f"r{i}" for i in range(n)],
+    })
+    df.loc[:14, "ref"] = df.loc[15:29, "ref"].to_numpy()  # 15 repeated references
+    return df
+
+
+def test_discovers_minimal_composite_key_and_near_key():
+    keys = discover_keys(_orders())
+    found = {tuple(r.columns): (r.exact, r.duplicate_rows) for r in keys.itertuples()}
+    assert found[("ref",)] == (False, 15)
+    assert found[("region", "order_no")] == (True, 0)
+    # minimal: no superset of a (near-)key, amount is a measurement
+    assert not any(set(c) > {"ref"} or "amount" in c for c in found)
+
+
+def test_duplicates_reported_for_keys_only():
+    df = _orders()
+    bitmap = ViolationBitmap(len(df))
+    out = duplicate_detection(df, bitmap=bitmap)
+    assert out[["column", "type", "affected_rows"]].values.tolist() == [["ref", "Duplicate Values", 15]]
+    assert bitmap.rows("Duplicate Values", "ref").tolist() == list(range(15, 30))
+
+    clean = df.assign(ref=[f"r{i}" for i in range(len(df))])
+    assert duplicate_detection(clean).empty   # repeated status / region values are not violations
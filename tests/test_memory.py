@@ -0,0 +1,92 @@
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.bitmap import ViolationBitmap
+from dq_engine.checks import run_checks
+from dq_engine.memory import MemoryGovernor, run_chunked
+from dq_engine.validations import null_blank_validation
+
+
+def _frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "amount": rng.normal(100, 10, n),
+        "status": rng.choice(["open", "closed", " ", None], n),
+        "city": rng.choice(["Leeds", "York", "Bath"], n),
+    })
+
+
+def test_tiny_budget_switches_stages_to_cheaper_strategies():
+    df = _frame()
+    full = run_checks(df)
+    cheap = run_checks(df, memory=1)
+    stages = cheap["memory"]["stages"].set_index("stage")
+    assert stages.loc["missing", "strategy"] == "chunked"
+    assert stages.loc["lookup", "strategy"] == "sketch"
+    assert stages.loc["keys", "strategy"] == "sample"
+    assert stages.loc["patterns", "strategy"] == "skip"
+    assert stages.loc["datatype", "strategy"] == "full"
+    assert cheap["validations"]["patterns"] is None
+    pd.testing.assert_frame_equal(cheap["validations"]["missing"], full["validations"]["missing"], check_dtype=False)
+    pd.testing.assert_frame_equal(cheap["validations"]["lookup"], full["validations"]["lookup"], check_dtype=False)
+    assert cheap["bitmap"].count("Missing Values", "status") == full["bitmap"].count("Missing Values", "status")
+    assert "memory" not in full
+
+
+def test_stages_record_peaks_and_chunks_merge_at_offsets():
+    df = _frame(n=1003)
+    governor = MemoryGovernor(budget=None)
+    run_checks(df, rules={"rules": [{"column": "id", "unique": True}]}, memory=governor)
+    report = governor.report()
+    assert report["footprint"] > 0
+    stages = report["stages"]
+    assert {"missing", "rules", "original_checks"} <= set(stages["stage"])
+    assert (stages["peak_rss"] > 0).all()
+    assert stages["traced_peak_bytes"].notna().all()
+
+    whole, chunked = ViolationBitmap(len(df)), ViolationBitmap(len(df))
+    expected = null_blank_validation(df, bitmap=whole)
+    got = run_chunked(null_blank_validation, df, bitmap=chunked, chunk_rows=100)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+    assert np.array_equal(chunked.matrix, whole.matrix)
+
+
+def test_overlapping_runs_share_tracing_and_mark_peaks_process_wide():
+    df = _frame(n=100)
+    first, second = MemoryGovernor().begin(df), MemoryGovernor().begin(df)
+    with first.stage("missing") as shared:
+        pass
+    second.end()
+    assert tracemalloc.is_tracing()     # still traced for the run that is left
+    with first.stage("lookup") as alone:
+        pass
+    first.end()
+    assert not tracemalloc.is_tracing()
+    assert shared["peak_is_stage"] is False and shared["traced_peak_bytes"] is None
+    assert alone["traced_peak_bytes"] is not None
+
+
+def test_stats_run_as_their_own_stage():
+    class Spy(MemoryGovernor):
+        open_stages, nested = 0, []
+
+        @contextmanager
+        def stage(self, name, strategy="full"):
+            if self.open_stages:
+                self.nested.append(name)
+            self.open_stages += 1
+            try:
+                with super().stage(name, strategy) as record:
+                    yield record
+            finally:
+                self.open_stages -= 1
+
+    governor = Spy(budget=None)
+    run_checks(_frame(n=500), memory=governor)
+    stages = list(governor.report()["stages"]["stage"])
+    assert governor.nested == []
+    assert stages.index("stats") < stages.index("range")
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from dq_engine.normalize import TextCache
+from dq_engine.repairs import normalize_categorical
+
+
+def test_text_cache_works_on_distinct_values():
+    df = pd.DataFrame({"country": ["US", " us", "US", None, "De  ", "  "]})
+    cache = TextCache(df)
+
+    codes, uniques = cache.factorized("country")
+    assert len(uniques) == 4 and codes[3] == -1
+    assert cache.counts("country", "strip").to_dict() == {"US": 2, "us": 1, "De": 1, "": 1}
+    assert cache.mask("country", lambda u: u == "", "strip").tolist() == [False] * 5 + [True]
+    # the factorization is shared across forms
+    assert cache.normalized("country", "canonical")[0] is codes
+
+
+def test_normalize_categorical_keeps_missing():
+    df = pd.DataFrame({"status": [" Active", "active ", "IN  ACTIVE", None]})
+    out = normalize_categorical(df, ["status"])
+    assert out["status"].iloc[:3].tolist() == ["active", "active", "in active"]
+    assert pd.isna(out["status"].iloc[3])
@@ -0,0 +1,59 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from dq_engine.partitions import metrics_trend, partition_metrics
+from dq_engine.reporting import ReportBuilder
+
+
+def _events():
+    day = np.repeat(pd.date_range("2024-01-01", periods=3, freq="D"), 4) + pd.Timedelta(hours=5)
+    return pd.DataFrame({
+        "created_at": day,
+        "age": [30, 40, 50, 60, 30, 200, None, 20, None, None, 25, 35],
+        "email": ["a@b.com"] * 4 + ["c@d.org", "bad", "e@f.net", "g@h.io"] + ["i@j.com", "i@j.com", "k@l.com", "m@n.com"],
+    })
+
+
+def test_partition_metrics_per_day_in_one_table():
+    df = _events()
+    df.loc[9] = df.loc[8]   # a duplicate inside day 3
+    table = partition_metrics(df)
+    assert list(table.columns) == ["partition", "column", "metric", "value", "rows"]
+    wide = metrics_trend(table, "completeness", column=None)
+    assert list(wide.index) == list(pd.date_range("2024-01-01", periods=3, freq="D"))
+    assert wide["age"].tolist() == [1.0, 0.75, 0.5]
+
+    validity = metrics_trend(table, "validity", column=None)
+    assert validity.loc["2024-01-02", "age"] == 2 / 3        # 200 is out of range
+    assert validity.loc["2024-01-02", "email"] == 0.75       # "bad"
+    overall = metrics_trend(table)
+    assert overall.loc["2024-01-03", "duplicate_rate"] == 0.25
+    assert overall.loc["2024-01-01", "validity"] == 1.0
+
+
+def test_trend_report_plots_the_metrics_table(tmp_path):
+    table = partition_metrics(_events(), by="created_at", freq="h")
+    assert table["partition"].nunique() == 3
+    builder = ReportBuilder(output_dir=str(tmp_path))
+    assert builder.build_trend_report(table).endswith("dq_trend.png")
+    builder.build_trend_report(table, metric="completeness", column=None)
+    assert (tmp_path / "dq_trend.png").exists()
+    assert plt.get_fignums() == []   # a frame plots into the chart's figure, none left open
+
+
+def test_clean_categorical_data_is_fully_valid():
+    rng = np.random.default_rng(5)
+    n = 3000
+    df = pd.DataFrame({
+        "created_at": pd.date_range("2024-03-01", periods=n, freq="min"),
+        "id": np.arange(n),
+        "store": rng.choice([f"S{i:02d}" for i in range(30)], n),
+        "amount": rng.normal(100, 5, n),
+    })
+    validity = metrics_trend(partition_metrics(df), metric="validity", column=None)
+    assert (validity == 1.0).all().all()
+
+    rules = {"rules": [{"column": "store", "allowed": [f"S{i:02d}" for i in range(29)]}]}
+    declared = metrics_trend(partition_metrics(df, rules=rules), metric="validity", column=None)
+    assert (declared["store"] < 1.0).all() and (declared["amount"] == 1.0).all()
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from dq_engine.checks import run_checks
+from dq_engine.patterns import coarse_shapes, pattern_validation, shape_signatures
+from dq_engine.streaming import stream_dq
+
+
+def _frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("ABCDEFGH"))
+    postcode = pd.Series([f"{a}{b}{d} {e}{f}{g}" for a, b, d, e, f, g in zip(
+        rng.choice(letters, n), rng.choice(letters, n), rng.integers(1, 10, n),
+        rng.integers(1, 10, n), rng.choice(letters, n), rng.choice(letters, n))], dtype=object)
+    postcode[:12] = "AB1 2C"      # one character short
+    postcode[12:15] = "12345"     # a different format
+    postcode[15:20] = " "         # blanks are High Missingness, not shapes
+    return pd.DataFrame({
+        "postcode": postcode,
+        "order_id": [f"ORD-{i}" for i in range(n)],   # variable width, one format
+        "status": rng.choice(["open", "closed", "on hold"], n),
+        "amount": rng.normal(100, 5, n),
+    })
+
+
+def test_rare_shapes_are_format_anomalies():
+    assert shape_signatures(pd.Series(["AB12 3cd", "x-7", 42])).tolist() == ["AA99 9aa", "a-9", "99"]
+    assert coarse_shapes(pd.Series(["AAA-9999", "aa99"])).tolist() == ["A-9", "a9"]
+    assert shape_signatures(pd.Series(["José", "Ñandú", "٣4"])).tolist() == ["Aaaa", "Aaaaa", "99"]
+
+    df = _frame()
+    res = pattern_validation(df).set_index("column")
+    assert list(res.index) == ["postcode", "order_id"]   # status: categories, not a format
+    assert res.loc["postcode", "rare_shapes"] == ["AA9 9A", "99999"]
+    assert res.loc["postcode", "invalid_count"] == 15
+    assert res.loc["order_id", "invalid_count"] == 0
+
+    out = run_checks(df)
+    v = out["violations"].set_index("type").loc["Format Anomaly"]
+    assert v["column"] == "postcode" and v["affected_rows"] == 15
+    rows = np.flatnonzero(out["bitmap"].mask("Format Anomaly", "postcode"))
+    assert rows.tolist() == list(range(15))
+
+
+def test_streamed_shape_counts_match_full_run():
+    df = _frame(3000, seed=1)
+    streamed = stream_dq(df.iloc[i:i + 700] for i in range(0, len(df), 700))["checks"]
+    full = run_checks(df)
+    for out in (streamed, full):
+        pat = out["validations"]["patterns"].set_index("column")
+        assert pat.loc["postcode", "rare_shapes"] == ["AA9 9A", "99999"]
+    key = ["column", "affected_rows", "details"]
+    pick = lambda v: v[v["type"] == "Format Anomaly"][key].astype(str).reset_index(drop=True)
+    pd.testing.assert_frame_equal(pick(streamed["violations"]), pick(full["violations"]))
+
+
+def test_free_text_names_have_no_format():
+    rng = np.random.default_rng(2)
+    first = ["Anna", "Liam", "Olivia", "Noah", "Emma", "Lucas", "Mia", "Ethan", "Zoë", "Mary-Jane", "José"]
+    last = ["Smith", "Brown", "Taylor", "Wilson", "Davies", "Evans", "Müller", "O'Neil", "Núñez", "van Dijk"]
+    names = [f"{f} {l}" for f, l in zip(rng.choice(first, 5000), rng.choice(last, 5000))]
+    df = pd.DataFrame({"name": names, "code": [f"C{i:04d}" for i in range(5000)]})
+    res = pattern_validation(df)
+    assert list(res["column"]) == ["code"]
+    assert "Format Anomaly" not in set(run_checks(df)["violations"]["type"])
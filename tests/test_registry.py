@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+import pytest
+
+from dq_engine import registry
+
+
+def test_engine_imports_stay_light():
+    # fresh interpreter: importing the engine / reporting modules must not load optional heavy deps
+    code = (
+        "import sys, dq_engine.checks, dq_engine.jobs, dq_engine.reporting, dq_engine.anomaly, dq_engine.registry;"
+        "print(sorted(m for m in ('sklearn', 'matplotlib', 'reportlab') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_registry_resolves_lazily_and_caches():
+    assert registry.available("pdf")
+    generate_pdf = registry.get("pdf")
+    assert registry.get("pdf") is generate_pdf and "pdf" in registry.loaded()
+
+    registry.register("missing_dep", "dq_engine.not_a_module:run", requires=("not_a_package",))
+    assert not registry.available("missing_dep")
+    with pytest.raises(ImportError):
+        registry.get("missing_dep")
+    with pytest.raises(KeyError):
+        registry.get("nope")
+    del registry.CHECKS["missing_dep"]
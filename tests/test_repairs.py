@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from dq_engine.repairs import suggest_imputations, apply_suggestions
+
+
+def _frame(n=2000):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=n)
+    df = pd.DataFrame({"x": x, "y": 3 * x + rng.normal(scale=0.05, size=n), "c": rng.choice(["a", "b"], n)})
+    df.loc[::10, "y"] = np.nan
+    df.loc[::7, "c"] = None
+    return df
+
+
+def test_simple_suggestions_and_copy_free_apply():
+    df = _frame()
+    sugg = suggest_imputations(df)
+    assert sugg["y"] == {"strategy": "median", "value": float(df["y"].median())}
+    assert sugg["c"]["value"] == df["c"].mode().iloc[0]
+
+    out = apply_suggestions(df, sugg)
+    assert out.isnull().sum().sum() == 0
+    assert df["y"].isnull().sum() > 0  # original untouched
+
+    apply_suggestions(df, sugg, inplace=True)
+    assert df.isnull().sum().sum() == 0
+
+
+def test_model_strategies_fill_from_neighbours():
+    df = _frame()
+    missing = df["y"].isnull()
+    expected = 3 * df.loc[missing, "x"]
+    for strategy in ("knn", "regression"):
+        out = apply_suggestions(df, suggest_imputations(df, strategy=strategy), sample_size=500, chunk_rows=37)
+        assert out["y"].notnull().all()
+        assert (out.loc[missing, "y"] - expected).abs().mean() < 0.2
@@ -0,0 +1,66 @@
+import json
+
+import pandas as pd
+import pytest
+
+from dq_engine.checks import run_checks
+from dq_engine.rules import compile_rules, execute_plan
+
+
+def _frame():
+    return pd.DataFrame({
+        "id": [1, 2, 2, 4, None],
+        "age": [30, 150, 40, -1, 25],
+        "status": ["active", "ACTIVE ", "inactive", "gone", None],
+        "start": [1, 2, 3, 4, 5],
+        "end": [2, 2, 1, 5, 6],
+    })
+
+
+SPEC = {
+    "settings": {"completeness_threshold": 0.5, "heuristics": False},
+    "rules": [
+        {"column": "id", "not_null": True, "unique": True, "severity": "HIGH"},
+        {"column": "age", "range": {"min": 0, "max": 120}},
+        {"column": "age", "range": {"min": 18}, "name": "Adult Check"},
+        {"column": "status", "allowed": ["active", "inactive"]},
+        {"match": "(?i)^stat", "regex": "^[a-z]+$"},
+        {"expression": "end >= start", "id": "ordered_dates"},
+    ],
+}
+
+
+def test_plan_groups_rules_per_column():
+    plan = compile_rules(SPEC, _frame().columns)
+    assert [r["check"] for r in plan["columns"]["age"]] == ["range", "range"]
+    assert len(plan["columns"]["status"]) == 2
+    assert plan["settings"]["completeness_threshold"] == 0.5
+
+
+def test_execute_plan_counts_failures_per_rule():
+    df = _frame()
+    results, violations = execute_plan(df, compile_rules(json.dumps(SPEC), df.columns))
+    failed = results.set_index(["rule_id", "check"])["failed"]
+    assert failed[("rule_0", "not_null")] == 1
+    assert failed[("rule_0", "unique")] == 2
+    assert failed[("rule_1", "range")] == 2
+    assert failed[("rule_2", "range")] == 1
+    assert failed[("rule_3", "allowed")] == 2  # "ACTIVE" (case-sensitive) and "gone"
+    assert failed[("ordered_dates", "expression")] == 1
+    assert set(violations["type"]) >= {"Adult Check", "Uniqueness Violation", "Expression Violation"}
+
+
+def test_run_checks_uses_spec_and_settings():
+    df = _frame()
+    result = run_checks(df, rules=SPEC)
+    assert result["validations"]["range"] is None
+    assert "rules" in result["validations"]
+    assert result["bitmap"].rows("Range Violation", "age").tolist() == [1, 3]
+    assert not (result["violations"]["type"] == "Email Validation").any()
+
+
+def test_rules_for_unknown_columns_raise():
+    spec = {"rules": [{"column": "age", "range": {"min": 0}}, {"column": "agee", "not_null": True},
+                      {"match": "nothing_matches", "not_null": True}]}
+    with pytest.raises(ValueError, match="agee"):
+        compile_rules(spec, ["age", "email"])
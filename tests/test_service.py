@@ -0,0 +1,92 @@
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from service.server import DQService, make_server
+
+CSV = b"id,age,email,status\n1,30,a@b.com,active\n2,150,bad,active\n3,,c@d.org,inactive\n4,40,e@f.net,active\n"
+
+
+@pytest.fixture(scope="module")
+def base_url(tmp_path_factory):
+    root = tmp_path_factory.mktemp("data")
+    (root / "people.csv").write_bytes(CSV)
+    service = DQService(max_workers=1, data_roots=[str(root)], warm=True)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", root
+    server.shutdown()
+    server.server_close()
+    service.manager.shutdown()
+
+
+def _call(url, data=None, method=None, headers=None):
+    req = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, resp.read(), resp.headers
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), e.headers
+
+
+def test_upload_and_path_runs_return_json_and_stream_artifacts(base_url):
+    url, root = base_url
+    status, body, _ = _call(f"{url}/runs?filename=people.csv&wait=60", data=CSV,
+                            headers={"Content-Type": "text/csv"})
+    assert status == 200
+    run = json.loads(body)
+    assert run["status"] == "done"
+    assert run["result"]["summary"]["n_rows"] == 4
+    assert 0 <= run["result"]["dq_score"] <= 100
+    assert run["stages"]["checks"]["state"] == "complete"
+
+    status, body, headers = _call(url + run["artifacts"]["violations"] + "?format=csv")
+    assert status == 200 and "violations.csv" in headers["Content-Disposition"]
+    assert len(pd.read_csv(io.BytesIO(body))) == len(run["result"]["violations"])
+    status, body, _ = _call(url + run["artifacts"]["report"])
+    assert status == 200 and body.startswith(b"%PDF")
+
+    status, body, _ = _call(f"{url}/runs?wait=60", data=json.dumps({"path": str(root / "people.csv"), "pdf": False}).encode(),
+                            headers={"Content-Type": "application/json"})
+    assert status == 200 and json.loads(body)["result"]["summary"]["n_rows"] == 4
+    status, _, _ = _call(f"{url}/runs", data=json.dumps({"path": "/etc/passwd"}).encode(),
+                         headers={"Content-Type": "application/json"})
+    assert status == 403
+
+
+def test_rule_specs_are_inline_or_under_a_data_root(base_url):
+    url, root = base_url
+    secret = root.parent / "secret.yaml"
+    secret.write_text("password: hunter2\n  broken: [\n")
+    post = {"Content-Type": "text/csv"}
+    status, _, _ = _call(f"{url}/runs?filename=people.csv&rules={secret}", data=CSV, headers=post)
+    assert status == 403
+
+    status, body, _ = _call(f"{url}/runs?filename=people.csv&rules=a:%20[", data=CSV, headers=post)
+    assert status == 400 and b"invalid rule spec" in body and b"[" not in body
+
+    spec = json.dumps({"path": str(root / "people.csv"), "pdf": False,
+                       "rules": {"rules": [{"column": "status", "allowed": ["active"]}]}})
+    status, body, _ = _call(f"{url}/runs?wait=60", data=spec.encode(), headers={"Content-Type": "application/json"})
+    types = {v["type"] for v in json.loads(body)["result"]["violations"]}
+    assert status == 200 and "Lookup Violation" in types
+
+
+def test_metrics_report_latency_and_queue_depth(base_url):
+    url, _ = base_url
+    assert _call(f"{url}/health")[0] == 200
+    assert _call(f"{url}/runs/nope")[0] == 404
+
+    metrics = json.loads(_call(f"{url}/metrics")[1])
+    assert metrics["jobs"]["queued"] == 0 and "running" in metrics["jobs"]
+    assert metrics["latency_s"]["/health"]["count"] >= 1
+    assert any(r["status"] == 404 for r in metrics["requests"])
+
+    text = _call(f"{url}/metrics?format=prometheus")[1].decode()
+    assert "dq_jobs_queued 0" in text and 'dq_request_latency_seconds_count{route="/health"}' in text
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.bitmap import ViolationBitmap
+from dq_engine.normalize import TextCache
+from dq_engine.shared import SHARED_PREFIX, SharedFrame, attach, parallel_validation, sweep_stale
+from dq_engine.validations import lookup_validation, null_blank_validation
+
+
+def _frame(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "x": rng.normal(size=n),
+        "n": np.arange(n),
+        "flag": rng.random(n) > 0.5,
+        "ts": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "status": rng.choice(["open", "closed", " ", None], n),
+        "code": pd.Series(rng.choice(["A1", "B2", "zz"], n), dtype=object),
+        "mixed": [i if i % 3 else "x" for i in range(n)],
+        "qty": pd.array(np.where(rng.random(n) < 0.1, None, rng.integers(0, 9, n)), dtype="Int64"),
+    }, index=pd.RangeIndex(10, 10 + n))
+
+
+def test_attach_maps_columns_without_copies_and_cleans_up(tmp_path):
+    df = _frame()
+    cache = TextCache(df)
+    cache.factorized("status")
+    with SharedFrame(df, cache=cache, base_dir=str(tmp_path)) as shared:
+        view, shared_cache = attach(shared.manifest)
+        assert not view["x"].to_numpy().flags.owndata   # a view of the mapped file
+        pd.testing.assert_index_equal(view.index, df.index)
+        for col in ["x", "n", "flag", "ts", "status", "mixed", "qty"]:
+            pd.testing.assert_series_equal(view[col], df[col])
+        # object text keeps its dtype; its missing values come back as None
+        pd.testing.assert_series_equal(view["code"].fillna(np.nan), df["code"])
+        codes, uniques = shared_cache.factorized("status")
+        np.testing.assert_array_equal(codes, cache.factorized("status")[0])
+        path = shared.path
+    assert not os.path.exists(path)
+
+    # a segment left behind by a dead process is swept on the next publish
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    stale = tmp_path / f"{SHARED_PREFIX}{int(dead.stdout)}-abc"
+    stale.mkdir()
+    assert sweep_stale(str(tmp_path)) == 1 and not stale.exists()
+
+
+def test_parallel_validations_match_in_process_runs():
+    df = _frame(4000, seed=1)
+    for func in (lookup_validation, null_blank_validation):
+        expected_bitmap, bitmap = ViolationBitmap(len(df)), ViolationBitmap(len(df))
+        expected = func(df, bitmap=expected_bitmap).reset_index(drop=True)
+        got = parallel_validation(df, func, max_workers=2, bitmap=bitmap, cache=TextCache(df))
+        pd.testing.assert_frame_equal(got[expected.columns], expected, check_dtype=False)
+        pd.testing.assert_series_equal(bitmap.counts().sort_index(), expected_bitmap.counts().sort_index())
+
+
+def test_run_checks_workers_match_in_process(monkeypatch):
+    from dq_engine import checks
+    df = _frame(2000, seed=2)
+    expected = checks.run_checks(df)
+    monkeypatch.setattr(checks, "PARALLEL_MIN_CELLS", 1)
+    got = checks.run_checks(df, workers=2)
+    pd.testing.assert_frame_equal(got["violations"], expected["violations"])
+    for key in ("missing", "lookup"):
+        pd.testing.assert_frame_equal(got["validations"][key], expected["validations"][key], check_dtype=False)
+    assert got["bitmap"].any_mask().sum() == expected["bitmap"].any_mask().sum()
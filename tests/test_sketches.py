@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.profiler import profile_dataframe
+from dq_engine.sketches import CategoricalSketch, categorical_drift, lookup_from_sketches
+from dq_engine.streaming import profile_chunks
+from dq_engine.validations import lookup_validation
+
+
+def _categories(n, seed=0, weights=None):
+    rng = np.random.default_rng(seed)
+    heavy = rng.choice([" a", "b", "c", "d"], n, p=weights or [0.4, 0.3, 0.2, 0.1])
+    tail = np.array([f"id{i}" for i in rng.integers(0, 50_000, n)])
+    return pd.Series(np.where(rng.random(n) < 0.8, heavy, tail))
+
+
+def test_chunked_sketches_merge_and_bound_counts():
+    ser = _categories(60_000)
+    truth = ser.value_counts()
+    parts = [CategoricalSketch(capacity=64).update(ser.iloc[i:i + 7_000]) for i in range(0, len(ser), 7_000)]
+    sketch = parts[0]
+    for part in parts[1:]:
+        sketch.merge(part)
+    sketch = CategoricalSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+    assert sketch.n == len(ser) and not sketch.exact
+    assert list(sketch.top(4).index) == list(truth.index[:4])
+    values = list(truth.index[:4]) + list(truth.index[-3:]) + ["never"]
+    est = sketch.estimate(values)
+    assert (est >= truth.reindex(values, fill_value=0).to_numpy()).all()
+    assert (est[:4] - truth.iloc[:4].to_numpy() <= sketch.heavy.floor).all()
+    assert sketch.mode() == truth.index[0]
+
+    # small cardinality: streamed profile sketches reproduce the exact lookup check
+    df = pd.DataFrame({"status": ser.str.slice(0, 3).where(ser.str.len() < 3), "n": np.arange(len(ser))})
+    profile = profile_chunks(df.iloc[i:i + 5_000] for i in range(0, len(df), 5_000))
+    assert list(profile["sketches"]) == ["status"]
+    expected = lookup_validation(df)
+    got = lookup_from_sketches(profile)
+    assert got["invalid_values_count"].tolist() == expected["invalid_values_count"].tolist()
+    assert set(got["allowed_values"][0]) == set(expected["allowed_values"][0])
+
+
+def test_categorical_drift_between_profiles():
+    base = profile_dataframe(pd.DataFrame({"c": _categories(20_000, seed=1)}))
+    same = profile_dataframe(pd.DataFrame({"c": _categories(20_000, seed=2)}))
+    shifted = pd.DataFrame({"c": _categories(20_000, seed=3, weights=[0.1, 0.1, 0.2, 0.6])})
+    shifted.loc[::5, "c"] = "new"
+    stored = {c: s.to_dict() for c, s in profile_dataframe(shifted)["sketches"].items()}
+
+    drift = categorical_drift(base, same).set_index("column")
+    assert drift.loc["c", "distance"] < 0.05 and not drift.loc["c", "drifted"]
+    drift = categorical_drift(base, stored).set_index("column")
+    assert drift.loc["c", "distance"] > 0.3 and drift.loc["c", "drifted"]
+    assert "new" in drift.loc["c", "new_values"]
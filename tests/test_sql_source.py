@@ -0,0 +1,102 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dq_engine.checks import run_checks
+from dq_engine.profiler import profile_dataframe
+from dq_engine.sql_source import SQLTable, sql_checks, sql_profile
+
+RULES = {"rules": [
+    {"column": "age", "range": {"min": 0, "max": {"quantile": 0.9, "scale": 1}}},
+    {"column": "status", "allowed": ["a", "b"]},
+    {"column": "email", "unique": True},
+    {"expression": "age < salary"},
+]}
+
+
+def _frame(n=600):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "id": np.arange(n),
+        "age": rng.integers(-5, 140, n).astype(float),
+        "salary": rng.normal(5e4, 1e4, n),
+        "email": np.where(rng.random(n) < 0.1, "bad", [f"u{i % 500}@x.com" for i in range(n)]),
+        "status": rng.choice(["a", "b", " c ", "", None] + [f"z{i}" for i in range(12)], n),
+        "customer_id": rng.integers(0, 50, n),
+        "customer": rng.integers(0, 45, n),
+    })
+    df.loc[::17, "age"] = np.nan
+    return pd.concat([df, df.head(3)], ignore_index=True)
+
+
+def _table(df):
+    conn = sqlite3.connect(":memory:")
+    df.to_sql("t", conn, index=False)
+    return conn, SQLTable(conn, "t")
+
+
+def test_pushdown_matches_pandas_profile_and_checks():
+    df = _frame()
+    _, table = _table(df)
+
+    sp, pp = sql_profile(table), profile_dataframe(df)
+    assert sp["summary"] == pp["summary"]
+    for col, info in pp["columns"].items():
+        for key, value in info.items():
+            if key != "dtype":
+                assert np.isclose(sp["columns"][col][key], value), (col, key)
+
+    # spikes are scored over row order, which a table doesn't have (see dq_engine/sql_source.py)
+    sc, rc = sql_checks(table, rules=RULES), run_checks(df, pp, rules=RULES, exclude_checks=["spikes"])
+    cols = ["column", "type", "affected_rows", "threshold_lower", "threshold_upper", "details"]
+    a = sc["violations"][cols].astype(str).sort_values(cols).reset_index(drop=True)
+    b = rc["violations"][cols].astype(str).sort_values(cols).reset_index(drop=True)
+    pd.testing.assert_frame_equal(a, b)
+    assert sc["dq_score"] == rc["dq_score"]
+
+
+def test_pushdown_finds_the_same_violations_below_the_penalty_cap():
+    rng = np.random.default_rng(2)
+    codes = pd.DataFrame({"code": [f"AB-{i:04d}" for i in range(1000)] + ["x1"]})
+    visits = pd.DataFrame({"store": np.tile(np.arange(20), 100), "day": np.repeat(np.arange(100), 20),
+                           "amount": rng.normal(100, 5, 2000)})
+    visits = pd.concat([visits, visits.head(3).assign(amount=[1.0, 2.0, 3.0])], ignore_index=True)
+    for df, expected in ((codes, ("Format Anomaly", "code")), (visits, ("Duplicate Values", "store, day"))):
+        sc = sql_checks(_table(df)[1])
+        rc = run_checks(df, exclude_checks=["spikes"])   # spikes need row order: not pushed down
+        pick = lambda v: set(zip(v["type"].astype(str), v["column"].astype(str)))
+        assert pick(sc["violations"]) == pick(rc["violations"]) and expected in pick(sc["violations"])
+        assert len(rc["violations"]) < 5 and sc["dq_score"] == rc["dq_score"]
+    sample = sc["samples"][("Duplicate Values", "store, day")]
+    assert len(sample) and set(sample["store"]) <= {0, 1, 2} and set(sample["day"]) == {0}
+
+
+def test_orphan_anti_join_and_samples():
+    df = _frame()
+    conn, table = _table(df)
+    pd.DataFrame({"cid": np.arange(40)}).to_sql("customers", conn, index=False)
+
+    out = sql_checks(table, foreign_keys=[{"column": "customer_id", "ref_table": "customers", "ref_column": "cid"}],
+                     sample_rows=3)
+    fk = out["validations"]["foreign_keys"].set_index("column")
+    assert fk.loc["customer_id", "affected_rows"] == int((~df["customer_id"].isin(range(40))).sum())
+    sample = out["samples"][("Foreign Key Mismatch", "customer_id")]
+    assert 0 < len(sample) <= 3
+    assert out["samples"][("Duplicate Rows", "ALL")]["n_copies"].min() == 2
+
+
+def test_expressions_are_translated_not_pasted():
+    df = _frame()
+    _, table = _table(df)
+    exprs = ["(age >= 0) & ~(status == 'b')", "status in ['a', 'b'] or salary / 2 > age * 100",
+             "0 <= age <= 120 and customer != -1"]
+    spec = {"rules": [{"expression": e, "name": f"E{i}"} for i, e in enumerate(exprs)]}
+    sql = sql_checks(table, rules=spec)["validations"]["rules"].set_index("type")["failed"]
+    pandas = run_checks(df, rules=spec)["validations"]["rules"].set_index("type")["failed"]
+    assert sql.to_dict() == pandas.to_dict()
+
+    for bad in ["age > 0) OR (1 = 1", "age > (SELECT 1)", "__import__('os')", "nope > 1", "status.str.len() > 1"]:
+        with pytest.raises(ValueError):
+            sql_checks(table, rules={"rules": [{"expression": bad}]})
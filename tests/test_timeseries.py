@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from dq_engine.timeseries import detect_timestamp_column, timeseries_anomalies
+from dq_engine.validations import spike_drop_detection
+
+
+def _sales(n_stores=20, n_days=40):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "store": np.repeat(np.arange(n_stores), n_days),
+        "day": np.tile(pd.date_range("2024-01-01", periods=n_days).strftime("%Y-%m-%d"), n_stores),
+        # each store has its own level, so a global threshold would be meaningless
+        "sales": np.repeat(rng.uniform(10, 1000, n_stores), n_days) * rng.normal(1, 0.01, n_stores * n_days),
+    })
+    return df.sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+def test_spikes_are_scored_per_series_in_time_order():
+    df = _sales()
+    target = df.index[(df["store"] == 5) & (df["day"] == "2024-01-25")][0]
+    df.loc[target, "sales"] *= 4
+
+    assert detect_timestamp_column(df) == "day"
+    for method in ("robust_z", "ewma"):
+        summary, masks = timeseries_anomalies(df, entity_cols=["store"], method=method, window=10)
+        assert summary.loc[0, "series"] == 20
+        assert masks["sales"][target]
+
+
+def test_spike_drop_detection_uses_timestamp_and_records_rows():
+    df = _sales()
+    target = df.index[(df["store"] == 2) & (df["day"] == "2024-01-30")][0]
+    df.loc[target, "sales"] = 0.0
+    result = spike_drop_detection(df, time_col="auto", entity_cols=["store"], window=10)
+    sales = result[result["column"] == "sales"].iloc[0]
+    assert sales["affected_rows"] >= 1 and "by day" in sales["details"]
+    assert "store" not in set(result["column"])
+
+    # detection is opt-in: without a timestamp column the row-order check runs as before
+    row_order = spike_drop_detection(df)
+    assert not row_order["details"].str.contains("series").any()
+
+
+def test_row_order_spikes_skip_identifiers_and_sequences():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({"id": np.arange(1, 501), "order_no": rng.permutation(500) + 1000,
+                       "store_id": rng.integers(1, 9, 500), "total": np.arange(500) * 3.5,
+                       "amount": rng.normal(100, 5, 500)})
+    assert spike_drop_detection(df).empty
+    df.loc[200, "amount"] = 400.0
+    assert spike_drop_detection(df).set_index("column")["affected_rows"].to_dict() == {"amount": 2}
@@ -0,0 +1,89 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from dq_engine.checks import run_checks
+from dq_engine.profiler import profile_dataframe
+from dq_engine.streaming import stream_dq
+from dq_engine.workbook import check_workbook, workbook_summary
+from utils.io import iter_excel_chunks, read_excel_streaming
+
+
+def _frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "id": np.arange(n),
+        "age": rng.integers(-5, 140, n).astype(float),
+        "email": [f"u{i % (n - 40)}@x.com" if i % 9 else "bad" for i in range(n)],
+        "status": rng.choice(["a", "b", " ", None], n),
+        "code": rng.choice(["1", "2", "x"], n),
+    })
+    df.loc[::13, "age"] = np.nan
+    return pd.concat([df, df.head(4)], ignore_index=True)
+
+
+def _workbook(frames):
+    bio = io.BytesIO()
+    with pd.ExcelWriter(bio, engine="openpyxl") as writer:
+        for name, df in frames.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return bio.getvalue()
+
+
+def test_streamed_sheet_matches_read_excel_and_full_checks():
+    df = _frame(900)
+    data = _workbook({"main": df, "other": df.head(10)})
+    pd.testing.assert_frame_equal(read_excel_streaming(data, "main"), pd.read_excel(io.BytesIO(data), sheet_name="main"))
+    assert [len(c) for c in iter_excel_chunks(data, "main", chunk_rows=400)] == [400, 400, 104]
+
+    gappy = pd.DataFrame({"a": [1.0] + [np.nan] * 10 + [2.0, np.nan], "b": ["x"] + [None] * 10 + ["y", None]})
+    data_gaps = _workbook({"gaps": gappy})
+    assert [len(c) for c in iter_excel_chunks(data_gaps, chunk_rows=4)] == [4, 4, 4]   # blank runs split too
+    pd.testing.assert_frame_equal(read_excel_streaming(data_gaps, chunk_rows=4).isna(), gappy.head(12).isna())
+
+    out = stream_dq(iter_excel_chunks(data, "main", chunk_rows=250))
+    full = pd.read_excel(io.BytesIO(data), sheet_name="main")
+    profile = profile_dataframe(full)
+    assert out["profile"]["summary"] == profile["summary"]
+    assert np.isclose(out["profile"]["columns"]["age"]["mean"], profile["columns"]["age"]["mean"])
+
+    streamed = out["checks"]["violations"]
+    expected = run_checks(full, profile)["violations"]
+    expected = expected[expected["type"].isin(set(streamed["type"]))]
+    key = ["column", "type", "affected_rows", "details"]
+    pd.testing.assert_frame_equal(
+        streamed[key].astype(str).sort_values(key).reset_index(drop=True),
+        expected[key].astype(str).sort_values(key).reset_index(drop=True),
+    )
+
+
+def test_check_workbook_reports_every_sheet():
+    data = _workbook({"a": _frame(300), "b": _frame(120, seed=1), "empty_ish": _frame(45, seed=2)})
+    results = check_workbook(data, chunk_rows=100, max_workers=2)
+    assert list(results) == ["a", "b", "empty_ish"]
+    summary = workbook_summary(results).set_index("sheet")
+    assert summary.loc["a", "rows"] == 304 and summary.loc["b", "rows"] == 124
+
+    full = check_workbook(data, sheets=["b"], full_checks=True)
+    assert list(full) == ["b"]
+    assert full["b"]["checks"]["dq_score"] == run_checks(_frame(120, seed=1))["dq_score"]
+
+
+def test_pipeline_reads_the_first_sheet_once():
+    from dq_engine.jobs import JobManager, NamedBytes, run_pipeline
+    data = _workbook({"a": _frame(120), "b": _frame(60, seed=1)})
+    manager = JobManager(max_workers=1)
+    rules = {"rules": [{"column": "age", "range": {"min": 0, "max": 100}, "name": "Age Limit"}]}
+    job = manager.submit(run_pipeline, NamedBytes("book.xlsx", data), rules=rules, make_pdf=False)
+    job.wait(60)
+    manager.shutdown()
+
+    sheets = job.result["sheets"]
+    assert list(sheets) == ["a", "b"]
+    assert sheets["a"]["checks"] is job.result["checks"]   # reused, not parsed again
+    assert workbook_summary(sheets).set_index("sheet").loc["b", "rows"] == 64
+    # every sheet gets the same checks, rules included
+    other = sheets["b"]["checks"]
+    assert set(other["validations"]) == set(job.result["checks"]["validations"])
+    assert "Age Limit" in set(other["violations"]["type"])
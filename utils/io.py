@@ -1,23 +1,309 @@
+import codecs
+import csv
+import os
+
 import pandas as pd
-from io import BytesIO
+from io import BytesIO, StringIO
+
+EXCEL_CHUNK_ROWS = 50_000
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = ",;\t|"
+
+# leading bytes -> format, for uploads without a usable extension
+_MAGIC = (
+    (b"PK\x03\x04", "xlsx"),
+    (b"\xd0\xcf\x11\xe0", "xls"),
+    (b"PAR1", "parquet"),
+)
+
 
-def read_file(uploaded):
+def sniff_format(head: bytes):
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    return "csv"
+
+
+def _local_path(uploaded):
+    """Path of a real on-disk file object (opened with open()), else None."""
+    try:
+        uploaded.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+    name = getattr(uploaded, "name", None)
+    return name if isinstance(name, (str, os.PathLike)) and os.path.isfile(name) else None
+
+
+def read_file(uploaded, plan=None):
+    """plan: optional CSV column-type plan (see column_plan / read_csv_fast)."""
     name = uploaded.name.lower()
+
+    if name.endswith(".csv"):
+        # no copies: memory-map files on disk, read in-memory uploads through their buffer
+        path = _local_path(uploaded)
+        if path is not None:
+            return read_csv_fast(path, plan=plan)
+        if hasattr(uploaded, "getbuffer"):
+            return read_csv_fast(uploaded.getbuffer(), plan=plan)
+        return read_csv_fast(uploaded.read(), plan=plan)
+
     data = uploaded.read()
     bio = BytesIO(data)
 
-    if name.endswith(".csv"):
-        return pd.read_csv(bio)
+    if name.endswith(".xlsx"):
+        return read_excel_streaming(bio)
 
-    if name.endswith(".xlsx") or name.endswith(".xls"):
+    if name.endswith(".xls"):
         return pd.read_excel(bio)
 
     if name.endswith(".parquet"):
         return pd.read_parquet(bio)
 
-    # fallback
-    try:
-        return pd.read_csv(bio)
-    except Exception:
-        bio.seek(0)
+    # fallback: decide from the content instead of parsing twice
+    fmt = sniff_format(data[:8])
+    if fmt == "xlsx":
+        return read_excel_streaming(bio)
+    if fmt == "xls":
         return pd.read_excel(bio)
+    if fmt == "parquet":
+        return pd.read_parquet(bio)
+    return read_csv_fast(data, plan=plan)
+
+
+# --------------------------
+# Fast CSV (pyarrow, multithreaded)
+# --------------------------
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+def sniff_csv(head: bytes, header=True):
+    """
+    Encoding / delimiter / quote char from the first bytes of a file.
+    Encoding: BOM, else utf-8 if the sample decodes, else cp1252. The first row is the header
+    (as pd.read_csv) unless header=False - csv.Sniffer's guess is wrong for all-text files.
+    """
+    encoding = None
+    for bom, enc in _BOMS:
+        if head.startswith(bom):
+            encoding = enc
+            head = head[len(bom):]
+            break
+    if encoding is None:
+        try:
+            # a multi-byte char may be cut at the end of the sample
+            codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            encoding = "cp1252"
+    text = head.decode(encoding.replace("-sig", ""), errors="replace")
+    # drop the (possibly partial) last line
+    lines = text.splitlines()
+    sample = "\n".join(lines[:-1] if len(lines) > 1 and not text.endswith(("\n", "\r")) else lines)
+
+    delimiter, quotechar = ",", '"'
+    if sample:
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS)
+            delimiter, quotechar = dialect.delimiter, dialect.quotechar or '"'
+        except csv.Error:
+            pass
+    return {"encoding": encoding, "delimiter": delimiter, "quotechar": quotechar, "header": bool(header)}
+
+
+# plan type names (schema_infer inferred_type or pandas dtype strings) -> arrow types
+def _arrow_type(name):
+    import pyarrow as pa
+    name = str(name).lower()
+    if name in ("integer", "int", "int64", "int32", "int16", "int8"):
+        return pa.int64()
+    if name in ("float", "float64", "float32", "double", "number"):
+        return pa.float64()
+    if name in ("boolean", "bool"):
+        return pa.bool_()
+    if name.startswith("datetime") or name in ("timestamp", "date"):
+        return pa.timestamp("ns")
+    return pa.string()
+
+
+def column_plan(schema):
+    """
+    Column-type plan for read_csv_fast from a stored schema:
+    {col: "integer" | "float" | "boolean" | "datetime" | "string" | pandas dtype}
+    or infer_schema() output ({col: {"inferred_type": ...}}).
+    """
+    return {col: (spec.get("inferred_type") or spec.get("dtype")) if isinstance(spec, dict) else spec
+            for col, spec in (schema or {}).items()}
+
+
+def infer_csv_plan(source, sample_bytes=CSV_SNIFF_BYTES):
+    """Plan from schema inference over the first `sample_bytes` of the file."""
+    from dq_engine.schema_infer import infer_schema
+    head = _head_bytes(source, sample_bytes)
+    opts = sniff_csv(head)
+    text = head.decode(opts["encoding"].replace("-sig", ""), errors="ignore").lstrip("\ufeff")
+    complete = text[: text.rfind("\n") + 1] or text
+    sample = pd.read_csv(StringIO(complete), sep=opts["delimiter"], quotechar=opts["quotechar"],
+                         header=0 if opts["header"] else None)
+    return column_plan(infer_schema(sample))
+
+
+def _head_bytes(source, n):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            return fh.read(n)
+    return bytes(memoryview(source)[:n])
+
+
+def read_csv_fast(source, plan=None, sniff=None, use_threads=True, block_size=None, header=True):
+    """
+    Multithreaded CSV -> DataFrame with pyarrow.
+    source: path (memory-mapped), bytes / bytearray / memoryview (read in place).
+    plan: {column: type} applied while parsing (see column_plan), or "infer" to build one
+    from a sample with schema inference. Columns without a plan keep read_csv-like
+    inference (dates stay text). Falls back to pd.read_csv with the sniffed dialect when
+    pyarrow can't parse the file (ragged rows, ...). header=False: no header row (columns 0..n-1).
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+
+    opts = sniff or sniff_csv(_head_bytes(source, CSV_SNIFF_BYTES), header=header)
+    if isinstance(plan, str) and plan == "infer":
+        plan = infer_csv_plan(source)
+    plan = column_plan(plan)
+
+    def _input():
+        if isinstance(source, (str, os.PathLike)):
+            return pa.memory_map(str(source), "r")
+        return pa.BufferReader(pa.py_buffer(source))
+
+    read_opts = pcsv.ReadOptions(
+        use_threads=use_threads,
+        encoding="utf8" if opts["encoding"].startswith("utf-8") else opts["encoding"],
+        autogenerate_column_names=not opts["header"],
+        **({"block_size": block_size} if block_size else {}),
+    )
+    parse_opts = pcsv.ParseOptions(delimiter=opts["delimiter"], quote_char=opts["quotechar"])
+    datetime_cols = [c for c, t in plan.items() if str(t).lower().startswith(("datetime", "timestamp", "date"))]
+    convert_opts = pcsv.ConvertOptions(
+        column_types={c: _arrow_type(t) for c, t in plan.items() if c not in datetime_cols},
+        strings_can_be_null=True,
+        timestamp_parsers=[],
+    )
+    try:
+        with _input() as stream:
+            table = pcsv.read_csv(stream, read_options=read_opts, parse_options=parse_opts, convert_options=convert_opts)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, UnicodeDecodeError):
+        return _read_csv_pandas(source, opts, plan)
+    return _finish(table.to_pandas(), table.schema, opts, datetime_cols)
+
+
+def _finish(df, schema, opts, datetime_cols):
+    import pyarrow as pa
+    if not opts["header"]:
+        df.columns = range(df.shape[1])   # read_csv(header=None) numbering
+    else:
+        # read_csv names: blank -> "Unnamed: i", repeats -> "name.1"
+        df.columns = _header([c if c != "" else None for c in df.columns])
+    for name, field in zip(df.columns, schema):
+        if name in datetime_cols:
+            df[name] = pd.to_datetime(df[name], errors="coerce", format="mixed")
+        elif pa.types.is_date(field.type) or pa.types.is_time(field.type):
+            # pyarrow infers ISO dates; read_csv keeps them as text
+            df[name] = df[name].astype("str").where(df[name].notna())
+        elif pa.types.is_null(field.type):
+            df[name] = df[name].astype("float64")
+    return df
+
+
+def _read_csv_pandas(source, opts, plan):
+    dtypes = {c: {"integer": "Int64", "float": "float64", "boolean": "boolean", "string": "str"}.get(str(t).lower(), None)
+              for c, t in plan.items()}
+    src = source if isinstance(source, (str, os.PathLike)) else BytesIO(source)
+    return pd.read_csv(src, sep=opts["delimiter"], quotechar=opts["quotechar"], encoding=opts["encoding"],
+                       header=0 if opts["header"] else None,
+                       dtype={c: d for c, d in dtypes.items() if d})
+
+
+# --------------------------
+# Streaming Excel (openpyxl read-only)
+# --------------------------
+
+def _open_workbook(source):
+    import openpyxl
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    return openpyxl.load_workbook(source, read_only=True, data_only=True)
+
+
+def excel_sheet_names(source):
+    wb = _open_workbook(source)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def _header(row):
+    """Column names like pandas: blanks -> 'Unnamed: i', repeats -> 'name.1'."""
+    names, seen = [], {}
+    for i, v in enumerate(row):
+        name = f"Unnamed: {i}" if v is None else str(v) if not isinstance(v, (int, float)) else v
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def iter_excel_chunks(source, sheet=None, chunk_rows=EXCEL_CHUNK_ROWS):
+    """
+    Yield one sheet (default: the first) as DataFrames of at most `chunk_rows` rows.
+    Rows are streamed from the read-only workbook, so memory follows the chunk size;
+    empty rows at the end of the sheet are dropped like pd.read_excel does.
+    """
+    wb = _open_workbook(source)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            yield pd.DataFrame()
+            return
+        columns = _header(first)
+        width = len(columns)
+        blank = (None,) * width
+        buf, blanks, emitted = [], 0, False
+        for row in rows:
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            if row == blank:
+                blanks += 1   # counted, only written out if more data follows
+                continue
+            while blanks:
+                take = min(blanks, chunk_rows - len(buf))
+                buf.extend([blank] * take)
+                blanks -= take
+                if len(buf) >= chunk_rows:
+                    yield pd.DataFrame.from_records(buf, columns=columns)
+                    buf, emitted = [], True
+            buf.append(row)
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame.from_records(buf, columns=columns)
+                buf, emitted = [], True
+        if buf or not emitted:
+            yield pd.DataFrame.from_records(buf, columns=columns)
+    finally:
+        wb.close()
+
+
+def read_excel_streaming(source, sheet=None, chunk_rows=EXCEL_CHUNK_ROWS):
+    chunks = list(iter_excel_chunks(source, sheet, chunk_rows))
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)